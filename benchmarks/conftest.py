@@ -0,0 +1,47 @@
+"""Benchmarks of the hot paths of python-ffmpeg, using `lavfi` sources only.
+
+Usage:
+    pip install -r benchmarks/requirements.txt
+    python -m pytest benchmarks --benchmark-json=benchmark.json
+
+    # Store a baseline, and compare later runs against it
+    python -m pytest benchmarks --benchmark-autosave
+    python -m pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from ffmpeg import FFmpeg
+
+# A second of 320x240 video, which is enough to measure throughput without being dominated by encoding
+FRAME_SIZE = "320x240"
+FRAME_RATE = 25
+
+
+@pytest.fixture(scope="session")
+def rawvideo() -> bytes:
+    return (
+        FFmpeg()
+        .input(f"testsrc=size={FRAME_SIZE}:rate={FRAME_RATE}", f="lavfi", t=4)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+        .execute()
+    )
+
+
+@pytest.fixture(scope="session")
+def stderr() -> list[str]:
+    lines: list[str] = []
+
+    ffmpeg = (
+        FFmpeg()
+        .option("loglevel", "debug")
+        .option("stats_period", 0.01)
+        .input(f"testsrc=size={FRAME_SIZE}:rate={FRAME_RATE}", f="lavfi", t=4)
+        .output("pipe:1", f="null")
+    )
+    ffmpeg.on("stderr", lines.append)
+    ffmpeg.execute()
+
+    return lines
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pytest
+
+from ffmpeg import FFmpeg
+
+np = pytest.importorskip("numpy")
+
+# Two seconds of 720p, which is large enough for the cost of decoding frames into arrays to show
+SIZE = "1280x720"
+DURATION = 2
+
+
+def create_ffmpeg() -> FFmpeg:
+    return FFmpeg().input(f"testsrc=size={SIZE}:rate=30", f="lavfi", t=DURATION)
+
+
+def test_frames_naive(benchmark):
+    # Read the whole output at once, and slice it into frames afterwards
+    width, height = map(int, SIZE.split("x"))
+
+    def read() -> int:
+        output = create_ffmpeg().output("pipe:1", f="rawvideo", pix_fmt="rgb24").execute()
+        return sum(1 for _ in np.frombuffer(output, dtype=np.uint8).reshape(-1, height, width, 3))
+
+    benchmark.extra_info["frames"] = 30 * DURATION
+    assert benchmark.pedantic(read, rounds=5) == 30 * DURATION
+
+
+def test_frames(benchmark):
+    def read() -> int:
+        return sum(1 for _ in create_ffmpeg().frames())
+
+    benchmark.extra_info["frames"] = 30 * DURATION
+    assert benchmark.pedantic(read, rounds=5) == 30 * DURATION
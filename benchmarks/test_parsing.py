@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import io
+from datetime import timedelta
+
+from ffmpeg import FFmpeg, MetricsExporter, Progress
+from ffmpeg.statistics import Statistics
+from ffmpeg.utils import read_line_batches
+
+
+def test_statistics_from_line(benchmark, stderr: list[str]):
+    def parse() -> int:
+        return sum(1 for line in stderr if Statistics.from_line(line) is not None)
+
+    benchmark.extra_info["lines"] = len(stderr)
+    assert benchmark(parse) > 0
+
+
+def test_statistics_from_line_mixed(benchmark):
+    # Most lines FFmpeg prints are not statistics, and have to be told apart as cheaply as the others are parsed
+    line = "frame=  109 fps=0.0 q=-1.0 Lsize=     793kB time=00:00:04.02 bitrate=1613.7kbits/s speed=7.73x"
+    other = "  Stream #0:0: Video: h264 (High), yuv420p(progressive), 1920x1080, 25 fps"
+
+    def parse():
+        for _ in range(10000):
+            Statistics.from_line(line)
+            Statistics.from_line(other)
+
+    benchmark.extra_info["lines"] = 20000
+    benchmark(parse)
+
+
+def test_read_line_batches_long_lines(benchmark):
+    # Filters such as `showinfo` and `-loglevel debug` print long lines, which may span several reads
+    data = b"".join(b"x" * size + b"\n" for size in (80, 4096, 65536) * 64)
+
+    def read() -> int:
+        return sum(len(lines) for lines in read_line_batches(io.BytesIO(data)))
+
+    benchmark.extra_info["bytes"] = len(data)
+    assert benchmark(read) == 3 * 64
+
+
+def test_exporter_progress(benchmark):
+    # A busy worker reports thousands of progress updates per second, every one of which is aggregated
+    exporter = MetricsExporter()
+    ffmpeg = exporter.track(FFmpeg())
+    progress = Progress(
+        frame=100,
+        fps=250.0,
+        size=1024,
+        time=timedelta(seconds=4),
+        bitrate=2.0,
+        speed=10.0,
+    )
+
+    def emit():
+        for _ in range(10000):
+            ffmpeg.emit("progress", progress)
+
+    benchmark.extra_info["updates"] = 10000
+    benchmark(emit)
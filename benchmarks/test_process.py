@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from conftest import FRAME_RATE, FRAME_SIZE
+
+from ffmpeg import BatchRunner, FFmpeg
+from ffmpeg.asyncio import FFmpeg as AsyncFFmpeg
+
+
+def create_ffmpeg(ffmpeg: FFmpeg) -> FFmpeg:
+    return ffmpeg.input("color=size=16x16:rate=1", f="lavfi", t=1).output("pipe:1", f="rawvideo", pix_fmt="gray")
+
+
+def test_spawn_to_first_byte(benchmark):
+    def first_byte() -> bytes:
+        chunks = create_ffmpeg(FFmpeg()).iterate()
+        chunk = next(chunks)
+        chunks.close()  # kills FFmpeg
+        return chunk
+
+    assert benchmark(first_byte)
+
+
+def test_pipe_throughput(benchmark, rawvideo: bytes):
+    def pipe() -> bytes:
+        return (
+            FFmpeg()
+            .input("pipe:0", f="rawvideo", pix_fmt="rgb24", s=FRAME_SIZE, r=FRAME_RATE)
+            .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+            .execute(rawvideo)
+        )
+
+    benchmark.extra_info["bytes"] = len(rawvideo)
+    assert len(benchmark(pipe)) == len(rawvideo)
+
+
+@pytest.mark.parametrize("jobs", [1, 10, 100])
+def test_sync_jobs(benchmark, jobs: int):
+    def run():
+        return BatchRunner(concurrency=jobs, threads=1).run(create_ffmpeg(FFmpeg()) for _ in range(jobs))
+
+    results = benchmark.pedantic(run, rounds=3)
+    assert all(isinstance(result, bytes) for result in results)
+
+
+@pytest.mark.parametrize("jobs", [1, 10, 100])
+def test_asyncio_jobs(benchmark, jobs: int):
+    async def gather():
+        return await asyncio.gather(*(create_ffmpeg(AsyncFFmpeg()).execute() for _ in range(jobs)))  # type: ignore
+
+    results = benchmark.pedantic(lambda: asyncio.run(gather()), rounds=3)
+    assert all(isinstance(result, bytes) for result in results)
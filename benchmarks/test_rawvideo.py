@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import io
+import subprocess
+from typing import Callable
+
+import pytest
+
+from ffmpeg import FFmpeg
+from ffmpeg.utils import read_stream
+
+# Two seconds of 720p, which is large enough for the cost of reading the standard output to show
+SIZE = "1280x720"
+DURATION = 2
+
+
+def create_ffmpeg() -> FFmpeg:
+    return (
+        FFmpeg()
+        .input(f"color=size={SIZE}:rate=30", f="lavfi", t=DURATION)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+
+def naive(ffmpeg: FFmpeg) -> int:
+    # Equivalent to how `FFmpeg.execute()` used to read the standard output
+    process = subprocess.Popen(ffmpeg.arguments, bufsize=0, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    assert process.stdout is not None
+
+    buffer = bytearray()
+    for chunk in read_stream(process.stdout, size=io.DEFAULT_BUFFER_SIZE):
+        buffer.extend(chunk)
+
+    process.wait()
+    return len(bytes(buffer))
+
+
+readers: dict[str, Callable[[FFmpeg], int]] = {
+    "naive": naive,
+    "execute-8k": lambda ffmpeg: len(ffmpeg.execute(size=io.DEFAULT_BUFFER_SIZE)),
+    "execute": lambda ffmpeg: len(ffmpeg.execute()),
+    "execute-1m": lambda ffmpeg: len(ffmpeg.execute(size=1024 * 1024)),
+    "execute-1m-no-copy": lambda ffmpeg: len(ffmpeg.execute(size=1024 * 1024, copy=False)),
+    "iterate-1m": lambda ffmpeg: sum(map(len, ffmpeg.iterate(size=1024 * 1024))),
+}
+
+
+@pytest.mark.parametrize("reader", readers)
+def test_read_rawvideo(benchmark, reader: str):
+    width, height = map(int, SIZE.split("x"))
+    ffmpeg = create_ffmpeg()
+
+    benchmark.extra_info["bytes"] = width * height * 3 * 30 * DURATION
+    length = benchmark.pedantic(readers[reader], args=(ffmpeg,), rounds=5)
+    assert length == benchmark.extra_info["bytes"]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from ffmpeg import FFmpeg
+
+
+def create_ffmpeg(input_url: str, output_url: str, crf: int) -> FFmpeg:
+    return (
+        FFmpeg()
+        .option("y")
+        .input(input_url, ss=10, t=5)
+        .output(output_url, {"codec:v": "libx264", "preset": "veryfast", "crf": crf, "codec:a": "aac", "b:a": "128k"})
+    )
+
+
+def test_build_arguments(benchmark):
+    # Every job of a batch builds its options again
+    def build() -> list[str]:
+        return create_ffmpeg("input.mp4", "output.mp4", 23).arguments
+
+    assert benchmark(build)[-1] == "output.mp4"
+
+
+def test_template_create(benchmark):
+    template = create_ffmpeg("{input}", "{output}", "{crf}").compile()  # type: ignore
+
+    def create() -> list[str]:
+        return template.create(input="input.mp4", output="output.mp4", crf=23).arguments
+
+    assert benchmark(create)[-1] == "output.mp4"
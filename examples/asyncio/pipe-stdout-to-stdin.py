@@ -1,19 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import subprocess
 
 from ffmpeg import Progress
 from ffmpeg.asyncio import FFmpeg
 
 
 async def main():
-    streamlink = await asyncio.create_subprocess_exec(
-        "streamlink",
-        "--stdout",
-        "https://twitch.tv/zilioner",
-        "best",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.DEVNULL,
+    # The standard output of streamlink is handed to ffmpeg directly, so it does not have to be read by asyncio
+    streamlink = subprocess.Popen(
+        ["streamlink", "--stdout", "https://twitch.tv/zilioner", "best"],
+        bufsize=0,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
 
     ffmpeg = FFmpeg().option("y").input("pipe:0").output("output.mp4", c="copy")
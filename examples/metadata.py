@@ -1,29 +1,23 @@
 from __future__ import annotations
 
-import json
-
-from ffmpeg import FFmpeg
+from ffmpeg import FFprobe
 
 
 def main():
-    ffmpeg = FFmpeg(executable="ffprobe").input(
-        "input.mp4",
-        print_format="json",
-        show_streams=None,
-    )
-
-    media = json.loads(ffmpeg.execute())
+    media = FFprobe().probe("input.mp4")
 
+    video = media.video_streams[0]
     print(f"# Video")
-    print(f"- Codec: {media['streams'][0]['codec_name']}")
-    print(f"- Resolution: {media['streams'][0]['width']} X {media['streams'][0]['height']}")
-    print(f"- Duration: {media['streams'][0]['duration']}")
+    print(f"- Codec: {video.codec_name}")
+    print(f"- Resolution: {video.width} X {video.height}")
+    print(f"- Duration: {video.duration}")
     print("")
 
+    audio = media.audio_streams[0]
     print(f"# Audio")
-    print(f"- Codec: {media['streams'][1]['codec_name']}")
-    print(f"- Sample Rate: {media['streams'][1]['sample_rate']}")
-    print(f"- Duration: {media['streams'][1]['duration']}")
+    print(f"- Codec: {audio.codec_name}")
+    print(f"- Sample Rate: {audio.sample_rate}")
+    print(f"- Duration: {audio.duration}")
 
 
 if __name__ == "__main__":
@@ -6,8 +6,10 @@ from ffmpeg import FFmpeg, Progress
 
 
 def main():
+    # An unbuffered pipe is handed to ffmpeg directly, without being copied through Python
     streamlink = subprocess.Popen(
         ["streamlink", "--stdout", "https://twitch.tv/zilioner", "best"],
+        bufsize=0,
         stdout=subprocess.PIPE,
         stderr=subprocess.DEVNULL,
     )
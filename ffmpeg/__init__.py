@@ -1,5 +1,15 @@
+from .batch import BatchProgress, BatchRunner, Job
+from .capabilities import Capabilities, CapabilityRegistry, get_capabilities, get_version
+from .dispatcher import DispatchMetrics
 from .errors import FFmpegAlreadyExecuted, FFmpegError, FFmpegFileNotFound, FFmpegInvalidCommand, FFmpegUnsupportedCodec
+from .exporter import MetricsExporter
 from .ffmpeg import FFmpeg
+from .graph import FilterGraph, Pad
+from .ladder import Ladder, Rendition
+from .metrics import ExecutionMetrics
+from .parallel import ParallelTranscoder
+from .probe import FFprobe, MediaFormat, MediaInfo, MediaStream, ProbeCache
 from .progress import Progress
+from .template import Template
 
 __version__ = "2.0.12"
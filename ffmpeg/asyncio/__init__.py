@@ -1 +1,4 @@
+from .batch import BatchRunner
 from .ffmpeg import FFmpeg
+from .probe import FFprobe
+from .scheduler import Scheduler
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable, Optional, Union
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from ffmpeg.asyncio.ffmpeg import FFmpeg
+from ffmpeg.batch import BatchTracker, Job, ensure_job, plan
+
+
+class BatchRunner(AsyncIOEventEmitter):
+    def __init__(self, concurrency: Optional[int] = None, threads: Optional[int] = None):
+        """Initialize a `BatchRunner` instance using `asyncio`, which runs many `FFmpeg` jobs with bounded concurrency.
+
+        Args:
+            concurrency: The maximum number of jobs running at once.
+                Defaults to None, which means the number of available CPU cores.
+            threads: The number of threads each job may use, passed as `-threads` to every input and output file
+                which does not specify it. Defaults to None, which means the available CPU cores divided by `concurrency`.
+        """
+        super().__init__()
+
+        self._concurrency, self._threads = plan(concurrency, threads)
+
+    async def run(self, jobs: Iterable[Union[FFmpeg, Job]]) -> list[Union[bytes, Exception]]:
+        """Run jobs, at most `concurrency` at once, and wait for all of them.
+
+        Args:
+            jobs: `FFmpeg` instances, or `Job`s to specify an input stream or a timeout for each of them.
+
+        Note:
+            ```python
+            runner = BatchRunner()
+
+            @runner.on("progress")
+            def on_progress(progress: BatchProgress):
+                print(f"{progress.completed + progress.failed}/{progress.total}")
+
+            results = await runner.run(FFmpeg().input(path).output(path.with_suffix(".mp4")) for path in paths)
+            ```
+
+        Returns:
+            For each job in order, the output to the standard output, or the exception raised by the job.
+        """
+        jobs = [ensure_job(job) for job in jobs]
+        tracker = BatchTracker(self, jobs, self._threads)
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def run(index: int, job: Job) -> bytes:
+            async with semaphore:
+                tracker.start(index)
+                try:
+                    output = await job.ffmpeg.execute(job.stream, timeout=job.timeout)  # type: ignore
+                except BaseException:
+                    tracker.finish(index, failed=True)
+                    raise
+
+                tracker.finish(index, failed=False)
+                return output
+
+        return await asyncio.gather(*[run(index, job) for index, job in enumerate(jobs)], return_exceptions=True)
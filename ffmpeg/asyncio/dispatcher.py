@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from typing import Any
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from ffmpeg import types
+from ffmpeg.dispatcher import DispatchMetrics, EventQueue
+
+
+class Dispatcher:
+    """Delivers events to listeners on a dedicated task, so that slow listeners never stop the pipes of FFmpeg
+    from being drained.
+
+    Coroutine listeners are awaited before the next event is delivered, so that the queue reflects how far behind
+    listeners are. Since `put()` never waits, producers have to await `drain()` to apply the `block` policy.
+    With pyee older than 12.1, which lacks `wait_for_complete()`, coroutine listeners are only scheduled.
+    """
+
+    def __init__(self, emitter: AsyncIOEventEmitter, capacity: int, policy: types.DispatchPolicy):
+        self._emitter = emitter
+        self._queue = EventQueue(capacity, policy)
+
+        self._available = asyncio.Event()
+        self._room = asyncio.Event()
+        self._closed = False
+
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(lambda _: self._room.set())
+
+    @property
+    def metrics(self) -> DispatchMetrics:
+        return replace(self._queue.metrics)
+
+    @property
+    def task(self) -> asyncio.Task:
+        return self._task
+
+    def put(self, event: str, *args: Any):
+        if self._task.done():
+            self._task.result()  # raise the exception of a listener, if any
+            return
+
+        self._queue.put(event, args)
+        self._available.set()
+
+    async def drain(self):
+        while not self._queue.accepts() and not self._task.done():
+            self._room.clear()
+            await self._room.wait()
+
+        if self._task.done():
+            self._task.result()
+
+    async def close(self, cancel: bool = False):
+        """Wait until every queued event is delivered, and stop the task.
+
+        Args:
+            cancel: Whether to discard queued events instead, without raising exceptions of listeners.
+                Defaults to False.
+        """
+        self._closed = True
+        if cancel:
+            self._queue.clear()
+        self._available.set()
+
+        await asyncio.wait([self._task])
+        if not cancel:
+            self._task.result()
+
+    async def _run(self):
+        while True:
+            while not self._queue:
+                if self._closed:
+                    return
+
+                self._available.clear()
+                await self._available.wait()
+
+            event, args = self._queue.get()
+            self._room.set()
+
+            self._emitter.emit(event, *args)
+            # pyee 12.1 requires Python 3.8, so older versions without `wait_for_complete()` are still installed on 3.7
+            if hasattr(self._emitter, "wait_for_complete"):
+                await self._emitter.wait_for_complete()
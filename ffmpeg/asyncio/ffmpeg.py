@@ -1,40 +1,120 @@
 from __future__ import annotations
 
 import asyncio
-import io
+import functools
 import os
 import signal
 import subprocess
-from typing import Optional, Union
+import time
+from typing import IO, TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Union
 
 from pyee.asyncio import AsyncIOEventEmitter
 from typing_extensions import Self
 
 from ffmpeg import types
-from ffmpeg.asyncio.utils import create_subprocess, ensure_stream_reader, read_stream, readlines
+from ffmpeg.asyncio.dispatcher import Dispatcher
+from ffmpeg.asyncio.utils import (
+    create_subprocess,
+    ensure_async_iterator,
+    ensure_stream_reader,
+    open_stream_reader,
+    read_line_batches,
+    read_stream,
+)
+from ffmpeg.dispatcher import DispatchMetrics
 from ffmpeg.ffmpeg import FFmpegAlreadyExecuted, FFmpegError
+from ffmpeg.metrics import ExecutionMetrics
 from ffmpeg.options import Options
 from ffmpeg.progress import Tracker
-from ffmpeg.utils import is_windows
+from ffmpeg.spill import spill_arguments
+from ffmpeg.template import Template
+from ffmpeg.utils import (
+    TailBuffer,
+    get_fileno,
+    get_stderr_options,
+    is_windows,
+    open_progress_pipe,
+    open_sink,
+    slice_buffer,
+)
+from ffmpeg.video import get_frame_buffer, get_input_options
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# The default limit of buffers of asyncio streams
+_DEFAULT_LIMIT = 2**16
 
 
 class FFmpeg(AsyncIOEventEmitter):
-    def __init__(self, executable: str = "ffmpeg"):
+    def __init__(
+        self,
+        executable: str = "ffmpeg",
+        progress: types.ProgressMode = "stderr",
+        progress_interval: Optional[float] = None,
+        tune_stderr: bool = False,
+        dispatch: Optional[types.DispatchPolicy] = None,
+        dispatch_capacity: int = 1024,
+        stderr_tail: int = 32,
+    ):
         """Initialize an `FFmpeg` instance using `asyncio`
 
         Args:
             executable: The path to the ffmpeg executable. Defaults to "ffmpeg".
+            progress: How to track the progress. Defaults to "stderr".
+                - `stderr`: Statistics are parsed from the standard error.
+                - `pipe`: FFmpeg writes machine-readable statistics with `-progress` to a dedicated pipe,
+                  and does not print them to the standard error with `-nostats`.
+                  Since file descriptors cannot be inherited on Windows, it falls back to `stderr` on Windows.
+            progress_interval: The minimum number of seconds between `progress` events. Defaults to None,
+                which means every report is emitted. Reports arriving sooner are coalesced into the latest one.
+            tune_stderr: Whether to set `-loglevel` and `-stats_period` from the listeners registered when executing,
+                so that FFmpeg prints no more than they need. Options specified explicitly are never overridden.
+                Defaults to False.
+            dispatch: How to deliver `stderr`, `stderr_lines` and `progress` events. Defaults to None,
+                which means listeners are called while the pipes are drained, so that slow listeners slow FFmpeg down.
+                Otherwise, events are queued and delivered by a dispatcher task, which awaits coroutine listeners
+                before delivering the next event, and this is the policy for a full queue.
+                - `block`: Draining the pipes waits until there is room.
+                - `drop_oldest`: The oldest queued event is discarded.
+                - `drop_newest`: The arriving event is discarded.
+                - `coalesce`: A `progress` event replaces the queued one, and other events wait as with `block`.
+            dispatch_capacity: The maximum number of queued events. Defaults to 1024.
+            stderr_tail: The number of last lines of the standard error kept to explain an error. Defaults to 32.
+                The lines are also limited to 64 KiB in total, so that memory stays bounded however long FFmpeg runs.
         """
         super().__init__()
 
         self._executable: str = executable
         self._options: Options = Options()
+        # Arguments rendered from a template, which replace the options until the instance is changed,
+        # and a function rendering the options of the template with the same values
+        self._arguments: Optional[list[str]] = None
+        self._render_options: Optional[Callable[[], Options]] = None
 
         self._process: asyncio.subprocess.Process
         self._executed: bool = False
         self._terminated: bool = False
 
-        self._tracker = Tracker(self)  # type: ignore
+        self._progress = "stderr" if is_windows() else progress
+        self._progress_interval = progress_interval
+        self._tune_stderr = tune_stderr
+        self._tracker: Optional[Tracker] = None
+
+        self._dispatch_policy = dispatch
+        self._dispatch_capacity = dispatch_capacity
+        self._dispatcher: Optional[Dispatcher] = None
+
+        self._stderr_tail_lines = stderr_tail
+        self._stderr_tail = TailBuffer(stderr_tail)
+
+        self._stdin_bytes = 0
+        self._stdout_bytes = 0
+        self._stderr_lines = 0
+        self._first_byte_at: Optional[float] = None
+
+        self.metrics: Optional[ExecutionMetrics] = None
+        """The resources used by the last execution that was not aborted, or None."""
 
         self.once("error", self._reraise_exception)
 
@@ -45,8 +125,20 @@ class FFmpeg(AsyncIOEventEmitter):
         Returns:
             A lit of arguments to be used when executing FFmpeg.
         """
+        if self._arguments is not None:
+            return self._arguments.copy()
+
         return [self._executable, *self._options.build()]
 
+    @property
+    def dispatch_metrics(self) -> Optional[DispatchMetrics]:
+        """Return how events of the current or the last execution have been delivered by the dispatcher.
+
+        Returns:
+            The metrics of the dispatcher, or None if events are not dispatched.
+        """
+        return self._dispatcher.metrics if self._dispatcher is not None else None
+
     def option(self, key: str, value: Optional[types.Option] = None) -> Self:
         """Add a global option `-key` or `-key value`.
 
@@ -57,6 +149,7 @@ class FFmpeg(AsyncIOEventEmitter):
         Returns:
             An instance of `FFmpeg` itself, so that calls can be chained.
         """
+        self._thaw()
         self._options.option(key, value)
         return self
 
@@ -100,6 +193,7 @@ class FFmpeg(AsyncIOEventEmitter):
         Returns:
             An instance of `FFmpeg` itself, so that calls can be chained.
         """
+        self._thaw()
         self._options.input(url, options, **kwargs)
         return self
 
@@ -143,71 +237,364 @@ class FFmpeg(AsyncIOEventEmitter):
         Returns:
             An instance of `FFmpeg` itself, so that calls can be chained.
         """
+        self._thaw()
         self._options.output(url, options, **kwargs)
         return self
 
+    def setdefault(self, key: str, value: Optional[types.Option] = None) -> Self:
+        """Add an option `-key` or `-key value` to every input and output file which does not specify it yet.
+           Files added afterwards are not affected.
+
+        Args:
+            key: A key of the option.
+            value: A value of the option. If the option does not require a value, use None. Defaults to None.
+
+        Note:
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("output.mp4", threads=8).setdefault("threads", 2)
+            # Corresponds to `ffmpeg -threads 2 -i input.mp4 -threads 8 output.mp4`
+            ```
+
+        Returns:
+            An instance of `FFmpeg` itself, so that calls can be chained.
+        """
+        self._thaw()
+        self._options.setdefault(key, value)
+        return self
+
+    def compile(self) -> Template[FFmpeg]:
+        """Compile the options into a template, which renders the arguments of many similar jobs
+           without building the options again for every job.
+
+        Arguments which are exactly a placeholder such as `{input}` are replaced by the values given for every job.
+        Listeners are not compiled, so they have to be added to every instance created from the template.
+
+        Note:
+            ```python
+            template = (
+                FFmpeg()
+                .option("y")
+                .input("{input}")
+                .output("{output}", {"codec:v": "libx264", "crf": "{crf}"})
+                .compile()
+            )
+
+            await template.create(input="input.mp4", output="output.mp4", crf=23).execute()
+            ```
+
+        Returns:
+            A template creating `FFmpeg` instances using `asyncio` with the current options.
+        """
+        self._thaw()
+        return Template(
+            self.arguments,
+            self._options,
+            functools.partial(
+                FFmpeg,
+                executable=self._executable,
+                progress=self._progress,
+                progress_interval=self._progress_interval,
+                tune_stderr=self._tune_stderr,
+                dispatch=self._dispatch_policy,
+                dispatch_capacity=self._dispatch_capacity,
+                stderr_tail=self._stderr_tail_lines,
+            ),
+        )
+
     async def execute(
-        self, stream: Optional[Union[bytes, asyncio.StreamReader]] = None, timeout: Optional[float] = None
+        self,
+        stream: Optional[types.AsyncStream] = None,
+        timeout: Optional[float] = None,
+        size: Optional[int] = None,
+        copy: bool = True,
+        sink: Optional[types.Sink] = None,
     ) -> bytes:
         """Execute FFmpeg using specified global options and files.
 
         Args:
-            stream: A stream to input to the standard input. Defaults to None.
+            stream: A stream to input to the standard input.
+                If the stream is backed by a file descriptor, such as a file or a pipe, it is handed to FFmpeg directly.
+                Defaults to None.
             timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            size: The number of bytes to transfer through the pipes at a time. Defaults to None, which means 64 KiB.
+            copy: Whether to return the output as immutable `bytes`.
+                If False, the `bytearray` the output was read into is returned as is, so that a large output is never
+                held in memory twice. It is not faster to read, only lighter on memory.
+                Defaults to True.
+            sink: A path, a file descriptor, a file object or a socket to redirect the standard output to.
+                The target is handed to FFmpeg as its standard output, so the output never passes through Python.
+                Defaults to None.
 
         Raises:
             FFmpegAlreadyExecuted: If FFmpeg is already executed.
             FFmpegError: If FFmpeg process returns non-zero exit status.
             asyncio.TimeoutError: If FFmpeg process does not terminate after `timeout` seconds.
 
+        Note:
+            A socket must be in blocking mode to be used as a sink, since FFmpeg writes to it directly.
+
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("pipe:1", f="matroska")
+            await ffmpeg.execute(sink="output.mkv")
+            ```
+
+        Returns:
+            The output to the standard output, or empty bytes if `sink` is specified.
+        """
+        buffer = bytearray()
+        async for chunk in self._execute(stream, timeout, size, sink):
+            buffer.extend(chunk)
+
+        return bytes(buffer) if copy else buffer  # type: ignore
+
+    def iterate(
+        self,
+        stream: Optional[types.AsyncStream] = None,
+        timeout: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Execute FFmpeg and yield the output to the standard output chunk by chunk as soon as it is available.
+           Unlike `execute()`, the output is never buffered as a whole, so memory usage stays flat regardless of its size.
+
+        Args:
+            stream: A stream to input to the standard input.
+                If the stream is backed by a file descriptor, such as a file or a pipe, it is handed to FFmpeg directly.
+                Defaults to None.
+            timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            size: The maximum number of bytes in each chunk. Defaults to None, which means 64 KiB.
+
+        Raises:
+            FFmpegAlreadyExecuted: If FFmpeg is already executed.
+            FFmpegError: If FFmpeg process returns non-zero exit status.
+            asyncio.TimeoutError: If FFmpeg process does not terminate after `timeout` seconds.
+
+        Note:
+            If the iteration is stopped early, the FFmpeg process is killed.
+
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("pipe:1", f="matroska")
+            with open("output.mkv", "wb") as file:
+                async for chunk in ffmpeg.iterate():
+                    file.write(chunk)
+            ```
+
+        Yields:
+            Chunks of the output to the standard output.
+        """
+        return self._execute(stream, timeout, size)
+
+    async def encode_frames(
+        self,
+        frames: Union[Iterable[np.ndarray], AsyncIterable[np.ndarray]],
+        timeout: Optional[float] = None,
+        framerate: Optional[types.Numeric] = None,
+        pix_fmt: Optional[str] = None,
+        options: Optional[dict[str, Optional[types.Option]]] = None,
+    ) -> bytes:
+        """Execute FFmpeg, encoding frames as NumPy arrays fed to the standard input.
+           An input from the standard input in rawvideo format is added, so only output files have to be specified.
+
+        Args:
+            frames: Frames of shape `(height, width, channels)`, or `(height, width)` for single-channel pixel formats.
+                All frames must have the same shape and type as the first one.
+            timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            framerate: The frame rate of frames. Defaults to None, which means 25.
+            pix_fmt: The pixel format of frames.
+                Defaults to None, which means a format found from the shape and the type of the first frame,
+                such as `rgb24` for `uint8` frames with 3 channels.
+            options: Additional options for the input file. Defaults to None.
+
+        Raises:
+            FFmpegAlreadyExecuted: If FFmpeg is already executed.
+            FFmpegError: If FFmpeg process returns non-zero exit status.
+            asyncio.TimeoutError: If FFmpeg process does not terminate after `timeout` seconds.
+            ValueError: If there is no frame, no pixel format fits the frames, or the frames differ in shape or type.
+
+        Note:
+            The next frame is requested only after the previous one has been drained to FFmpeg.
+            So frames are produced no faster than FFmpeg consumes them.
+
+            ```python
+            ffmpeg = FFmpeg().output("output.mp4", vcodec="libx264")
+            await ffmpeg.encode_frames(render(frame_index) async for frame_index in frame_indices())
+            ```
+
         Returns:
             The output to the standard output.
         """
+        frames = ensure_async_iterator(frames)
+        try:
+            first = await frames.__anext__()
+        except StopAsyncIteration:
+            raise ValueError("There is no frame to encode") from None
+
+        input_options = get_input_options(first, pix_fmt)
+        if framerate is not None:
+            input_options["framerate"] = framerate
+        self.input("pipe:0", {**input_options, **(options or {})})
+
+        async def get_frame_buffers() -> AsyncIterator[memoryview]:
+            yield get_frame_buffer(first, first.shape, first.dtype)
+            async for frame in frames:
+                yield get_frame_buffer(frame, first.shape, first.dtype)
+
+        buffer = bytearray()
+        async for chunk in self._execute(None, timeout, None, chunks=get_frame_buffers()):
+            buffer.extend(chunk)
+
+        return bytes(buffer)
+
+    async def _execute(
+        self,
+        stream: Optional[types.AsyncStream],
+        timeout: Optional[float],
+        size: Optional[int],
+        sink: Optional[types.Sink] = None,
+        chunks: Optional[AsyncIterable[Any]] = None,
+    ) -> AsyncIterator[bytes]:
         if self._executed:
             raise FFmpegAlreadyExecuted("FFmpeg is already executed", arguments=self.arguments)
 
         self._executed = False
         self._terminated = False
 
-        if stream is not None:
-            stream = ensure_stream_reader(stream)
-
-        self.emit("start", self.arguments)
-
-        self._process = await create_subprocess(
-            *self.arguments,
-            stdin=subprocess.PIPE if stream is not None else None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
+        if size is None:
+            size = _DEFAULT_LIMIT
 
+        stdin = subprocess.PIPE if chunks is not None else None
+        if stream is not None:
+            stdin = get_fileno(stream)
+            if stdin is not None:
+                # FFmpeg reads the stream by itself, so there is nothing to copy
+                stream = None
+            else:
+                stdin = subprocess.PIPE
+                if isinstance(stream, bytes):
+                    # Write slices of the bytes directly instead of copying them into a stream reader first
+                    chunks = ensure_async_iterator(slice_buffer(stream, size))
+                else:
+                    chunks = read_stream(ensure_stream_reader(stream), size=size)
+
+        arguments = self.arguments
+
+        # Statistics are only parsed if someone listens to them, so listeners have to be added before executing
+        self._stderr_tail = TailBuffer(self._stderr_tail_lines)
+        self._stdin_bytes = 0
+        self._stdout_bytes = 0
+        self._stderr_lines = 0
+        self._first_byte_at = None
+        tracker = Tracker(self._emit_drained, self._progress_interval) if self.listeners("progress") else None
+        self._tracker = tracker if self._progress == "stderr" else None
+
+        options = self._get_stderr_options(arguments, tracker is not None) if self._tune_stderr else []
+
+        with open_progress_pipe(self._progress == "pipe" and tracker is not None) as (progress, write_fd):
+            if self._progress == "pipe":
+                if progress is not None:
+                    options.extend(["-progress", f"pipe:{write_fd}"])
+                options.append("-nostats")
+            # Oversized filter graphs and input lists are read from files that FFmpeg needs until it exits
+            spilled = spill_arguments([arguments[0], *options, *arguments[1:]])
+            arguments = spilled.arguments
+
+            self.emit("start", arguments)
+
+            with open_sink(sink) as stdout:
+                spawned_at = time.monotonic()
+                try:
+                    self._process = await create_subprocess(
+                        *arguments,
+                        stdin=stdin,
+                        stdout=stdout,
+                        stderr=subprocess.PIPE,
+                        limit=max(size, _DEFAULT_LIMIT),
+                        pass_fds=(write_fd,) if write_fd is not None else (),
+                    )
+                except Exception as exception:
+                    spilled.cleanup()
+                    self.emit("failed", exception)
+                    raise
+                spawn_time = time.monotonic() - spawned_at
+
+        tasks: list[asyncio.Task] = []
+        self._dispatcher = None
         self._executed = True
-        tasks = [
-            asyncio.create_task(self._write_stdin(stream)),
-            asyncio.create_task(self._read_stdout()),
-            asyncio.create_task(self._handle_stderr()),
-            asyncio.create_task(asyncio.wait_for(self._process.wait(), timeout=timeout)),
-        ]
-        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
-        self._executed = False
-
-        for task in done:
-            exception = task.exception()
-            if exception is not None:
-                self._process.terminate()
-                for task in pending:
-                    await task
-
-                raise exception
+        try:
+            if self._dispatch_policy is not None:
+                self._dispatcher = Dispatcher(self, self._dispatch_capacity, self._dispatch_policy)
+                self._dispatcher.task.add_done_callback(self._terminate_on_exception)
+
+            tasks.append(asyncio.create_task(self._handle_stderr()))
+            tasks.append(asyncio.create_task(asyncio.wait_for(self._process.wait(), timeout=timeout)))
+            if chunks is not None:
+                tasks.append(asyncio.create_task(self._write_stdin(chunks)))
+            if progress is not None:
+                assert tracker is not None
+                tasks.append(asyncio.create_task(self._handle_progress(progress, tracker)))
+
+            for task in tasks:
+                task.add_done_callback(self._terminate_on_exception)
+
+            if self._process.stdout is not None:
+                async for chunk in read_stream(self._process.stdout, size=size):
+                    if self._first_byte_at is None:
+                        self._first_byte_at = time.monotonic()
+                    self._stdout_bytes += len(chunk)
+                    yield chunk
+
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            wall_time = time.monotonic() - spawned_at
+
+            for task in done:
+                exception = task.exception()
+                if exception is not None:
+                    raise exception
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer no longer needs the output or the execution is cancelled,
+            # so there is no reason to keep FFmpeg running.
+            # FFmpeg may be blocked on writing to the standard output, so it has to be killed instead of terminated.
+            await self._abort(tasks)
+            self.emit("terminated")
+            raise
+        except BaseException as exception:
+            await self._abort(tasks)
+            self.emit("failed", exception)
+            raise
+        finally:
+            self._executed = False
+            spilled.cleanup()
+
+        if tracker is not None:
+            tracker.flush()
+        if self._dispatcher is not None:
+            await self._dispatcher.close()
+
+        self.metrics = ExecutionMetrics(
+            spawn_time=spawn_time,
+            first_byte_time=self._first_byte_at - spawned_at if self._first_byte_at is not None else None,
+            wall_time=wall_time,
+            # The child watcher of asyncio reaps the process, so its resource usage is not available
+            user_time=None,
+            system_time=None,
+            max_rss=None,
+            stdin_bytes=self._stdin_bytes,
+            stdout_bytes=self._stdout_bytes,
+            stderr_lines=self._stderr_lines,
+        )
+        self.emit("metrics", self.metrics)
 
         if self._process.returncode == 0:
             self.emit("completed")
         elif self._terminated:
             self.emit("terminated")
         else:
-            raise FFmpegError.create(message=tasks[2].result(), arguments=self.arguments)
-
-        return tasks[1].result()
+            error = FFmpegError.create(
+                message=self._stderr_tail.last_line.decode(errors="replace"),
+                arguments=self.arguments,
+                tail=self._stderr_tail.decode(),
+            )
+            self.emit("failed", error)
+            raise error
 
     def terminate(self):
         """Gracefully terminate the running FFmpeg process.
@@ -230,36 +617,83 @@ class FFmpeg(AsyncIOEventEmitter):
         self._terminated = True
         self._process.send_signal(sigterm)
 
-    async def _write_stdin(self, stream: Optional[asyncio.StreamReader]):
-        if stream is None:
-            return
+    def _get_stderr_options(self, arguments: list[str], tracking: bool) -> list[str]:
+        return get_stderr_options(
+            (argument[1:] for argument in arguments[1:] if argument.startswith("-")),
+            logging=bool(self.listeners("stderr") or self.listeners("stderr_lines")),
+            stats=tracking and self._progress == "stderr",
+            interval=self._progress_interval if tracking else None,
+        )
 
+    async def _write_stdin(self, chunks: AsyncIterable[Any]):
         assert self._process.stdin is not None
 
-        async for chunk in read_stream(stream, size=io.DEFAULT_BUFFER_SIZE):
+        async for chunk in chunks:
             self._process.stdin.write(chunk)
+            self._stdin_bytes += memoryview(chunk).nbytes
             await self._process.stdin.drain()
 
         self._process.stdin.close()
         await self._process.stdin.wait_closed()
 
-    async def _read_stdout(self) -> bytes:
-        assert self._process.stdout is not None
+    def _emit_drained(self, event: str, *args: Any):
+        # Events emitted while draining the pipes are queued for the dispatcher, unless nobody listens to them
+        if self._dispatcher is not None:
+            if self.listeners(event):
+                self._dispatcher.put(event, *args)
+        else:
+            self.emit(event, *args)
 
-        buffer = bytearray()
-        async for chunk in read_stream(self._process.stdout, size=io.DEFAULT_BUFFER_SIZE):
-            buffer.extend(chunk)
+    def _thaw(self):
+        # An instance created from a template is changed on the options its arguments are rendered from
+        if self._render_options is not None:
+            self._options = self._render_options()
+            self._arguments = None
+            self._render_options = None
 
-        return bytes(buffer)
+    async def _close_dispatcher(self):
+        if self._dispatcher is not None:
+            await self._dispatcher.close(cancel=True)
 
-    async def _handle_stderr(self) -> str:
+    async def _handle_stderr(self):
         assert self._process.stderr is not None
 
-        line = b""
-        async for line in readlines(self._process.stderr):
-            self.emit("stderr", line.decode())
+        async for lines in read_line_batches(self._process.stderr):
+            self._stderr_lines += len(lines)
+            self._stderr_tail.extend(lines)
+            self._emit_drained("stderr_lines", lines)
+
+            # Decoding every line is only worth it if someone listens to lines one by one
+            if self.listeners("stderr"):
+                for line in lines:
+                    self._emit_drained("stderr", line.decode())
+
+            if self._tracker is not None:
+                self._tracker.on_stderr(lines)
+
+            if self._dispatcher is not None:
+                await self._dispatcher.drain()
+
+    async def _handle_progress(self, pipe: IO[bytes], tracker: Tracker):
+        async for lines in read_line_batches(await open_stream_reader(pipe)):
+            tracker.on_progress(lines)
+
+            if self._dispatcher is not None:
+                await self._dispatcher.drain()
+
+    async def _abort(self, tasks: list[asyncio.Task]):
+        if self._process.returncode is None:
+            self._process.kill()
+
+        # Every task ends once FFmpeg exits, and their exceptions are superseded by the one being handled
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._process.wait()
+        await self._close_dispatcher()
 
-        return line.decode()
+    def _terminate_on_exception(self, task: asyncio.Task):
+        # Unblock the reader of the standard output as soon as any of the tasks fails
+        if not task.cancelled() and task.exception() is not None and self._process.returncode is None:
+            self._process.terminate()
 
     def _reraise_exception(self, exception: Exception):
         raise exception
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Optional, Union
+
+from ffmpeg.asyncio.ffmpeg import FFmpeg
+from ffmpeg.probe import MediaInfo, ProbeCache, default_cache, get_cache_key, prepare_ffprobe
+
+
+class FFprobe:
+    def __init__(self, executable: str = "ffprobe", cache: Optional[ProbeCache] = default_cache):
+        """Initialize an `FFprobe` instance using `asyncio`
+
+        Args:
+            executable: The path to the ffprobe executable. Defaults to "ffprobe".
+            cache: A cache to look results up in before running ffprobe.
+                Defaults to a cache in memory shared by all instances. Use None to always run ffprobe.
+        """
+        self._executable = executable
+        self._cache = cache
+
+    async def probe(self, url: Union[str, os.PathLike], timeout: Optional[float] = None) -> MediaInfo:
+        """Probe the format and the streams of a media.
+
+        Args:
+            url: URL for the media.
+            timeout: The maximum number of seconds to wait for ffprobe. Defaults to None.
+
+        Raises:
+            FFmpegError: If ffprobe process returns non-zero exit status.
+            asyncio.TimeoutError: If ffprobe process does not terminate after `timeout` seconds.
+
+        Note:
+            ```python
+            media = await FFprobe().probe("input.mp4")
+            print(media.format.duration, media.video_streams[0].width)
+            ```
+
+        Returns:
+            The format and the streams of the media.
+        """
+        key = get_cache_key(url) if self._cache is not None else None
+        if key is not None:
+            assert self._cache is not None
+
+            media = self._cache.get(key)
+            if media is not None:
+                return media
+
+        data = json.loads(await prepare_ffprobe(FFmpeg(self._executable), url).execute(timeout=timeout))
+        if key is not None:
+            assert self._cache is not None
+            return self._cache.put(key, data)
+
+        return MediaInfo.from_dict(data)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Hashable, Optional, Union
+
+from pyee.asyncio import AsyncIOEventEmitter
+
+from ffmpeg.asyncio.ffmpeg import FFmpeg
+from ffmpeg.batch import Job, ensure_job
+from ffmpeg.utils import cpu_count
+
+
+@dataclass
+class _Entry:
+    job: Job
+    tenant: Optional[Hashable]
+    future: asyncio.Future
+    task: Optional[asyncio.Task] = field(default=None)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class Scheduler(AsyncIOEventEmitter):
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        queue_size: int = 1024,
+        tenant_concurrency: Optional[int] = None,
+    ):
+        """Initialize a `Scheduler` instance, which admits `FFmpeg` jobs by priority instead of running them at once.
+
+        Args:
+            concurrency: The maximum number of jobs running at once.
+                Defaults to None, which means the number of available CPU cores.
+            queue_size: The maximum number of jobs waiting to run. When the queue is full, `submit()` waits until
+                a job leaves the queue, which applies backpressure to producers. Defaults to 1024.
+            tenant_concurrency: The maximum number of jobs of a single tenant running at once.
+                Jobs without a tenant are not limited. Defaults to None, which means no limit.
+        """
+        super().__init__()
+
+        self._concurrency = concurrency if concurrency is not None else cpu_count()
+        self._queue_size = queue_size
+        self._tenant_concurrency = tenant_concurrency
+
+        self._queue: list[tuple[int, int, _Entry]] = []
+        self._cancelled = 0
+        self._sequence = itertools.count()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self._running = 0
+        self._running_by_tenant: Counter[Hashable] = Counter()
+
+    async def submit(
+        self,
+        job: Union[FFmpeg, Job],
+        priority: int = 0,
+        tenant: Optional[Hashable] = None,
+    ) -> asyncio.Future[bytes]:
+        """Queue a job, waiting for a free slot if the queue is full.
+
+        Args:
+            job: An `FFmpeg` instance, or a `Job` to specify an input stream or a timeout.
+            priority: The priority of the job. Jobs with a lower value run first,
+                and jobs with the same priority run in the order of submission. Defaults to 0.
+            tenant: The tenant the job belongs to, which limits its concurrency by `tenant_concurrency`.
+                Defaults to None.
+
+        Note:
+            Cancelling the returned future removes the job from the queue, or kills its FFmpeg process if it is running.
+
+            ```python
+            scheduler = Scheduler(tenant_concurrency=4)
+
+            thumbnail = await scheduler.submit(thumbnail_ffmpeg, priority=0, tenant="alice")
+            transcode = await scheduler.submit(transcode_ffmpeg, priority=10, tenant="bob")
+
+            await thumbnail
+            transcode.cancel()
+            ```
+
+        Returns:
+            A future resolving to the output to the standard output, or raising the exception raised by the job.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._queue_size)
+
+        await self._slots.acquire()
+
+        entry = _Entry(ensure_job(job), tenant, asyncio.get_running_loop().create_future())
+        entry.future.add_done_callback(lambda _: self._on_done(entry))
+        heapq.heappush(self._queue, (priority, next(self._sequence), entry))
+
+        self._dispatch()
+        return entry.future
+
+    async def run(
+        self,
+        job: Union[FFmpeg, Job],
+        priority: int = 0,
+        tenant: Optional[Hashable] = None,
+    ) -> bytes:
+        """Queue a job, and wait for it to finish. See `submit()` for the arguments.
+
+        Returns:
+            The output to the standard output.
+        """
+        return await (await self.submit(job, priority=priority, tenant=tenant))
+
+    @property
+    def queued(self) -> int:
+        """The number of jobs waiting to run."""
+        return len(self._queue) - self._cancelled
+
+    @property
+    def running(self) -> int:
+        """The number of running jobs."""
+        return self._running
+
+    def _dispatch(self):
+        skipped = []
+        while self._queue and self._running < self._concurrency:
+            item = heapq.heappop(self._queue)
+            entry = item[2]
+            if entry.future.done():
+                self._cancelled -= 1
+                continue  # cancelled while queued
+
+            if (
+                entry.tenant is not None
+                and self._tenant_concurrency is not None
+                and self._running_by_tenant[entry.tenant] >= self._tenant_concurrency
+            ):
+                skipped.append(item)
+                continue
+
+            self._release_slot()
+            self.emit("admitted", entry.job, time.monotonic() - entry.queued_at)
+            self._running += 1
+            self._running_by_tenant[entry.tenant] += 1
+            entry.task = asyncio.ensure_future(self._run(entry))
+
+        for item in skipped:
+            heapq.heappush(self._queue, item)
+
+    async def _run(self, entry: _Entry):
+        try:
+            output = await entry.job.ffmpeg.execute(entry.job.stream, timeout=entry.job.timeout)  # type: ignore
+        except asyncio.CancelledError:
+            entry.future.cancel()
+        except Exception as exception:
+            if not entry.future.done():
+                entry.future.set_exception(exception)
+        else:
+            if not entry.future.done():
+                entry.future.set_result(output)
+        finally:
+            self._running -= 1
+            self._running_by_tenant[entry.tenant] -= 1
+            if self._running_by_tenant[entry.tenant] <= 0:
+                del self._running_by_tenant[entry.tenant]
+
+            self._dispatch()
+
+    def _on_done(self, entry: _Entry):
+        if not entry.future.cancelled():
+            return
+
+        if entry.task is None:
+            # The job is still queued, so its slot can be given to a producer right away
+            self._release_slot()
+            self._cancelled += 1
+            if self._cancelled * 2 > len(self._queue):
+                self._compact()
+        else:
+            entry.task.cancel()
+
+    def _compact(self):
+        # Cancelled entries are only skipped when popped, so they are dropped at once when they make up most of the heap
+        self._queue = [item for item in self._queue if not item[2].future.done()]
+        heapq.heapify(self._queue)
+        self._cancelled = 0
+
+    def _release_slot(self):
+        assert self._slots is not None
+        self._slots.release()
@@ -1,11 +1,14 @@
+from __future__ import annotations
+
 import asyncio
 import io
-import re
 import subprocess
-from typing import Any, AsyncIterable, Awaitable
+from typing import IO, Any, AsyncIterable, AsyncIterator, Awaitable, Iterable, TypeVar, Union
 
 from ffmpeg import types
-from ffmpeg.utils import is_windows
+from ffmpeg.utils import is_windows, split_lines
+
+T = TypeVar("T")
 
 
 def create_subprocess(*args: Any, **kwargs: Any) -> Awaitable[asyncio.subprocess.Process]:
@@ -23,12 +26,29 @@ def ensure_stream_reader(stream: types.AsyncStream) -> asyncio.StreamReader:
         return stream
 
     reader = asyncio.StreamReader()
-    reader.feed_data(stream)
+    reader.feed_data(stream if isinstance(stream, bytes) else stream.read())
     reader.feed_eof()
 
     return reader
 
 
+async def ensure_async_iterator(iterable: Union[Iterable[T], AsyncIterable[T]]) -> AsyncIterator[T]:
+    if isinstance(iterable, AsyncIterable):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+async def open_stream_reader(pipe: IO[bytes]) -> asyncio.StreamReader:
+    # The transport takes the ownership of the pipe, and closes it when it reaches the end of file
+    reader = asyncio.StreamReader()
+    await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+
+    return reader
+
+
 async def read_stream(stream: asyncio.StreamReader, size: int = -1) -> AsyncIterable[bytes]:
     while not stream.at_eof():
         chunk = await stream.read(size)
@@ -38,18 +58,13 @@ async def read_stream(stream: asyncio.StreamReader, size: int = -1) -> AsyncIter
         yield chunk
 
 
-async def readlines(stream: asyncio.StreamReader) -> AsyncIterable[bytes]:
-    pattern = re.compile(rb"[\r\n]+")
-
+async def read_line_batches(stream: asyncio.StreamReader) -> AsyncIterable[list[bytes]]:
+    # Lines are handed over in batches of everything read at once, rather than one by one
     buffer = bytearray()
     async for chunk in read_stream(stream, io.DEFAULT_BUFFER_SIZE):
-        buffer.extend(chunk)
-
-        lines = pattern.split(buffer)
-        buffer[:] = lines.pop(-1)  # keep the last line that could be partial
-
-        for line in lines:
-            yield line
+        lines = split_lines(buffer, chunk)
+        if lines:
+            yield lines
 
     if buffer:
-        yield bytes(buffer)
+        yield [bytes(buffer)]
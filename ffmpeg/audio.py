@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import io
+import re
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# The report comes long before this much output, so a longer wait means it is never coming.
+# Holding the output any longer would buffer the whole stream in memory.
+MAX_PENDING_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SampleFormat:
+    """Describes how a sample of a PCM format is laid out in memory.
+
+    Attributes:
+        dtype: The NumPy data type of each sample.
+        itemsize: The number of bytes in each sample.
+    """
+
+    dtype: str
+    itemsize: int
+
+
+# Formats of interleaved PCM samples which can be represented as a single array
+_sample_formats = {
+    "u8": SampleFormat("u1", 1),
+    "s8": SampleFormat("i1", 1),
+    "s16le": SampleFormat("<i2", 2),
+    "s32le": SampleFormat("<i4", 4),
+    "f32le": SampleFormat("<f4", 4),
+    "f64le": SampleFormat("<f8", 8),
+}
+
+# Reference: https://github.com/FFmpeg/FFmpeg/blob/release/6.1/libavutil/channel_layout.c
+_channel_layouts = {
+    "mono": 1,
+    "stereo": 2,
+    "2.1": 3,
+    "3.0": 3,
+    "3.0(back)": 3,
+    "4.0": 4,
+    "quad": 4,
+    "quad(side)": 4,
+    "3.1": 4,
+    "4.1": 5,
+    "5.0": 5,
+    "5.0(side)": 5,
+    "5.1": 6,
+    "5.1(side)": 6,
+    "6.0": 6,
+    "6.0(front)": 6,
+    "hexagonal": 6,
+    "6.1": 7,
+    "6.1(back)": 7,
+    "6.1(front)": 7,
+    "7.0": 7,
+    "7.0(front)": 7,
+    "7.1": 8,
+    "7.1(wide)": 8,
+    "7.1(wide-side)": 8,
+    "octagonal": 8,
+}
+
+# Reference: https://github.com/FFmpeg/FFmpeg/blob/release/6.1/libavformat/dump.c
+_channels_pattern = re.compile(r"Stream #\d+:\d+.*: Audio: .*?, \d+ Hz, ([^,]+)")
+_unknown_layout_pattern = re.compile(r"(\d+) channels")
+
+
+def get_sample_format(sample_fmt: str) -> SampleFormat:
+    if sample_fmt not in _sample_formats:
+        raise ValueError(f"Unsupported sample format: {sample_fmt} (supported: {', '.join(_sample_formats)})")
+
+    return _sample_formats[sample_fmt]
+
+
+def parse_channel_layout(layout: str) -> Optional[int]:
+    if layout in _channel_layouts:
+        return _channel_layouts[layout]
+
+    match = _unknown_layout_pattern.fullmatch(layout)
+    if match is not None:
+        return int(match.group(1))
+
+    return None
+
+
+class AudioChannels:
+    """Finds the number of channels of the first audio stream of the output from lines of the standard error."""
+
+    def __init__(self, channels: Optional[int] = None):
+        self.channels = channels
+        self._output = False
+
+    def on_stderr(self, line: str):
+        if self.channels is not None:
+            return
+
+        if line.startswith("Output #"):
+            self._output = True
+        elif self._output:
+            match = _channels_pattern.search(line)
+            if match is not None:
+                self.channels = parse_channel_layout(match.group(1).strip())
+
+
+def read_blocks(
+    stream: IO[bytes],
+    audio_channels: AudioChannels,
+    sample_format: SampleFormat,
+    samples: int,
+    overlap: int,
+    buffers: int,
+    drop_last: bool,
+) -> Iterator[np.ndarray]:
+    import numpy as np
+
+    # FFmpeg reports the layout of the output before writing any sample,
+    # but the report may be read after some samples, so hold them until the number of channels is known
+    pending = bytearray()
+    while audio_channels.channels is None:
+        chunk = stream.read(io.DEFAULT_BUFFER_SIZE)
+        if not chunk:
+            if pending:
+                raise ValueError("Could not find the number of channels. Specify channels, or use -loglevel info")
+            return
+
+        pending.extend(chunk)
+        if len(pending) > MAX_PENDING_SIZE:
+            raise ValueError("Could not find the number of channels. Specify channels, or use -loglevel info")
+
+    channels = audio_channels.channels
+    frame_size = channels * sample_format.itemsize
+    block_size = samples * frame_size
+    overlap_size = overlap * frame_size
+
+    # Every block is read into a ring of preallocated buffers, which are exposed as arrays created only once
+    ring = [bytearray(block_size) for _ in range(buffers)]
+    views = [memoryview(buffer) for buffer in ring]
+    blocks = [np.frombuffer(buffer, dtype=sample_format.dtype).reshape(samples, channels) for buffer in ring]
+
+    index = 0
+    carried = 0
+    while True:
+        view = views[index]
+
+        filled = carried + min(len(pending), block_size - carried)
+        if filled > carried:
+            view[carried:filled] = pending[: filled - carried]
+            del pending[: filled - carried]
+
+        while filled < block_size:
+            length = stream.readinto(view[filled:])
+            if not length:
+                break
+
+            filled += length
+
+        if filled < block_size:
+            # Only whole samples of the last block are yielded, and only if it has any new sample
+            filled -= filled % frame_size
+            if filled > carried and not drop_last:
+                yield blocks[index][: filled // frame_size]
+            return
+
+        yield blocks[index]
+
+        # The tail of a block becomes the head of the next one
+        next_index = (index + 1) % buffers
+        if overlap_size > 0:
+            views[next_index][:overlap_size] = view[block_size - overlap_size :]
+
+        index = next_index
+        carried = overlap_size
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional, Union
+
+from pyee import EventEmitter
+
+from ffmpeg.ffmpeg import FFmpeg
+from ffmpeg.progress import Progress
+from ffmpeg.protocol import FFmpegProtocol
+from ffmpeg.utils import cpu_count
+
+
+@dataclass(frozen=True)
+class Job:
+    """Represents a job to be run by a batch runner.
+
+    Attributes:
+        ffmpeg: An `FFmpeg` instance to execute.
+        stream: A stream to input to the standard input.
+        timeout: The maximum number of seconds to wait for the job.
+    """
+
+    ffmpeg: FFmpegProtocol
+    stream: Optional[Any] = None
+    timeout: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class BatchProgress:
+    """Represents a progress of a batch of `FFmpeg` operations.
+
+    Attributes:
+        total: The number of jobs in the batch.
+        running: The number of running jobs.
+        completed: The number of successfully completed jobs.
+        failed: The number of failed jobs.
+        frame: The number of frames processed by all jobs.
+        speed: The sum of the processing speeds of the running jobs.
+    """
+
+    total: int
+    running: int
+    completed: int
+    failed: int
+    frame: int
+    speed: float
+
+
+def ensure_job(job: Union[FFmpegProtocol, Job]) -> Job:
+    if isinstance(job, Job):
+        return job
+
+    return Job(job)
+
+
+def plan(concurrency: Optional[int], threads: Optional[int]) -> tuple[int, int]:
+    # Split the available CPU cores across the jobs running at once, so that the machine is never oversubscribed
+    cores = cpu_count()
+    if concurrency is None:
+        concurrency = cores
+    if threads is None:
+        threads = max(1, cores // concurrency)
+
+    return concurrency, threads
+
+
+class BatchTracker:
+    def __init__(self, emitter: Any, jobs: list[Job], threads: int):
+        self._emitter = emitter
+        self._lock = threading.Lock()
+
+        # Every job is queued when the batch starts running
+        self._jobs = jobs
+        self._queued_at = time.monotonic()
+
+        self._total = len(jobs)
+        self._running: set[int] = set()
+        self._completed = 0
+        self._failed = 0
+        self._progress: dict[int, Progress] = {}
+
+        # Totals are updated by the difference every report makes, so that a report costs the same however many jobs
+        self._frame = 0
+        self._speed = 0.0
+
+        for index, job in enumerate(jobs):
+            job.ffmpeg.setdefault("threads", threads)
+            job.ffmpeg.on("progress", self._create_listener(index))
+
+    def start(self, index: int):
+        self._emitter.emit("admitted", self._jobs[index], time.monotonic() - self._queued_at)
+
+        with self._lock:
+            self._running.add(index)
+            if index in self._progress:
+                self._speed += self._progress[index].speed
+
+        self._emit()
+
+    def finish(self, index: int, failed: bool):
+        with self._lock:
+            if index in self._running:
+                self._running.discard(index)
+                if index in self._progress:
+                    self._speed -= self._progress[index].speed
+                if not self._running:
+                    self._speed = 0.0  # rounding errors never outlive the running jobs
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+        self._emit()
+
+    def _create_listener(self, index: int):
+        def on_progress(progress: Progress):
+            with self._lock:
+                previous = self._progress.get(index)
+                self._progress[index] = progress
+
+                self._frame += progress.frame - (previous.frame if previous is not None else 0)
+                if index in self._running:
+                    self._speed += progress.speed - (previous.speed if previous is not None else 0.0)
+
+            self._emit()
+
+        return on_progress
+
+    def _emit(self):
+        with self._lock:
+            progress = BatchProgress(
+                total=self._total,
+                running=len(self._running),
+                completed=self._completed,
+                failed=self._failed,
+                frame=self._frame,
+                speed=self._speed,
+            )
+
+        self._emitter.emit("progress", progress)
+
+
+class BatchRunner(EventEmitter):
+    def __init__(self, concurrency: Optional[int] = None, threads: Optional[int] = None):
+        """Initialize a `BatchRunner` instance, which runs many `FFmpeg` jobs with bounded concurrency.
+
+        Args:
+            concurrency: The maximum number of jobs running at once.
+                Defaults to None, which means the number of available CPU cores.
+            threads: The number of threads each job may use, passed as `-threads` to every input and output file
+                which does not specify it. Defaults to None, which means the available CPU cores divided by `concurrency`.
+        """
+        super().__init__()
+
+        self._concurrency, self._threads = plan(concurrency, threads)
+
+    def run(self, jobs: Iterable[Union[FFmpeg, Job]]) -> list[Union[bytes, Exception]]:
+        """Run jobs, at most `concurrency` at once, and wait for all of them.
+
+        Args:
+            jobs: `FFmpeg` instances, or `Job`s to specify an input stream or a timeout for each of them.
+
+        Note:
+            ```python
+            runner = BatchRunner()
+
+            @runner.on("progress")
+            def on_progress(progress: BatchProgress):
+                print(f"{progress.completed + progress.failed}/{progress.total}")
+
+            results = runner.run(FFmpeg().input(path).output(path.with_suffix(".mp4")) for path in paths)
+            ```
+
+        Returns:
+            For each job in order, the output to the standard output, or the exception raised by the job.
+        """
+        jobs = [ensure_job(job) for job in jobs]
+        tracker = BatchTracker(self, jobs, self._threads)
+
+        def run(index: int, job: Job) -> bytes:
+            tracker.start(index)
+            try:
+                output = job.ffmpeg.execute(job.stream, timeout=job.timeout)  # type: ignore
+            except BaseException:
+                tracker.finish(index, failed=True)
+                raise
+
+            tracker.finish(index, failed=False)
+            return output
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._concurrency) as executor:
+            futures = [executor.submit(run, index, job) for index, job in enumerate(jobs)]
+
+        return [future.exception() or future.result() for future in futures]  # type: ignore
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Iterable, Optional, Type, Union
+
+from ffmpeg.errors import FFmpegError, FFmpegInvalidCommand, FFmpegUnsupportedCodec
+from ffmpeg.options import Option, Options
+from ffmpeg.protocol import FFmpegProtocol
+
+# Bump whenever the parsers change, so that stale entries on disk are never read
+_CACHE_VERSION = 1
+
+# References:
+# - https://github.com/FFmpeg/FFmpeg/blob/release/6.1/fftools/opt_common.c
+# - https://github.com/FFmpeg/FFmpeg/blob/release/6.1/fftools/cmdutils.c
+_version_pattern = re.compile(r"^\S+ version (\S+)")
+_codec_pattern = re.compile(r"^ [VASD.][F.][S.][X.][B.][D.] (\S+)", flags=re.MULTILINE)
+_filter_pattern = re.compile(r"^ [T.][S.][C.] (\S+)", flags=re.MULTILINE)
+_format_pattern = re.compile(r"^ [D ][E ][d ] (\S+)", flags=re.MULTILINE)
+_pixel_format_pattern = re.compile(r"^[I.][O.][H.][P.][B.] (\S+)", flags=re.MULTILINE)
+_option_pattern = re.compile(r"^\s*-([A-Za-z0-9_]+)", flags=re.MULTILINE)
+
+# Options which are accepted but never listed by `-h`
+_hidden_options = {"i", "s"}
+
+_codec_options = {"c", "codec", "vcodec", "acodec", "scodec", "dcodec"}
+_filter_options = {"filter", "vf", "af", "filter_complex", "lavfi"}
+
+# Labels such as `[0:v]` and instance names such as `scale@main` are not part of the name of a filter
+_filter_graph_pattern = re.compile(r"(?:\[[^\]]*\]\s*)*([A-Za-z0-9_]+)(?:@[A-Za-z0-9_]+)?")
+
+
+def _parse(pattern: re.Pattern[str], output: str) -> list[str]:
+    names: list[str] = []
+    for name in pattern.findall(output):
+        if name != "=":  # legends share the layout of entries
+            names.extend(name.split(","))
+
+    return names
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_filter_names(filter_graph: str) -> tuple[str, ...]:
+    # Arguments of filters may contain separators when quoted or escaped, so leave such graphs to FFmpeg
+    if "'" in filter_graph or "\\" in filter_graph:
+        return ()
+
+    names = []
+    for chain in filter_graph.split(";"):
+        for description in chain.split(","):
+            match = _filter_graph_pattern.match(description.strip())
+            if match is not None:
+                names.append(match.group(1))
+
+    return tuple(names)
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """Represents what an FFmpeg executable supports.
+
+    Attributes:
+        version: The version of FFmpeg.
+        encoders: The names of available encoders.
+        decoders: The names of available decoders.
+        filters: The names of available filters.
+        muxers: The names of available output formats.
+        demuxers: The names of available input formats.
+        pix_fmts: The names of available pixel formats.
+        options: The names of available options, including private options of codecs, formats and filters.
+    """
+
+    version: str
+    encoders: frozenset[str]
+    decoders: frozenset[str]
+    filters: frozenset[str]
+    muxers: frozenset[str]
+    demuxers: frozenset[str]
+    pix_fmts: frozenset[str]
+    options: frozenset[str]
+
+    @classmethod
+    def from_outputs(cls, outputs: dict[str, str]) -> Capabilities:
+        match = _version_pattern.search(outputs["version"])
+
+        return cls(
+            version=match.group(1) if match is not None else "",
+            encoders=frozenset(_parse(_codec_pattern, outputs["encoders"])),
+            decoders=frozenset(_parse(_codec_pattern, outputs["decoders"])),
+            filters=frozenset(_parse(_filter_pattern, outputs["filters"])),
+            muxers=frozenset(_parse(_format_pattern, outputs["muxers"])),
+            demuxers=frozenset(_parse(_format_pattern, outputs["demuxers"])),
+            pix_fmts=frozenset(_parse(_pixel_format_pattern, outputs["pix_fmts"])),
+            options=frozenset(_parse(_option_pattern, outputs["help"]) + _parse(_option_pattern, outputs["full_help"])),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Capabilities:
+        return cls(**{key: value if key == "version" else frozenset(value) for key, value in data.items()})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {key: value if key == "version" else sorted(value) for key, value in asdict(self).items()}
+
+    def validate(self, target: Union[FFmpegProtocol, Options]):
+        """Check that every option, codec, format, filter and pixel format used by `target` is available,
+           without executing FFmpeg.
+
+        Args:
+            target: An `FFmpeg` instance, or its `Options`.
+
+        Raises:
+            FFmpegUnsupportedCodec: If an encoder or a decoder is not available.
+            FFmpegInvalidCommand: If an option, a format, a filter or a pixel format is not available.
+
+        Note:
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("output.mp4", vcodec="libx264")
+            get_capabilities().validate(ffmpeg)
+            ffmpeg.execute()
+            ```
+        """
+        if isinstance(target, Options):
+            options = target
+        elif getattr(target, "_render_options", None) is not None:
+            # An instance created from a template is validated on the options its arguments are rendered from
+            options = target._render_options()  # type: ignore
+        else:
+            options = target._options  # type: ignore
+
+        files = [
+            (options._global_options, None),
+            *((input_file.options, False) for input_file in options._input_files),
+            *((output_file.options, True) for output_file in options._output_files),
+        ]
+        for file_options, output in files:
+            error = self._find_error(file_options, output)
+            if error is not None:
+                error_class, message = error
+                raise error_class(message, arguments=list(options.build()))
+
+    def _find_error(self, options: Iterable[Option], output: Optional[bool]) -> Optional[tuple[Type[FFmpegError], str]]:
+        for option in options:
+            # Strip stream specifiers such as `c:v:0` and the prefix reading the value from a file such as `/filter`
+            name = option.key.split(":", 1)[0].lstrip("/")
+            if not self._has_option(name):
+                return FFmpegInvalidCommand, f"Unrecognized option '{option.key}'"
+
+            if option.value is None or option.key.startswith("/"):
+                continue
+
+            value = str(option.value)
+            if name in _codec_options and value != "copy" and output is not None:
+                if value not in (self.encoders if output else self.decoders):
+                    return FFmpegUnsupportedCodec, f"Unknown {'encoder' if output else 'decoder'} '{value}'"
+            elif name == "f" and output is not None:
+                if value not in (self.muxers if output else self.demuxers):
+                    return FFmpegInvalidCommand, f"Unknown format '{value}'"
+            elif name == "pix_fmt":
+                if value.lstrip("+") not in self.pix_fmts:
+                    return FFmpegInvalidCommand, f"Unknown pixel format '{value}'"
+            elif name in _filter_options:
+                for filter_name in _get_filter_names(value):
+                    if filter_name not in self.filters:
+                        return FFmpegInvalidCommand, f"No such filter: '{filter_name}'"
+
+        return None
+
+    def _has_option(self, name: str) -> bool:
+        if name in self.options or name in _hidden_options:
+            return True
+
+        # Boolean options can be negated with the `no` prefix
+        return name.startswith("no") and name[2:] in self.options
+
+
+_queries = {
+    "version": ["-version"],
+    "encoders": ["-hide_banner", "-encoders"],
+    "decoders": ["-hide_banner", "-decoders"],
+    "filters": ["-hide_banner", "-filters"],
+    "muxers": ["-hide_banner", "-muxers"],
+    "demuxers": ["-hide_banner", "-demuxers"],
+    "pix_fmts": ["-hide_banner", "-pix_fmts"],
+    "help": ["-hide_banner", "-h"],
+    "full_help": ["-hide_banner", "-h", "full"],
+}
+
+
+def _identify(executable: str) -> tuple[str, tuple[Any, ...]]:
+    path = shutil.which(executable)
+    if path is None:
+        raise FileNotFoundError(f"{executable} is not found")
+
+    # Upgrading or replacing the executable changes at least one of these
+    stat = os.stat(path)
+    return path, (os.path.realpath(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+@functools.lru_cache(maxsize=64)
+def _query_version(path: str, key: tuple[Any, ...]) -> str:
+    completed = subprocess.run([path, *_queries["version"]], stdin=subprocess.DEVNULL, capture_output=True)
+    match = _version_pattern.search(completed.stdout.decode(errors="replace"))
+    return match.group(1) if match is not None else ""
+
+
+def get_cache_directory() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "python-ffmpeg")
+
+
+class CapabilityRegistry:
+    def __init__(self, directory: Optional[Union[str, os.PathLike]] = None, persist: bool = True):
+        """Initialize a `CapabilityRegistry` instance, which finds what FFmpeg executables support.
+           FFmpeg is queried only once per executable, and results are reused until the executable changes.
+
+        Args:
+            directory: The directory to persist results to. Defaults to None, which means `$XDG_CACHE_HOME/python-ffmpeg`
+                as of when results are persisted.
+            persist: Whether to persist results, so that they survive the process. Use False to only keep results
+                in memory. Defaults to True.
+        """
+        self._directory = os.fspath(directory) if directory is not None else None
+        self._persist = persist
+
+        self._capabilities: dict[tuple[Any, ...], Capabilities] = {}
+        self._lock = threading.Lock()
+
+    def get(self, executable: str = "ffmpeg") -> Capabilities:
+        """Return what an FFmpeg executable supports.
+
+        Args:
+            executable: The path to the ffmpeg executable. Defaults to "ffmpeg".
+
+        Raises:
+            FileNotFoundError: If the executable is not found.
+
+        Returns:
+            What the executable supports.
+        """
+        path, key = _identify(executable)
+
+        with self._lock:
+            capabilities = self._capabilities.get(key)
+            if capabilities is not None:
+                return capabilities
+
+            capabilities = self._load(key)
+            if capabilities is None:
+                outputs = {name: self._query(path, arguments) for name, arguments in _queries.items()}
+                capabilities = Capabilities.from_outputs(outputs)
+                self._store(key, capabilities)
+
+            self._capabilities[key] = capabilities
+            return capabilities
+
+    def _query(self, path: str, arguments: list[str]) -> str:
+        completed = subprocess.run([path, *arguments], stdin=subprocess.DEVNULL, capture_output=True)
+        return completed.stdout.decode(errors="replace")
+
+    def _get_directory(self) -> str:
+        # The environment may change after the registry is created, such as in tests or after `os.environ` is set up
+        return self._directory if self._directory is not None else get_cache_directory()
+
+    def _get_path(self, directory: str, key: tuple[Any, ...]) -> str:
+        digest = hashlib.sha256(json.dumps([_CACHE_VERSION, *key]).encode()).hexdigest()
+        return os.path.join(directory, f"capabilities-{digest}.json")
+
+    def _load(self, key: tuple[Any, ...]) -> Optional[Capabilities]:
+        if not self._persist:
+            return None
+
+        try:
+            with open(self._get_path(self._get_directory(), key), "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get("key") != [_CACHE_VERSION, *key]:
+            return None
+
+        return Capabilities.from_dict(entry["data"])
+
+    def _store(self, key: tuple[Any, ...], capabilities: Capabilities):
+        if not self._persist:
+            return
+
+        # The cache is only an optimization, so an unwritable directory must not break validation
+        directory = self._get_directory()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as file:
+                json.dump({"key": [_CACHE_VERSION, *key], "data": capabilities.to_dict()}, file)
+            os.replace(file.name, self._get_path(directory, key))
+        except OSError:
+            pass
+
+
+default_registry = CapabilityRegistry()
+
+
+def get_capabilities(executable: str = "ffmpeg") -> Capabilities:
+    """Return what an FFmpeg executable supports, using a registry shared by the whole process.
+
+    Args:
+        executable: The path to the ffmpeg executable. Defaults to "ffmpeg".
+
+    Raises:
+        FileNotFoundError: If the executable is not found.
+
+    Returns:
+        What the executable supports.
+    """
+    return default_registry.get(executable)
+
+
+def get_version(executable: str = "ffmpeg") -> str:
+    """Return the version of an FFmpeg executable, such as `7.0.2`, or `N-113684-g...` for a development build.
+       Unlike `get_capabilities()`, only `ffmpeg -version` is queried, once per executable.
+
+    Args:
+        executable: The path to the ffmpeg executable. Defaults to "ffmpeg".
+
+    Raises:
+        FileNotFoundError: If the executable is not found.
+
+    Returns:
+        The version of the executable, or an empty string if it could not be found.
+    """
+    path, key = _identify(executable)
+    return _query_version(path, key)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Optional
+
+from ffmpeg import types
+
+
+@dataclass
+class DispatchMetrics:
+    """Represents how events of `FFmpeg` have been delivered to listeners by a dispatcher.
+
+    Attributes:
+        dispatched: The number of events delivered to listeners.
+        dropped: The number of events discarded because the queue was full.
+        coalesced: The number of `progress` events replaced by a later one before being delivered.
+        lag: The number of seconds the last delivered event waited in the queue.
+        max_lag: The longest number of seconds an event waited in the queue.
+    """
+
+    dispatched: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    lag: float = 0.0
+    max_lag: float = 0.0
+
+
+class EventQueue:
+    """A bounded queue of events, which applies `policy` to events arriving while it is full.
+
+    - `block`: The producer has to wait until there is room, which is left to the caller through `accepts()`.
+    - `drop_oldest`: The oldest event is discarded to make room.
+    - `drop_newest`: The arriving event is discarded.
+    - `coalesce`: A `progress` event replaces the one still waiting, if any, since only the latest progress matters.
+      Any other event is handled as with `block`.
+
+    It is not thread-safe, so it has to be guarded by the caller.
+    """
+
+    def __init__(self, capacity: int, policy: types.DispatchPolicy):
+        if capacity < 1:
+            raise ValueError("The capacity of a queue must be positive")
+
+        self._capacity = capacity
+        self._policy = policy
+
+        # Entries are lists of the event, its arguments and the time it was queued, so that they can be updated in place
+        self._entries: collections.deque[list[Any]] = collections.deque()
+        self._progress: Optional[list[Any]] = None
+
+        self.metrics = DispatchMetrics()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def accepts(self, event: Optional[str] = None) -> bool:
+        if len(self._entries) < self._capacity or self._policy in ("drop_oldest", "drop_newest"):
+            return True
+
+        return self._coalesces(event)
+
+    def put(self, event: str, args: tuple[Any, ...]):
+        if self._coalesces(event):
+            assert self._progress is not None
+
+            # The waiting progress keeps its position, so that it is not postponed by every update
+            self._progress[1] = args
+            self.metrics.coalesced += 1
+            return
+
+        if len(self._entries) >= self._capacity:
+            if self._policy == "drop_newest":
+                self.metrics.dropped += 1
+                return
+
+            if self._policy == "drop_oldest":
+                if self._entries.popleft() is self._progress:
+                    self._progress = None
+                self.metrics.dropped += 1
+
+        entry = [event, args, time.monotonic()]
+        self._entries.append(entry)
+        if event == "progress":
+            self._progress = entry
+
+    def get(self) -> tuple[str, tuple[Any, ...]]:
+        entry = self._entries.popleft()
+        if entry is self._progress:
+            self._progress = None
+
+        event, args, queued_at = entry
+        lag = time.monotonic() - queued_at
+
+        self.metrics.dispatched += 1
+        self.metrics.lag = lag
+        self.metrics.max_lag = max(self.metrics.max_lag, lag)
+
+        return event, args
+
+    def clear(self):
+        self._entries.clear()
+        self._progress = None
+
+    def _coalesces(self, event: Optional[str]) -> bool:
+        return self._policy == "coalesce" and event == "progress" and self._progress is not None
+
+
+class Dispatcher:
+    """Delivers events to listeners on a dedicated thread, so that slow listeners never stop the pipes of FFmpeg
+    from being drained.
+
+    An exception raised by a listener is raised again by the next `put()`, which aborts the execution,
+    and by `close()`.
+    """
+
+    def __init__(self, emit: Callable[..., Any], capacity: int, policy: types.DispatchPolicy):
+        self._emit = emit
+        self._queue = EventQueue(capacity, policy)
+
+        self._condition = threading.Condition()
+        self._closed = False
+        self._exception: Optional[BaseException] = None
+
+        self._thread = threading.Thread(target=self._run, name="ffmpeg-dispatcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def metrics(self) -> DispatchMetrics:
+        with self._condition:
+            return replace(self._queue.metrics)
+
+    def put(self, event: str, *args: Any):
+        with self._condition:
+            while self._exception is None and not self._queue.accepts(event):
+                self._condition.wait()
+
+            if self._exception is not None:
+                raise self._exception
+
+            self._queue.put(event, args)
+            self._condition.notify_all()
+
+    def close(self, cancel: bool = False):
+        """Wait until every queued event is delivered, and stop the thread.
+
+        Args:
+            cancel: Whether to discard queued events instead, without raising exceptions of listeners.
+                Defaults to False.
+        """
+        with self._condition:
+            self._closed = True
+            if cancel:
+                self._queue.clear()
+            self._condition.notify_all()
+
+        self._thread.join()
+
+        if self._exception is not None and not cancel:
+            raise self._exception
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+
+                if not self._queue:
+                    return
+
+                event, args = self._queue.get()
+                self._condition.notify_all()
+
+            try:
+                self._emit(event, *args)
+            except BaseException as exception:
+                with self._condition:
+                    self._exception = exception
+                    self._queue.clear()
+                    self._condition.notify_all()
+                return
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import os
+import selectors
+import subprocess
+import time
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+from ffmpeg.utils import read_line_batches, split_lines, wait_process, write_all
+
+
+def _is_open(pipe: Optional[IO[bytes]]) -> bool:
+    return pipe is not None and not pipe.closed
+
+
+class Engine:
+    """Drives the pipes of a running FFmpeg process.
+
+    An engine writes chunks to the standard input, hands batches of lines from the standard error to `on_stderr`,
+    and enforces `timeout`. Batches of lines from any other pipe in `readers`, such as the one `-progress` writes to,
+    are handed to its callback. A batch holds all complete lines read at once, so that callbacks are not invoked
+    for every line. The standard output is read by the consumer through `read()` and `readinto()`,
+    so that an engine can be passed wherever a binary stream is expected.
+
+    An engine also counts the bytes moved through the pipes, and reaps the process to find the resources it used.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen[bytes],
+        stdin: Optional[Iterable[Any]],
+        on_stderr: Callable[[list[bytes]], None],
+        timeout: Optional[float] = None,
+        readers: Optional[dict[IO[bytes], Callable[[list[bytes]], None]]] = None,
+    ):
+        self._process = process
+        self._stdin = stdin
+        self._on_stderr = on_stderr
+        self._timeout = timeout
+        self._readers = readers if readers is not None else {}
+
+        self.stdin_bytes = 0
+        self.stdout_bytes = 0
+        self.first_byte_at: Optional[float] = None
+        self.rusage: Optional[Any] = None
+
+    def read(self, size: int = -1) -> bytes:
+        raise NotImplementedError()
+
+    def readinto(self, buffer: Any) -> int:
+        raise NotImplementedError()
+
+    def wait(self):
+        """Wait for the process to exit after the standard output has been consumed.
+
+        Raises:
+            subprocess.TimeoutExpired: If the process does not exit after `timeout` seconds.
+        """
+        raise NotImplementedError()
+
+    def abort(self, kill: bool = False):
+        """Stop the process, and release all pipes.
+
+        Args:
+            kill: Whether to kill the process instead of terminating it. Defaults to False.
+        """
+        raise NotImplementedError()
+
+    def _count_stdout(self, length: int):
+        if length and self.first_byte_at is None:
+            self.first_byte_at = time.monotonic()
+
+        self.stdout_bytes += length
+
+
+class SelectorEngine(Engine):
+    """An engine multiplexing all pipes in the calling thread using non-blocking I/O.
+
+    Pipes are only serviced while the consumer is waiting for the standard output or for the process to exit.
+    Since selectors do not support pipes on Windows, it is only available on POSIX.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen[bytes],
+        stdin: Optional[Iterable[Any]],
+        on_stderr: Callable[[list[bytes]], None],
+        timeout: Optional[float] = None,
+        readers: Optional[dict[IO[bytes], Callable[[list[bytes]], None]]] = None,
+    ):
+        super().__init__(process, stdin, on_stderr, timeout, readers)
+
+        self._deadline = time.monotonic() + timeout if timeout is not None else None
+        self._selector = selectors.DefaultSelector()
+
+        self._chunks: Optional[Iterator[Any]] = iter(stdin) if stdin is not None else None
+        self._pending = memoryview(b"")
+
+        # Every line-oriented pipe keeps the partial line read from it so far
+        self._lines: dict[IO[bytes], tuple[Callable[[list[bytes]], None], bytearray]] = {}
+        if process.stderr is not None:
+            self._lines[process.stderr] = (self._on_stderr, bytearray())
+        for pipe, callback in self._readers.items():
+            self._lines[pipe] = (callback, bytearray())
+
+        for pipe, events in (
+            (process.stdin, selectors.EVENT_WRITE),
+            (process.stdout, selectors.EVENT_READ),
+            *((pipe, selectors.EVENT_READ) for pipe in self._lines),
+        ):
+            if pipe is not None:
+                os.set_blocking(pipe.fileno(), False)
+                self._selector.register(pipe, events)
+
+    def read(self, size: int = -1) -> bytes:
+        assert self._process.stdout is not None
+
+        # Service the other pipes even if the standard output never runs dry
+        self._poll(block=False)
+        while True:
+            chunk = self._process.stdout.read(size)
+            if chunk is not None:
+                self._count_stdout(len(chunk))
+                return chunk
+
+            self._poll()
+
+    def readinto(self, buffer: Any) -> int:
+        assert self._process.stdout is not None
+
+        self._poll(block=False)
+        while True:
+            length = self._process.stdout.readinto(buffer)
+            if length is not None:
+                self._count_stdout(length)
+                return length
+
+            self._poll()
+
+    def wait(self):
+        self._close(self._process.stdout)
+
+        while _is_open(self._process.stdin) or any(_is_open(pipe) for pipe in self._lines):
+            self._poll()
+
+        self._close_selector()
+        self.rusage = wait_process(self._process, self._remaining())
+
+    def abort(self, kill: bool = False):
+        # Closing the pipes first makes sure FFmpeg is not blocked on any of them
+        for pipe in (self._process.stdin, self._process.stdout, *self._lines):
+            self._close(pipe)
+        self._close_selector()
+
+        if kill:
+            self._process.kill()
+        else:
+            self._process.terminate()
+        self._process.wait()
+
+    def _remaining(self) -> Optional[float]:
+        if self._deadline is None:
+            return None
+
+        remaining = self._deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(self._process.args, self._timeout)  # type: ignore
+
+        return remaining
+
+    def _poll(self, block: bool = True):
+        remaining = self._remaining()
+        for key, _ in self._selector.select(remaining if block else 0):
+            if key.fileobj is self._process.stdin:
+                self._write_stdin()
+            elif key.fileobj in self._lines:
+                self._read_lines(key.fileobj)  # type: ignore
+
+    def _write_stdin(self):
+        assert self._process.stdin is not None and self._chunks is not None
+
+        while True:
+            if not self._pending:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    self._close(self._process.stdin)
+                    return
+
+                self._pending = memoryview(chunk).cast("B")
+
+            written = self._process.stdin.write(self._pending)
+            if written is None:
+                return
+
+            self._pending = self._pending[written:]
+            self.stdin_bytes += written
+
+    def _read_lines(self, pipe: IO[bytes]):
+        callback, buffer = self._lines[pipe]
+
+        chunk = pipe.read(io.DEFAULT_BUFFER_SIZE)
+        if chunk is None:
+            return
+
+        if not chunk:
+            self._close(pipe)
+            if buffer:
+                callback([bytes(buffer)])
+            return
+
+        lines = split_lines(buffer, chunk)
+        if lines:
+            callback(lines)
+
+    def _close(self, pipe: Optional[IO[bytes]]):
+        if not _is_open(pipe):
+            return
+
+        assert pipe is not None
+        if self._selector.get_map() is not None:
+            self._selector.unregister(pipe)
+        pipe.close()
+
+    def _close_selector(self):
+        if self._selector.get_map() is not None:
+            self._selector.close()
+
+
+class ThreadEngine(Engine):
+    """An engine servicing the standard input, the standard error and the timeout on worker threads.
+
+    It is used where `SelectorEngine` is not available.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen[bytes],
+        stdin: Optional[Iterable[Any]],
+        on_stderr: Callable[[list[bytes]], None],
+        timeout: Optional[float] = None,
+        readers: Optional[dict[IO[bytes], Callable[[list[bytes]], None]]] = None,
+    ):
+        super().__init__(process, stdin, on_stderr, timeout, readers)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=3 + len(self._readers))
+        self._futures = [
+            self._executor.submit(self._handle_stderr),
+            self._executor.submit(self._wait_process, timeout),
+        ]
+        if stdin is not None:
+            self._futures.append(self._executor.submit(self._write_stdin, stdin))
+        for pipe, callback in self._readers.items():
+            self._futures.append(self._executor.submit(self._read_lines, pipe, callback))
+
+        for future in self._futures:
+            future.add_done_callback(self._terminate_on_exception)
+
+    def read(self, size: int = -1) -> bytes:
+        assert self._process.stdout is not None
+
+        chunk = self._process.stdout.read(size)
+        self._count_stdout(len(chunk))
+        return chunk
+
+    def readinto(self, buffer: Any) -> int:
+        assert self._process.stdout is not None
+
+        length = self._process.stdout.readinto(buffer)
+        self._count_stdout(length)
+        return length
+
+    def wait(self):
+        self._close_stdout()
+
+        done, _ = concurrent.futures.wait(self._futures, return_when=concurrent.futures.FIRST_EXCEPTION)
+        for future in done:
+            exception = future.exception()
+            if exception is not None:
+                raise exception
+
+        self._executor.shutdown()
+
+    def abort(self, kill: bool = False):
+        if kill:
+            self._process.kill()
+        else:
+            self._process.terminate()
+
+        concurrent.futures.wait(self._futures)
+        self._close_stdout()
+        self._executor.shutdown()
+
+    def _write_stdin(self, chunks: Iterable[Any]):
+        assert self._process.stdin is not None
+
+        for chunk in chunks:
+            write_all(self._process.stdin, chunk)
+            self.stdin_bytes += memoryview(chunk).nbytes
+
+        self._process.stdin.flush()
+        self._process.stdin.close()
+
+    def _wait_process(self, timeout: Optional[float]):
+        self.rusage = wait_process(self._process, timeout)
+
+    def _handle_stderr(self):
+        assert self._process.stderr is not None
+
+        for lines in read_line_batches(self._process.stderr):
+            self._on_stderr(lines)
+
+        self._process.stderr.close()
+
+    def _read_lines(self, pipe: IO[bytes], callback: Callable[[list[bytes]], None]):
+        for lines in read_line_batches(pipe):
+            callback(lines)
+
+        pipe.close()
+
+    def _close_stdout(self):
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+
+    def _terminate_on_exception(self, future: concurrent.futures.Future):
+        # Unblock the reader of the standard output as soon as any of the workers fails
+        if future.exception() is not None:
+            self._process.terminate()
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import functools
 import re
-from typing import ClassVar, Optional
+from typing import ClassVar, Optional, Type
 
 from typing_extensions import Self
 
@@ -12,27 +13,40 @@ class FFmpegError(Exception):
     Attributes:
         message: An error message providing details about the error.
         arguments: Arguments passed to FFmpeg.
+        tail: The last lines of the standard error of FFmpeg, which often explain the error better than `message`.
     """
 
     _patterns: ClassVar[Optional[list[str]]] = None
 
-    def __init__(self, message: str, arguments: list[str]):
+    def __init__(self, message: str, arguments: list[str], tail: Optional[list[str]] = None):
         super().__init__(message)
 
         self.message = message
         self.arguments = arguments
+        self.tail = tail if tail is not None else []
 
     @classmethod
-    def create(cls, message: str, arguments: list[str]) -> Self:
-        for subclass in cls.__subclasses__():
-            if subclass._patterns is None:
-                continue
-
-            for pattern in subclass._patterns:
-                if re.search(pattern, message, flags=re.IGNORECASE) is not None:
-                    return subclass(message, arguments)
+    def create(cls, message: str, arguments: list[str], tail: Optional[list[str]] = None) -> Self:
+        # The cause is often logged several lines before the last one, so the whole tail is classified at once
+        pattern, subclasses = _compile_patterns(cls)
+        match = pattern.search("\n".join(tail) if tail else message)
+        if match is not None and match.lastgroup is not None:
+            return subclasses[int(match.lastgroup[1:])](message, arguments, tail)
+
+        return cls(message, arguments, tail)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_patterns(cls: Type[FFmpegError]) -> tuple[re.Pattern[str], list[Type[FFmpegError]]]:
+    # Patterns of all subclasses are combined into a single pattern, in which a group tells the subclass that matched.
+    # The earliest match wins, and subclasses declared first win for the same position.
+    subclasses = [subclass for subclass in cls.__subclasses__() if subclass._patterns is not None]
+    groups = [
+        f"(?P<e{index}>{'|'.join(f'(?:{pattern})' for pattern in subclass._patterns)})"  # type: ignore
+        for index, subclass in enumerate(subclasses)
+    ]
 
-        return cls(message, arguments)
+    return re.compile("|".join(groups) or "(?!)", flags=re.IGNORECASE), subclasses
 
 
 class FFmpegAlreadyExecuted(FFmpegError):
@@ -55,6 +69,7 @@ class FFmpegInvalidCommand(FFmpegError):
         r"trailing options were found on the commandline",
         r"invalid encoder type",
         r"codec not currently supported in container",
+        r"no such filter",
     ]
 
 
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import tempfile
+import threading
+import weakref
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterable, TypeVar, Union
+
+from ffmpeg.batch import Job
+from ffmpeg.metrics import ExecutionMetrics
+from ffmpeg.progress import Progress
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+E = TypeVar("E")
+
+SPEED_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+FPS_BUCKETS = (1.0, 5.0, 10.0, 25.0, 30.0, 60.0, 120.0, 240.0, 480.0, 960.0)
+SECONDS_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def format_value(value: Union[int, float]) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(value)
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = tuple(bounds)
+        # The last count is for values above every bound, which only the `+Inf` bucket holds
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def copy(self) -> _Histogram:
+        histogram = _Histogram(self.bounds)
+        histogram.counts = self.counts.copy()
+        histogram.sum = self.sum
+        return histogram
+
+    def render(self, name: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.bounds, math.inf), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{format_value(bound)}"}} {cumulative}')
+
+        lines.append(f"{name}_sum {format_value(self.sum)}")
+        lines.append(f"{name}_count {cumulative}")
+        return lines
+
+
+class MetricsExporter:
+    def __init__(self, namespace: str = "ffmpeg"):
+        """Initialize a `MetricsExporter` instance, which aggregates the events of `FFmpeg` executions
+           into metrics in the Prometheus text exposition format.
+
+        Args:
+            namespace: The prefix of the name of every metric. Defaults to "ffmpeg".
+        """
+        self._namespace = namespace
+
+        # Every listener only holds the lock to update a few numbers, so that progress is cheap to aggregate
+        self._lock = threading.Lock()
+        self._tracked: weakref.WeakSet[Any] = weakref.WeakSet()
+
+        self._in_flight = 0
+        self._started = 0
+        self._completed = 0
+        self._terminated = 0
+        self._failed: Counter[str] = Counter()
+        self._cpu_seconds = 0.0
+
+        self._speed = _Histogram(SPEED_BUCKETS)
+        self._fps = _Histogram(FPS_BUCKETS)
+        self._duration = _Histogram(SECONDS_BUCKETS)
+        self._queue_wait = _Histogram(SECONDS_BUCKETS)
+
+    def track(self, emitter: E) -> E:
+        """Aggregate the events of an `FFmpeg` instance, or of every job admitted by a `BatchRunner` or a `Scheduler`.
+
+        Listeners are only added once, however many times the same emitter is tracked.
+        A job admitted by a tracked runner is tracked as well, so it must not be tracked separately.
+
+        Args:
+            emitter: An `FFmpeg` instance, a `BatchRunner` or a `Scheduler`, using `asyncio` or not.
+
+        Returns:
+            The emitter, so that it can be chained.
+        """
+        with self._lock:
+            if emitter in self._tracked:
+                return emitter
+
+            self._tracked.add(emitter)
+
+        target: Any = emitter
+        if hasattr(target, "execute"):
+            target.on("start", self._on_start)
+            target.on("progress", self._on_progress)
+            target.on("metrics", self._on_metrics)
+            target.on("completed", self._on_completed)
+            target.on("terminated", self._on_terminated)
+            target.on("failed", self._on_failed)
+        else:
+            target.on("admitted", self._on_admitted)
+
+        return emitter
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics, which can be served with the `text/plain; version=0.0.4` content type.
+        """
+        with self._lock:
+            in_flight = self._in_flight
+            started = self._started
+            completed = self._completed
+            terminated = self._terminated
+            failed = self._failed.copy()
+            cpu_seconds = self._cpu_seconds
+            histograms = [histogram.copy() for histogram in (self._speed, self._fps, self._duration, self._queue_wait)]
+
+        speed, fps, duration, queue_wait = histograms
+        prefix = self._namespace
+
+        lines: list[str] = []
+
+        def describe(name: str, kind: str, description: str):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        describe("jobs_in_flight", "gauge", "The number of running FFmpeg processes.")
+        lines.append(f"{prefix}_jobs_in_flight {in_flight}")
+        describe("jobs_started_total", "counter", "The number of started FFmpeg processes.")
+        lines.append(f"{prefix}_jobs_started_total {started}")
+        describe("jobs_completed_total", "counter", "The number of FFmpeg processes which exited successfully.")
+        lines.append(f"{prefix}_jobs_completed_total {completed}")
+        describe("jobs_terminated_total", "counter", "The number of FFmpeg processes terminated or cancelled.")
+        lines.append(f"{prefix}_jobs_terminated_total {terminated}")
+        describe("jobs_failed_total", "counter", "The number of failed FFmpeg executions by the type of the error.")
+        for error, count in sorted(failed.items()):
+            lines.append(f'{prefix}_jobs_failed_total{{error="{error}"}} {count}')
+        describe("cpu_seconds_total", "counter", "The CPU time spent by FFmpeg processes in seconds.")
+        lines.append(f"{prefix}_cpu_seconds_total {format_value(cpu_seconds)}")
+
+        describe("speed", "histogram", "The processing speed reported by FFmpeg, relative to real time.")
+        lines.extend(speed.render(f"{prefix}_speed"))
+        describe("fps", "histogram", "The processing speed reported by FFmpeg in frames per second.")
+        lines.extend(fps.render(f"{prefix}_fps"))
+        describe("job_duration_seconds", "histogram", "The wall time of FFmpeg processes in seconds.")
+        lines.extend(duration.render(f"{prefix}_job_duration_seconds"))
+        describe("queue_wait_seconds", "histogram", "The time jobs waited to be admitted in seconds.")
+        lines.extend(queue_wait.render(f"{prefix}_queue_wait_seconds"))
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, os.PathLike]):
+        """Write the metrics to a file, such as one read by the textfile collector of the node exporter.
+
+        The file is replaced atomically, so that a reader never sees a partially written file.
+
+        Args:
+            path: The path to the file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temporary_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(self.render())
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def serve(self, port: int, address: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve the metrics over HTTP at `/metrics` from a background thread.
+
+        Args:
+            port: The port to listen on. If 0, any free port is used, which is available as `server.server_port`.
+            address: The address to listen on. Defaults to "127.0.0.1".
+
+        Note:
+            ```python
+            exporter = MetricsExporter()
+            server = exporter.serve(9464)
+
+            exporter.track(ffmpeg).execute()
+
+            server.shutdown()
+            ```
+
+        Returns:
+            The HTTP server, which stops serving when `shutdown()` is called.
+        """
+        # Most applications never serve the metrics, so they do not pay for importing `http.server`
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+
+                body = exporter.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any):
+                pass  # a request for every scrape is not worth logging
+
+        server = ThreadingHTTPServer((address, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def _on_start(self, arguments: list[str]):
+        with self._lock:
+            self._in_flight += 1
+            self._started += 1
+
+    def _on_progress(self, progress: Progress):
+        with self._lock:
+            self._speed.observe(progress.speed)
+            self._fps.observe(progress.fps)
+
+    def _on_metrics(self, metrics: ExecutionMetrics):
+        with self._lock:
+            self._duration.observe(metrics.wall_time)
+            self._cpu_seconds += (metrics.user_time or 0.0) + (metrics.system_time or 0.0)
+
+    def _on_completed(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+
+    def _on_terminated(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._terminated += 1
+
+    def _on_failed(self, exception: BaseException):
+        with self._lock:
+            self._in_flight -= 1
+            self._failed[type(exception).__name__] += 1
+
+    def _on_admitted(self, job: Job, queue_wait: float):
+        with self._lock:
+            self._queue_wait.observe(queue_wait)
+
+        self.track(job.ffmpeg)
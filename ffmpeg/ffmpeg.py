@@ -1,39 +1,116 @@
 from __future__ import annotations
 
-import concurrent.futures
+import functools
 import io
 import os
 import signal
 import subprocess
-from typing import IO, Optional, Union
+import time
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, TypeVar, Union
 
 from pyee import EventEmitter
 from typing_extensions import Self
 
 from ffmpeg import types
+from ffmpeg.audio import AudioChannels, get_sample_format, read_blocks
+from ffmpeg.dispatcher import Dispatcher, DispatchMetrics
+from ffmpeg.engine import Engine, SelectorEngine, ThreadEngine
 from ffmpeg.errors import FFmpegAlreadyExecuted, FFmpegError
+from ffmpeg.metrics import ExecutionMetrics, get_max_rss
 from ffmpeg.options import Options
 from ffmpeg.progress import Tracker
-from ffmpeg.utils import create_subprocess, ensure_io, is_windows, read_stream, readlines
+from ffmpeg.spill import spill_arguments
+from ffmpeg.template import Template
+from ffmpeg.utils import (
+    TailBuffer,
+    create_subprocess,
+    ensure_io,
+    get_fileno,
+    get_pipe_size,
+    get_stderr_options,
+    is_windows,
+    open_progress_pipe,
+    open_sink,
+    read_chunks,
+    read_stream,
+    readall_into,
+    set_pipe_size,
+)
+from ffmpeg.video import VideoSize, get_frame_buffers, get_input_options, get_pixel_format, read_frames
+
+if TYPE_CHECKING:
+    import numpy as np
+
+T = TypeVar("T")
 
 
 class FFmpeg(EventEmitter):
-    def __init__(self, executable: str = "ffmpeg"):
+    def __init__(
+        self,
+        executable: str = "ffmpeg",
+        progress: types.ProgressMode = "stderr",
+        progress_interval: Optional[float] = None,
+        tune_stderr: bool = False,
+        dispatch: Optional[types.DispatchPolicy] = None,
+        dispatch_capacity: int = 1024,
+        stderr_tail: int = 32,
+    ):
         """Initialize an `FFmpeg` instance.
 
         Args:
             executable: The path to the ffmpeg executable. Defaults to "ffmpeg".
+            progress: How to track the progress. Defaults to "stderr".
+                - `stderr`: Statistics are parsed from the standard error.
+                - `pipe`: FFmpeg writes machine-readable statistics with `-progress` to a dedicated pipe,
+                  and does not print them to the standard error with `-nostats`.
+                  Since file descriptors cannot be inherited on Windows, it falls back to `stderr` on Windows.
+            progress_interval: The minimum number of seconds between `progress` events. Defaults to None,
+                which means every report is emitted. Reports arriving sooner are coalesced into the latest one.
+            tune_stderr: Whether to set `-loglevel` and `-stats_period` from the listeners registered when executing,
+                so that FFmpeg prints no more than they need. Options specified explicitly are never overridden.
+                Defaults to False.
+            dispatch: How to deliver `stderr`, `stderr_lines` and `progress` events. Defaults to None,
+                which means listeners are called while the pipes are drained, so that slow listeners slow FFmpeg down.
+                Otherwise, events are queued and delivered by a dispatcher, and this is the policy for a full queue.
+                - `block`: Draining the pipes waits until there is room.
+                - `drop_oldest`: The oldest queued event is discarded.
+                - `drop_newest`: The arriving event is discarded.
+                - `coalesce`: A `progress` event replaces the queued one, and other events wait as with `block`.
+            dispatch_capacity: The maximum number of queued events. Defaults to 1024.
+            stderr_tail: The number of last lines of the standard error kept to explain an error. Defaults to 32.
+                The lines are also limited to 64 KiB in total, so that memory stays bounded however long FFmpeg runs.
         """
         super().__init__()
 
         self._executable: str = executable
         self._options: Options = Options()
+        # Arguments rendered from a template, which replace the options until the instance is changed,
+        # and a function rendering the options of the template with the same values
+        self._arguments: Optional[list[str]] = None
+        self._render_options: Optional[Callable[[], Options]] = None
 
         self._process: subprocess.Popen[bytes]
         self._executed: bool = False
         self._terminated: bool = False
 
-        self._tracker = Tracker(self)  # type: ignore
+        self._progress = "stderr" if is_windows() else progress
+        self._progress_interval = progress_interval
+        self._tune_stderr = tune_stderr
+        self._tracker: Optional[Tracker] = None
+
+        self._dispatch_policy = dispatch
+        self._dispatch_capacity = dispatch_capacity
+        self._dispatcher: Optional[Dispatcher] = None
+
+        self._stderr_tail_lines = stderr_tail
+        self._stderr_tail = TailBuffer(stderr_tail)
+        self._stderr_lines = 0
+
+        self.metrics: Optional[ExecutionMetrics] = None
+        """The resources used by the last execution that was not aborted, or None."""
+
+        # Called with every line of the standard error before it is dispatched, for what the output depends on
+        self._stderr_hooks: list[Callable[[str], None]] = []
 
     @property
     def arguments(self) -> list[str]:
@@ -42,8 +119,20 @@ class FFmpeg(EventEmitter):
         Returns:
             A lit of arguments to be used when executing FFmpeg.
         """
+        if self._arguments is not None:
+            return self._arguments.copy()
+
         return [self._executable, *self._options.build()]
 
+    @property
+    def dispatch_metrics(self) -> Optional[DispatchMetrics]:
+        """Return how events of the current or the last execution have been delivered by the dispatcher.
+
+        Returns:
+            The metrics of the dispatcher, or None if events are not dispatched.
+        """
+        return self._dispatcher.metrics if self._dispatcher is not None else None
+
     def option(self, key: str, value: Optional[types.Option] = None) -> Self:
         """Add a global option `-key` or `-key value`.
 
@@ -54,6 +143,7 @@ class FFmpeg(EventEmitter):
         Returns:
             An instance of `FFmpeg` itself, so that calls can be chained.
         """
+        self._thaw()
         self._options.option(key, value)
         return self
 
@@ -97,6 +187,7 @@ class FFmpeg(EventEmitter):
         Returns:
             An instance of `FFmpeg` itself, so that calls can be chained.
         """
+        self._thaw()
         self._options.input(url, options, **kwargs)
         return self
 
@@ -140,70 +231,490 @@ class FFmpeg(EventEmitter):
         Returns:
             An instance of `FFmpeg` itself, so that calls can be chained.
         """
+        self._thaw()
         self._options.output(url, options, **kwargs)
         return self
 
-    def execute(self, stream: Optional[Union[bytes, IO[bytes]]] = None, timeout: Optional[float] = None) -> bytes:
+    def setdefault(self, key: str, value: Optional[types.Option] = None) -> Self:
+        """Add an option `-key` or `-key value` to every input and output file which does not specify it yet.
+           Files added afterwards are not affected.
+
+        Args:
+            key: A key of the option.
+            value: A value of the option. If the option does not require a value, use None. Defaults to None.
+
+        Note:
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("output.mp4", threads=8).setdefault("threads", 2)
+            # Corresponds to `ffmpeg -threads 2 -i input.mp4 -threads 8 output.mp4`
+            ```
+
+        Returns:
+            An instance of `FFmpeg` itself, so that calls can be chained.
+        """
+        self._thaw()
+        self._options.setdefault(key, value)
+        return self
+
+    def compile(self) -> Template[FFmpeg]:
+        """Compile the options into a template, which renders the arguments of many similar jobs
+           without building the options again for every job.
+
+        Arguments which are exactly a placeholder such as `{input}` are replaced by the values given for every job.
+        Listeners are not compiled, so they have to be added to every instance created from the template.
+
+        Note:
+            ```python
+            template = (
+                FFmpeg()
+                .option("y")
+                .input("{input}")
+                .output("{output}", {"codec:v": "libx264", "crf": "{crf}"})
+                .compile()
+            )
+
+            template.create(input="input.mp4", output="output.mp4", crf=23).execute()
+            ```
+
+        Returns:
+            A template creating `FFmpeg` instances with the current options.
+        """
+        self._thaw()
+        return Template(
+            self.arguments,
+            self._options,
+            functools.partial(
+                FFmpeg,
+                executable=self._executable,
+                progress=self._progress,
+                progress_interval=self._progress_interval,
+                tune_stderr=self._tune_stderr,
+                dispatch=self._dispatch_policy,
+                dispatch_capacity=self._dispatch_capacity,
+                stderr_tail=self._stderr_tail_lines,
+            ),
+        )
+
+    def execute(
+        self,
+        stream: Optional[Union[bytes, IO[bytes]]] = None,
+        timeout: Optional[float] = None,
+        size: Optional[int] = None,
+        copy: bool = True,
+        sink: Optional[types.Sink] = None,
+    ) -> bytes:
         """Execute FFmpeg using specified global options and files.
 
         Args:
+            stream: A stream to input to the standard input.
+                If the stream is backed by a file descriptor, such as a file or a pipe, it is handed to FFmpeg directly.
+                Defaults to None.
+            timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            size: The number of bytes to transfer through the pipes at a time.
+                On Linux, smaller pipes are also enlarged to this size if possible, and no more than they hold is
+                transferred at a time. Defaults to None, which means the capacity of the pipes.
+            copy: Whether to return the output as immutable `bytes`.
+                If False, the `bytearray` the output was read into is returned as is, so that a large output is never
+                held in memory twice. It is not faster to read, only lighter on memory.
+                Defaults to True.
+            sink: A path, a file descriptor, a file object or a socket to redirect the standard output to.
+                The target is handed to FFmpeg as its standard output, so the output never passes through Python.
+                Defaults to None.
+
+        Raises:
+            FFmpegAlreadyExecuted: If FFmpeg is already executed.
+            FFmpegError: If FFmpeg process returns non-zero exit status.
+            subprocess.TimeoutExpired: If FFmpeg process does not terminate after `timeout` seconds.
+
+        Note:
+            A socket must be in blocking mode to be used as a sink, since FFmpeg writes to it directly.
+
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("pipe:1", f="matroska")
+            ffmpeg.execute(sink="output.mkv")
+            ```
+
+        Returns:
+            The output to the standard output, or empty bytes if `sink` is specified.
+        """
+        if sink is not None:
+            for _ in self._execute(stream, timeout, size, read_stream, sink=sink):
+                pass
+
+            return b""
+
+        if not copy:
+            buffer = bytearray()
+            for _ in self._execute(stream, timeout, size, lambda stdout, size: readall_into(stdout, buffer, size)):
+                pass
+
+            return buffer  # type: ignore
+
+        # Joining chunks copies the output only once, while growing a buffer has to copy it on every reallocation
+        return b"".join(self._execute(stream, timeout, size, read_stream))
+
+    def iterate(
+        self,
+        stream: Optional[Union[bytes, IO[bytes]]] = None,
+        timeout: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """Execute FFmpeg and yield the output to the standard output chunk by chunk as soon as it is available.
+           Unlike `execute()`, the output is never buffered as a whole, so memory usage stays flat regardless of its size.
+
+        Args:
+            stream: A stream to input to the standard input.
+                If the stream is backed by a file descriptor, such as a file or a pipe, it is handed to FFmpeg directly.
+                Defaults to None.
+            timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            size: The maximum number of bytes in each chunk.
+                On Linux, smaller pipes are also enlarged to this size if possible, and no more than they hold is
+                transferred at a time. Defaults to None, which means the capacity of the pipes.
+
+        Raises:
+            FFmpegAlreadyExecuted: If FFmpeg is already executed.
+            FFmpegError: If FFmpeg process returns non-zero exit status.
+            subprocess.TimeoutExpired: If FFmpeg process does not terminate after `timeout` seconds.
+
+        Note:
+            If the iteration is stopped early, the FFmpeg process is killed.
+
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4").output("pipe:1", f="matroska")
+            with open("output.mkv", "wb") as file:
+                for chunk in ffmpeg.iterate():
+                    file.write(chunk)
+            ```
+
+        Yields:
+            Chunks of the output to the standard output.
+        """
+        return self._execute(stream, timeout, size, read_stream)
+
+    def frames(
+        self,
+        stream: Optional[Union[bytes, IO[bytes]]] = None,
+        timeout: Optional[float] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        pix_fmt: str = "rgb24",
+        buffers: int = 2,
+        options: Optional[dict[str, Optional[types.Option]]] = None,
+    ) -> Iterator[np.ndarray]:
+        """Execute FFmpeg, decoding the video into frames as NumPy arrays.
+           An output to the standard output in rawvideo format is added, so only input files have to be specified.
+
+        Args:
+            stream: A stream to input to the standard input. Defaults to None.
+            timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            width: The width to scale frames to. Defaults to None, which means the width of the output.
+            height: The height to scale frames to. Defaults to None, which means the height of the output.
+            pix_fmt: The pixel format of frames, such as `rgb24`, `bgr24`, `rgba` or `gray`. Defaults to "rgb24".
+            buffers: The number of buffers frames are read into in turn. Defaults to 2.
+            options: Additional options for the output file, such as `vf` or `r`. Defaults to None.
+
+        Raises:
+            FFmpegAlreadyExecuted: If FFmpeg is already executed.
+            FFmpegError: If FFmpeg process returns non-zero exit status.
+            subprocess.TimeoutExpired: If FFmpeg process does not terminate after `timeout` seconds.
+            ValueError: If `pix_fmt` is not supported, or the size of frames could not be found.
+
+        Note:
+            Frames are views over a ring of `buffers` reusable buffers, so a frame is overwritten
+            `buffers` frames later. Copy a frame if it has to be kept for longer.
+
+            ```python
+            ffmpeg = FFmpeg().input("input.mp4")
+            for frame in ffmpeg.frames(width=224, height=224):
+                model.predict(frame)  # frame.shape == (224, 224, 3)
+            ```
+
+        Note:
+            Unless `width` and `height` are specified, the size of frames is found from the log of FFmpeg,
+            so `-loglevel` must not be lower than `info`.
+
+        Yields:
+            Frames of shape `(height, width, channels)`, or `(height, width)` for single-channel pixel formats.
+        """
+        pixel_format = get_pixel_format(pix_fmt)
+
+        output_options: dict[str, Optional[types.Option]] = {"f": "rawvideo", "pix_fmt": pix_fmt, **(options or {})}
+        if width is not None and height is not None:
+            output_options["s"] = f"{width}x{height}"
+        self.output("pipe:1", output_options)
+
+        video_size = VideoSize(width, height)
+        frame_size = pixel_format.frame_size(width, height) if width is not None and height is not None else None
+
+        self._stderr_hooks.append(video_size.on_stderr)
+        try:
+            yield from self._execute(
+                stream,
+                timeout,
+                frame_size,
+                lambda stdout, size: read_frames(stdout, video_size, pixel_format, buffers),
+            )
+        finally:
+            self._stderr_hooks.remove(video_size.on_stderr)
+
+    def audio_blocks(
+        self,
+        samples: int,
+        stream: Optional[Union[bytes, IO[bytes]]] = None,
+        timeout: Optional[float] = None,
+        channels: Optional[int] = None,
+        sample_rate: Optional[int] = None,
+        sample_fmt: str = "s16le",
+        overlap: int = 0,
+        buffers: int = 2,
+        drop_last: bool = False,
+        options: Optional[dict[str, Optional[types.Option]]] = None,
+    ) -> Iterator[np.ndarray]:
+        """Execute FFmpeg, decoding the audio into blocks of a fixed number of samples as NumPy arrays.
+           An output to the standard output in a raw PCM format is added, so only input files have to be specified.
+
+        Args:
+            samples: The number of samples per channel in each block.
             stream: A stream to input to the standard input. Defaults to None.
             timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            channels: The number of channels to mix the audio to. Defaults to None, which means the channels of the output.
+            sample_rate: The sample rate to resample the audio to. Defaults to None, which means the sample rate of the output.
+            sample_fmt: The format of samples, such as `s16le` or `f32le`. Defaults to "s16le".
+            overlap: The number of samples each block shares with the previous one. Defaults to 0.
+            buffers: The number of buffers blocks are read into in turn. Defaults to 2.
+            drop_last: Whether to drop the last block if it has fewer than `samples` samples. Defaults to False.
+            options: Additional options for the output file, such as `af`. Defaults to None.
+
+        Raises:
+            FFmpegAlreadyExecuted: If FFmpeg is already executed.
+            FFmpegError: If FFmpeg process returns non-zero exit status.
+            subprocess.TimeoutExpired: If FFmpeg process does not terminate after `timeout` seconds.
+            ValueError: If `sample_fmt` is not supported, `overlap` is not smaller than `samples`,
+                or the number of channels could not be found.
+
+        Note:
+            Blocks are views over a ring of `buffers` reusable buffers, so a block is overwritten
+            `buffers` blocks later. Copy a block if it has to be kept for longer.
+
+            ```python
+            ffmpeg = FFmpeg().input("input.wav")
+            for block in ffmpeg.audio_blocks(samples=1024, overlap=512, channels=1, sample_rate=16000, sample_fmt="f32le"):
+                spectrum = np.fft.rfft(block[:, 0])
+            ```
+
+        Yields:
+            Blocks of shape `(samples, channels)`. Only the last block may be shorter, unless `drop_last` is True.
+        """
+        sample_format = get_sample_format(sample_fmt)
+        if not 0 <= overlap < samples:
+            raise ValueError(f"overlap must be between 0 and samples - 1, got {overlap}")
+        if overlap > 0 and buffers < 2:
+            raise ValueError("At least two buffers are required to overlap blocks")
+
+        output_options: dict[str, Optional[types.Option]] = {"f": sample_fmt, **(options or {})}
+        if channels is not None:
+            output_options["ac"] = channels
+        if sample_rate is not None:
+            output_options["ar"] = sample_rate
+        self.output("pipe:1", output_options)
+
+        audio_channels = AudioChannels(channels)
+        block_size = samples * channels * sample_format.itemsize if channels is not None else None
+
+        self._stderr_hooks.append(audio_channels.on_stderr)
+        try:
+            yield from self._execute(
+                stream,
+                timeout,
+                block_size,
+                lambda stdout, size: read_blocks(
+                    stdout,
+                    audio_channels,
+                    sample_format,
+                    samples,
+                    overlap,
+                    buffers,
+                    drop_last,
+                ),
+            )
+        finally:
+            self._stderr_hooks.remove(audio_channels.on_stderr)
+
+    def encode_frames(
+        self,
+        frames: Iterable[np.ndarray],
+        timeout: Optional[float] = None,
+        framerate: Optional[types.Numeric] = None,
+        pix_fmt: Optional[str] = None,
+        options: Optional[dict[str, Optional[types.Option]]] = None,
+    ) -> bytes:
+        """Execute FFmpeg, encoding frames as NumPy arrays fed to the standard input.
+           An input from the standard input in rawvideo format is added, so only output files have to be specified.
+
+        Args:
+            frames: Frames of shape `(height, width, channels)`, or `(height, width)` for single-channel pixel formats.
+                All frames must have the same shape and type as the first one.
+            timeout: The maximum number of seconds to wait before returning. Defaults to None.
+            framerate: The frame rate of frames. Defaults to None, which means 25.
+            pix_fmt: The pixel format of frames.
+                Defaults to None, which means a format found from the shape and the type of the first frame,
+                such as `rgb24` for `uint8` frames with 3 channels.
+            options: Additional options for the input file. Defaults to None.
 
         Raises:
             FFmpegAlreadyExecuted: If FFmpeg is already executed.
             FFmpegError: If FFmpeg process returns non-zero exit status.
             subprocess.TimeoutExpired: If FFmpeg process does not terminate after `timeout` seconds.
+            ValueError: If there is no frame, no pixel format fits the frames, or the frames differ in shape or type.
+
+        Note:
+            Each frame is written straight from its buffer, and the next frame is requested only after
+            the previous one has been written. So frames are produced no faster than FFmpeg consumes them,
+            and a producer may safely reuse the buffer of a frame for the next one.
+
+            ```python
+            ffmpeg = FFmpeg().output("output.mp4", vcodec="libx264")
+            ffmpeg.encode_frames(render(frame_index) for frame_index in range(300))
+            ```
 
         Returns:
             The output to the standard output.
         """
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            raise ValueError("There is no frame to encode")
+
+        input_options = get_input_options(first, pix_fmt)
+        if framerate is not None:
+            input_options["framerate"] = framerate
+        self.input("pipe:0", {**input_options, **(options or {})})
+
+        return b"".join(self._execute(None, timeout, None, read_stream, chunks=get_frame_buffers(first, frames)))
+
+    def _execute(
+        self,
+        stream: Optional[Union[bytes, IO[bytes]]],
+        timeout: Optional[float],
+        size: Optional[int],
+        read: Callable[[IO[bytes], int], Iterable[T]],
+        sink: Optional[types.Sink] = None,
+        chunks: Optional[Iterable[Any]] = None,
+    ) -> Iterator[T]:
         if self._executed:
             raise FFmpegAlreadyExecuted("FFmpeg is already executed", arguments=self.arguments)
 
         self._executed = False
         self._terminated = False
 
+        stdin = subprocess.PIPE if chunks is not None else None
         if stream is not None:
-            stream = ensure_io(stream)
-
-        self.emit("start", self.arguments)
-
-        self._process = create_subprocess(
-            self.arguments,
-            bufsize=0,
-            stdin=subprocess.PIPE if stream is not None else None,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            self._executed = True
-            futures = [
-                executor.submit(self._write_stdin, stream),
-                executor.submit(self._read_stdout),
-                executor.submit(self._handle_stderr),
-                executor.submit(self._process.wait, timeout),
-            ]
-            done, pending = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_EXCEPTION)
+            stdin = get_fileno(stream)
+            if stdin is not None:
+                # FFmpeg reads the stream by itself, so there is nothing to copy
+                stream = None
+            else:
+                stdin = subprocess.PIPE
+                stream = ensure_io(stream)
+
+        arguments = self.arguments
+        readers = {}
+
+        # Statistics are only parsed if someone listens to them, so listeners have to be added before executing
+        self._stderr_tail = TailBuffer(self._stderr_tail_lines)
+        self._stderr_lines = 0
+        tracker = Tracker(self._emit_drained, self._progress_interval) if self.listeners("progress") else None
+        self._tracker = tracker if self._progress == "stderr" else None
+
+        options = self._get_stderr_options(arguments, tracker is not None) if self._tune_stderr else []
+
+        with open_progress_pipe(self._progress == "pipe" and tracker is not None) as (progress, write_fd):
+            if self._progress == "pipe":
+                if progress is not None:
+                    assert tracker is not None
+                    options.extend(["-progress", f"pipe:{write_fd}"])
+                    readers[progress] = tracker.on_progress
+                options.append("-nostats")
+            # Oversized filter graphs and input lists are read from files that FFmpeg needs until it exits
+            spilled = spill_arguments([arguments[0], *options, *arguments[1:]])
+            arguments = spilled.arguments
+
+            self.emit("start", arguments)
+
+            with open_sink(sink) as stdout:
+                spawned_at = time.monotonic()
+                try:
+                    self._process = create_subprocess(
+                        arguments,
+                        bufsize=0,
+                        stdin=stdin,
+                        stdout=stdout,
+                        stderr=subprocess.PIPE,
+                        pass_fds=(write_fd,) if write_fd is not None else (),
+                    )
+                except Exception as exception:
+                    spilled.cleanup()
+                    self.emit("failed", exception)
+                    raise
+                # Popen only returns once the child has called exec
+                spawn_time = time.monotonic() - spawned_at
+
+        engine: Optional[Engine] = None
+        self._dispatcher = None
+        self._executed = True
+        try:
+            size = self._adjust_pipes(size)
+
+            if self._dispatch_policy is not None:
+                self._dispatcher = Dispatcher(self.emit, self._dispatch_capacity, self._dispatch_policy)
+
+            engine_class = ThreadEngine if is_windows() else SelectorEngine
+            engine = engine_class(
+                self._process,
+                read_chunks(stream, size) if stream is not None else chunks,
+                self._handle_stderr,
+                timeout,
+                readers,
+            )
+
+            if self._process.stdout is not None:
+                yield from read(engine, size)  # type: ignore
+
+            engine.wait()
+            wall_time = time.monotonic() - spawned_at
+
+            if tracker is not None:
+                tracker.flush()
+            if self._dispatcher is not None:
+                self._dispatcher.close()
+        except GeneratorExit:
+            # The consumer no longer needs the output, so there is no reason to keep FFmpeg running.
+            # FFmpeg may be blocked on writing to the standard output, so it has to be killed instead of terminated.
+            self._abort(engine, readers, kill=True)
+            self._close_dispatcher()
+            self.emit("terminated")
+            raise
+        except BaseException as exception:
+            self._abort(engine, readers)
+            self._close_dispatcher()
+            self.emit("failed", exception)
+            raise
+        finally:
             self._executed = False
+            spilled.cleanup()
 
-            for future in done:
-                exception = future.exception()
-                if exception is not None:
-                    self._process.terminate()
-                    concurrent.futures.wait(pending)
-
-                    raise exception
+        assert engine is not None
+        self.metrics = self._create_metrics(engine, spawned_at, spawn_time, wall_time)
+        self.emit("metrics", self.metrics)
 
         if self._process.returncode == 0:
             self.emit("completed")
         elif self._terminated:
             self.emit("terminated")
         else:
-            raise FFmpegError.create(message=futures[2].result(), arguments=self.arguments)
-
-        return futures[1].result()
+            error = self._create_error()
+            self.emit("failed", error)
+            raise error
 
     def terminate(self):
         """Gracefully terminate the running FFmpeg process.
@@ -226,34 +737,97 @@ class FFmpeg(EventEmitter):
         self._terminated = True
         self._process.send_signal(sigterm)
 
-    def _write_stdin(self, stream: Optional[IO[bytes]]):
-        if stream is None:
-            return
-
-        assert self._process.stdin is not None
+    def _adjust_pipes(self, size: Optional[int]) -> int:
+        pipes = [pipe for pipe in (self._process.stdin, self._process.stdout) if pipe is not None]
 
-        for chunk in read_stream(stream, size=io.DEFAULT_BUFFER_SIZE):
-            self._process.stdin.write(chunk)
+        if size is None:
+            capacities = [get_pipe_size(pipe.fileno()) for pipe in pipes]
+            return min((capacity for capacity in capacities if capacity is not None), default=io.DEFAULT_BUFFER_SIZE)
 
-        self._process.stdin.flush()
-        self._process.stdin.close()
+        # A pipe may not grow as large as requested, and transferring more than it holds only blocks more often
+        capacities = [set_pipe_size(pipe.fileno(), size) for pipe in pipes]
+        return min((capacity for capacity in capacities if capacity is not None and capacity < size), default=size)
 
-    def _read_stdout(self) -> bytes:
-        assert self._process.stdout is not None
+    def _get_stderr_options(self, arguments: list[str], tracking: bool) -> list[str]:
+        return get_stderr_options(
+            (argument[1:] for argument in arguments[1:] if argument.startswith("-")),
+            logging=bool(self._stderr_hooks or self.listeners("stderr") or self.listeners("stderr_lines")),
+            stats=tracking and self._progress == "stderr",
+            interval=self._progress_interval if tracking else None,
+        )
 
-        buffer = bytearray()
-        for chunk in read_stream(self._process.stdout, size=io.DEFAULT_BUFFER_SIZE):
-            buffer.extend(chunk)
+    def _emit_drained(self, event: str, *args: Any):
+        # Events emitted while draining the pipes are queued for the dispatcher, unless nobody listens to them
+        if self._dispatcher is not None:
+            if self.listeners(event):
+                self._dispatcher.put(event, *args)
+        else:
+            self.emit(event, *args)
 
-        self._process.stdout.close()
-        return bytes(buffer)
+    def _abort(self, engine: Optional[Engine], readers: dict[IO[bytes], Any], kill: bool = False):
+        if engine is not None:
+            engine.abort(kill=kill)
+            return
 
-    def _handle_stderr(self) -> str:
-        assert self._process.stderr is not None
+        # Nothing drains the pipes of FFmpeg without an engine, so it is killed and its pipes are closed here
+        for pipe in (self._process.stdin, self._process.stdout, self._process.stderr, *readers):
+            if pipe is not None:
+                pipe.close()
+        self._process.kill()
+        self._process.wait()
+
+    def _thaw(self):
+        # An instance created from a template is changed on the options its arguments are rendered from
+        if self._render_options is not None:
+            self._options = self._render_options()
+            self._arguments = None
+            self._render_options = None
+
+    def _close_dispatcher(self):
+        if self._dispatcher is not None:
+            self._dispatcher.close(cancel=True)
+
+    def _create_metrics(
+        self,
+        engine: Engine,
+        spawned_at: float,
+        spawn_time: float,
+        wall_time: float,
+    ) -> ExecutionMetrics:
+        rusage = engine.rusage
+        return ExecutionMetrics(
+            spawn_time=spawn_time,
+            first_byte_time=engine.first_byte_at - spawned_at if engine.first_byte_at is not None else None,
+            wall_time=wall_time,
+            user_time=rusage.ru_utime if rusage is not None else None,
+            system_time=rusage.ru_stime if rusage is not None else None,
+            max_rss=get_max_rss(rusage) if rusage is not None else None,
+            stdin_bytes=engine.stdin_bytes,
+            stdout_bytes=engine.stdout_bytes,
+            stderr_lines=self._stderr_lines,
+        )
 
-        line = b""
-        for line in readlines(self._process.stderr):
-            self.emit("stderr", line.decode())
+    def _create_error(self) -> FFmpegError:
+        return FFmpegError.create(
+            message=self._stderr_tail.last_line.decode(errors="replace"),
+            arguments=self.arguments,
+            tail=self._stderr_tail.decode(),
+        )
 
-        self._process.stderr.close()
-        return line.decode()
+    def _handle_stderr(self, lines: list[bytes]):
+        self._stderr_lines += len(lines)
+        self._stderr_tail.extend(lines)
+        self._emit_drained("stderr_lines", lines)
+
+        # Decoding every line is only worth it if someone listens to lines one by one
+        listening = bool(self.listeners("stderr"))
+        if listening or self._stderr_hooks:
+            for line in lines:
+                decoded = line.decode()
+                for hook in self._stderr_hooks:
+                    hook(decoded)
+                if listening:
+                    self._emit_drained("stderr", decoded)
+
+        if self._tracker is not None:
+            self._tracker.on_stderr(lines)
@@ -0,0 +1,547 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Optional, Sequence, Tuple, TypeVar, Union
+
+from ffmpeg import types
+from ffmpeg.protocol import FFmpegProtocol
+
+FFmpegType = TypeVar("FFmpegType", bound=FFmpegProtocol)
+
+# A pad of a filter, or a stream of an input file, as a node and the index of its output
+_Link = Tuple["_Node", int]
+# The consumer of a pad, as a node and the index of its input, or the label of an output of the graph
+_Consumer = Union[Tuple["_Node", int], str]
+
+_label_pattern = re.compile(r"[A-Za-z0-9_]+")
+_audio_specifier_pattern = re.compile(r"(?:^|:)a(?::|$)")
+
+# Filters which pass frames through unchanged, as they are rendered
+_identity_filters = {
+    "null",
+    "anull",
+    "copy",
+    "acopy",
+    "setpts=PTS",
+    "asetpts=PTS",
+    "scale=iw:ih",
+    "scale=w=iw:h=ih",
+    "volume=1",
+    "volume=volume=1",
+}
+
+# Filters which process every frame on its own, always in the same way, so that they give the same frames
+# after dropping or duplicating frames. Filters depending on earlier frames or on randomness, such as `noise`, are not.
+_stateless_filters = {
+    "avgblur",
+    "boxblur",
+    "colorbalance",
+    "colorchannelmixer",
+    "colorcontrast",
+    "colorlevels",
+    "colortemperature",
+    "convolution",
+    "crop",
+    "curves",
+    "drawbox",
+    "drawgrid",
+    "edgedetect",
+    "eq",
+    "exposure",
+    "format",
+    "gblur",
+    "hflip",
+    "hue",
+    "huesaturation",
+    "lut",
+    "lut1d",
+    "lut3d",
+    "lutrgb",
+    "lutyuv",
+    "monochrome",
+    "negate",
+    "pad",
+    "scale",
+    "selectivecolor",
+    "setdar",
+    "setsar",
+    "smartblur",
+    "sobel",
+    "transpose",
+    "unsharp",
+    "vflip",
+    "vibrance",
+}
+
+# Filters whose output only depends on their inputs, so that identical ones applied to the same pads can be merged
+_deterministic_filters = _stateless_filters | {
+    "acopy",
+    "acrossfade",
+    "adelay",
+    "aformat",
+    "amix",
+    "anull",
+    "apad",
+    "aresample",
+    "asetpts",
+    "atempo",
+    "atrim",
+    "concat",
+    "copy",
+    "fps",
+    "framerate",
+    "hstack",
+    "null",
+    "overlay",
+    "pan",
+    "setpts",
+    "trim",
+    "volume",
+    "vstack",
+    "xfade",
+    "xstack",
+}
+
+# Filters which are cheaper on fewer frames, and the filters they can be moved before without changing any frame.
+# `scale` is not moved before filters changing pixels, since interpolating before or after them rounds differently.
+_reducing_filters = {
+    "fps": _stateless_filters,
+}
+
+_audio_sources = {"aevalsrc", "anoisesrc", "anullsrc", "sine"}
+_video_from_audio_filters = {
+    "ahistogram",
+    "avectorscope",
+    "showcqt",
+    "showfreqs",
+    "showspectrum",
+    "showspectrumpic",
+    "showvolume",
+    "showwaves",
+    "showwavespic",
+}
+
+
+def escape(value: types.T) -> str:
+    # Values are unescaped twice: when the graph is split into filters, then when a filter splits its options
+    text = re.sub(r"[\\':=]", r"\\\g<0>", str(value))
+    return re.sub(r"[\\'\[\],;]", r"\\\g<0>", text)
+
+
+class _Node:
+    __slots__ = ("name", "arguments", "inputs", "kinds", "specifier")
+
+    def __init__(
+        self,
+        name: str,
+        arguments: str,
+        inputs: list[_Link],
+        kinds: tuple[types.MediaType, ...],
+        specifier: Optional[str] = None,
+    ):
+        self.name = name
+        self.arguments = arguments
+        self.inputs = inputs
+        self.kinds = kinds
+        # A stream specifier if the node is a stream of an input file instead of a filter
+        self.specifier = specifier
+
+    @property
+    def text(self) -> str:
+        return f"{self.name}={self.arguments}" if self.arguments else self.name
+
+
+class Pad:
+    """Represents a labelled pad of a filter graph, which is an output of a filter or a stream of an input file.
+
+    Create one with `FilterGraph.input()` or `FilterGraph.filter()` instead of initializing it directly.
+    """
+
+    __slots__ = ("_graph", "_node", "_index")
+
+    def __init__(self, graph: FilterGraph, node: _Node, index: int):
+        self._graph = graph
+        self._node = node
+        self._index = index
+
+    @property
+    def kind(self) -> types.MediaType:
+        """The type of the media flowing through the pad."""
+        return self._node.kinds[self._index]
+
+    def filter(self, filter_name: str, *args: types.T, **kwargs: types.T) -> Pad:
+        """Apply a filter with a single input and a single output to the pad.
+
+        Args:
+            filter_name: The name of the filter, such as `scale`.
+            *args: Values of options of the filter, in the order the filter defines them.
+            **kwargs: Values of options of the filter by their names.
+
+        Returns:
+            The output of the filter.
+        """
+        return self._graph.filter(filter_name, [self], *args, **kwargs)
+
+    def _link(self, graph: FilterGraph) -> _Link:
+        if self._graph is not graph:
+            raise ValueError("A pad can only be connected within the filter graph it belongs to")
+
+        return self._node, self._index
+
+
+class FilterGraph:
+    def __init__(self):
+        """Initialize a `FilterGraph` instance, which builds a graph of filters with labelled pads,
+           and renders it as a single `-filter_complex` argument.
+
+        A pad used by several filters or outputs is split by `split` or `asplit`, as FFmpeg requires.
+
+        Note:
+            ```python
+            graph = FilterGraph()
+            video = graph.input("0:v").filter("fps", 30)
+            logo = graph.input("1:v").filter("scale", 128, -1)
+
+            graph.output(graph.filter("overlay", [video, logo], x=10, y=10), "v")
+            graph.build()
+            # Returns `[0:v]fps=30[s0];[1:v]scale=128:-1[s1];[s0][s1]overlay=x=10:y=10[v]`
+            ```
+        """
+        self._inputs: dict[str, _Node] = {}
+        self._nodes: list[_Node] = []
+        self._outputs: dict[str, _Link] = {}
+
+    def input(self, specifier: str, kind: Optional[types.MediaType] = None) -> Pad:
+        """Return a stream of an input file, such as `0:v` for the video of the first input file.
+
+        Args:
+            specifier: A stream specifier of an input file.
+            kind: The type of the stream. Defaults to None, which means audio if the specifier selects audio with `a`,
+                and video otherwise.
+
+        Returns:
+            The stream as a pad of the graph.
+        """
+        node = self._inputs.get(specifier)
+        if node is None:
+            if kind is None:
+                kind = "audio" if _audio_specifier_pattern.search(specifier) else "video"
+
+            node = _Node("", "", [], (kind,), specifier=specifier)
+            self._inputs[specifier] = node
+
+        return Pad(self, node, 0)
+
+    def filter(self, filter_name: str, pads: Sequence[Pad], *args: types.T, **kwargs: types.T) -> Pad:
+        """Apply a filter with a single output to pads, such as `overlay` or `amix`.
+
+        Args:
+            filter_name: The name of the filter.
+            pads: The pads to connect to the inputs of the filter in order. A source filter such as `color` has none.
+            *args: Values of options of the filter, in the order the filter defines them.
+            **kwargs: Values of options of the filter by their names.
+
+        Returns:
+            The output of the filter.
+        """
+        (pad,) = self.multi_filter(filter_name, pads, [self._guess_kind(filter_name, pads)], *args, **kwargs)
+        return pad
+
+    def multi_filter(
+        self,
+        filter_name: str,
+        pads: Sequence[Pad],
+        kinds: Sequence[types.MediaType],
+        *args: types.T,
+        **kwargs: types.T,
+    ) -> tuple[Pad, ...]:
+        """Apply a filter with any number of outputs to pads, such as `concat` with both video and audio.
+
+        Args:
+            filter_name: The name of the filter.
+            pads: The pads to connect to the inputs of the filter in order.
+            kinds: The type of each output of the filter.
+            *args: Values of options of the filter, in the order the filter defines them.
+            **kwargs: Values of options of the filter by their names.
+
+        Returns:
+            The outputs of the filter.
+        """
+        if not kinds:
+            raise ValueError(f"The filter {filter_name} must have at least one output")
+
+        arguments = [escape(value) for value in args]
+        arguments.extend(f"{key}={escape(value)}" for key, value in kwargs.items())
+
+        node = _Node(filter_name, ":".join(arguments), [pad._link(self) for pad in pads], tuple(kinds))
+        self._nodes.append(node)
+
+        return tuple(Pad(self, node, index) for index in range(len(kinds)))
+
+    def output(self, pad: Pad, label: str) -> str:
+        """Label a pad as an output of the graph, which can be mapped to an output file.
+
+        Args:
+            pad: The pad to label.
+            label: A label made of letters, digits and underscores, which must be unique within the graph.
+
+        Returns:
+            The label in brackets, such as `[v]`, to be used as the `map` option of an output file.
+        """
+        if not _label_pattern.fullmatch(label):
+            raise ValueError(f"Invalid label: {label} (only letters, digits and underscores are allowed)")
+        if label in self._outputs:
+            raise ValueError(f"The label {label} is already used")
+
+        self._outputs[label] = pad._link(self)
+        return f"[{label}]"
+
+    def build(self, optimize: bool = True) -> str:
+        """Render the graph as the value of `-filter_complex`.
+
+        When optimized, the graph is rewritten into one which produces the same outputs with less work:
+
+        - Filters which pass frames through unchanged, such as `null` or `setpts=PTS`, are removed.
+        - Identical filters applied to the same pads are applied once, and their output is split. Only filters whose
+          output depends on nothing but their inputs are merged, so that filters such as `noise` are left as is.
+        - `fps` is moved before filters which process every frame on its own, such as `crop` or `eq`, so that those
+          filters process fewer frames. This assumes that `fps` reduces the rate of the video, as it usually does.
+        - Filters connected one after another are rendered as a single chain, without intermediate labels.
+
+        Args:
+            optimize: Whether to optimize the graph. Defaults to True.
+
+        Raises:
+            ValueError: If the graph has no output, or an output of a filter is not connected.
+
+        Returns:
+            The filter graph to be used as `-filter_complex`.
+        """
+        outputs = self._copy()
+
+        for label, (node, index) in outputs.items():
+            if node.specifier is not None:
+                # A stream of an input file cannot be an output of the graph by itself
+                name = "anull" if node.kinds[index] == "audio" else "null"
+                outputs[label] = (_Node(name, "", [(node, index)], node.kinds), 0)
+
+        if optimize:
+            _remove_identity_filters(outputs)
+            _deduplicate(outputs)
+            if _push_reducing_filters(outputs):
+                _deduplicate(outputs)
+
+        _split(outputs)
+        return _render(outputs, merge_chains=optimize)
+
+    def apply(self, ffmpeg: FFmpegType, optimize: bool = True) -> FFmpegType:
+        """Add the graph to `ffmpeg` as `-filter_complex`.
+
+        Args:
+            ffmpeg: An `FFmpeg` instance.
+            optimize: Whether to optimize the graph. Defaults to True.
+
+        Returns:
+            `ffmpeg` itself, so that calls can be chained.
+        """
+        return ffmpeg.option("filter_complex", self.build(optimize))
+
+    def __str__(self) -> str:
+        return self.build()
+
+    def _guess_kind(self, name: str, inputs: Sequence[Pad]) -> types.MediaType:
+        if name in _video_from_audio_filters:
+            return "video"
+        if not inputs:
+            return "audio" if name in _audio_sources else "video"
+
+        return inputs[0].kind
+
+    def _copy(self) -> dict[str, _Link]:
+        # Optimizing rewrites nodes, so that the graph is copied to be built again later
+        if not self._outputs:
+            raise ValueError("A filter graph requires at least one output")
+
+        used = {(id(node), index) for node, index in self._outputs.values()}
+        used.update((id(node), index) for consumer in self._nodes for node, index in consumer.inputs)
+        for node in self._nodes:
+            for index in range(len(node.kinds)):
+                if (id(node), index) not in used:
+                    raise ValueError(f"The output {index} of the filter {node.text} is not connected")
+
+        copies: dict[int, _Node] = {}
+        for node in [*self._inputs.values(), *self._nodes]:
+            inputs = [(copies[id(source)], index) for source, index in node.inputs]
+            copies[id(node)] = _Node(node.name, node.arguments, inputs, node.kinds, node.specifier)
+
+        return {label: (copies[id(node)], index) for label, (node, index) in self._outputs.items()}
+
+
+def _walk(outputs: dict[str, _Link]) -> list[_Node]:
+    # Nodes which the outputs depend on, each after every node it depends on
+    nodes: list[_Node] = []
+    visited: set[int] = set()
+
+    def visit(node: _Node):
+        if id(node) in visited:
+            return
+
+        visited.add(id(node))
+        for source, _ in node.inputs:
+            visit(source)
+        nodes.append(node)
+
+    for node, _ in outputs.values():
+        visit(node)
+
+    return nodes
+
+
+def _find_consumers(nodes: list[_Node], outputs: dict[str, _Link]) -> dict[tuple[int, int], list[_Consumer]]:
+    consumers: dict[tuple[int, int], list[_Consumer]] = {}
+    for node in nodes:
+        for input_index, (source, index) in enumerate(node.inputs):
+            consumers.setdefault((id(source), index), []).append((node, input_index))
+    for label, (source, index) in outputs.items():
+        consumers.setdefault((id(source), index), []).append(label)
+
+    return consumers
+
+
+def _connect(outputs: dict[str, _Link], consumer: _Consumer, link: _Link):
+    if isinstance(consumer, str):
+        outputs[consumer] = link
+    else:
+        node, index = consumer
+        node.inputs[index] = link
+
+
+def _remove_identity_filters(outputs: dict[str, _Link]):
+    nodes = _walk(outputs)
+    consumers = _find_consumers(nodes, outputs)
+
+    for node in nodes:
+        if node.specifier is not None or node.text not in _identity_filters or len(node.inputs) != 1:
+            continue
+
+        source = node.inputs[0]
+        users = consumers[(id(node), 0)]
+        if source[0].specifier is not None and any(isinstance(user, str) for user in users):
+            continue  # the only filter between an input file and an output of the graph
+
+        for user in users:
+            _connect(outputs, user, source)
+
+
+def _deduplicate(outputs: dict[str, _Link]):
+    # Nodes are visited after the nodes they depend on, so that identical nodes have identical inputs by then
+    canonical: dict[Any, _Node] = {}
+    replaced: dict[int, _Node] = {}
+
+    for node in _walk(outputs):
+        node.inputs = [(replaced.get(id(source), source), index) for source, index in node.inputs]
+
+        if node.specifier is None and node.name not in _deterministic_filters:
+            continue  # such as `noise` or `random`, whose copies give different frames
+
+        key = (node.specifier, node.text, node.kinds, tuple((id(source), index) for source, index in node.inputs))
+        existing = canonical.setdefault(key, node)
+        if existing is not node:
+            replaced[id(node)] = existing
+
+    for label, (node, index) in outputs.items():
+        outputs[label] = (replaced.get(id(node), node), index)
+
+
+def _push_reducing_filters(outputs: dict[str, _Link]) -> bool:
+    pushed = False
+
+    while True:
+        nodes = _walk(outputs)
+        consumers = _find_consumers(nodes, outputs)
+
+        for node in nodes:
+            movable = _reducing_filters.get(node.name)
+            if movable is None or len(node.inputs) != 1:
+                continue
+
+            previous, _ = node.inputs[0]
+            if (
+                previous.specifier is None
+                and previous.name in movable
+                and len(previous.inputs) == 1
+                and len(previous.kinds) == 1
+                and len(consumers[(id(previous), 0)]) == 1
+            ):
+                break
+        else:
+            return pushed
+
+        # Swap the filters, so that the consumers of the reducing filter consume the filter before it instead
+        for user in consumers[(id(node), 0)]:
+            _connect(outputs, user, (previous, 0))
+        node.inputs[0] = previous.inputs[0]
+        previous.inputs[0] = (node, 0)
+        pushed = True
+
+
+def _split(outputs: dict[str, _Link]):
+    nodes = _walk(outputs)
+    for (_, index), users in _find_consumers(nodes, outputs).items():
+        if len(users) < 2:
+            continue
+
+        user = users[0]
+        source = outputs[user] if isinstance(user, str) else user[0].inputs[user[1]]
+        kind = source[0].kinds[index]
+
+        split = _Node("asplit" if kind == "audio" else "split", str(len(users)), [source], (kind,) * len(users))
+        for split_index, user in enumerate(users):
+            _connect(outputs, user, (split, split_index))
+
+
+def _render(outputs: dict[str, _Link], merge_chains: bool) -> str:
+    nodes = _walk(outputs)
+    consumers = _find_consumers(nodes, outputs)
+
+    labels = {(id(node), index): label for label, (node, index) in outputs.items()}
+    labels.update({(id(node), 0): node.specifier for node in nodes if node.specifier is not None})
+    used = set(labels.values())
+    sequence = 0
+
+    def create_label() -> str:
+        nonlocal sequence
+        while f"s{sequence}" in used:
+            sequence += 1
+
+        label = f"s{sequence}"
+        used.add(label)
+        return label
+
+    chains = []
+    rendered: set[int] = set()
+    for node in nodes:
+        if node.specifier is not None or id(node) in rendered:
+            continue
+
+        chain = [node]
+        rendered.add(id(node))
+        while merge_chains and len(chain[-1].kinds) == 1:
+            # Every pad has a single consumer once split, so that a filter with a single input can follow directly
+            (user,) = consumers[(id(chain[-1]), 0)]
+            if isinstance(user, str) or len(user[0].inputs) != 1:
+                break
+
+            chain.append(user[0])
+            rendered.add(id(user[0]))
+
+        last = chain[-1]
+        for index in range(len(last.kinds)):
+            if (id(last), index) not in labels:
+                labels[(id(last), index)] = create_label()
+
+        sources = "".join(f"[{labels[(id(source), index)]}]" for source, index in chain[0].inputs)
+        sinks = "".join(f"[{labels[(id(last), index)]}]" for index in range(len(last.kinds)))
+        chains.append(sources + ",".join(node.text for node in chain) + sinks)
+
+    return ";".join(chains)
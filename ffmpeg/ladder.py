@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, TypeVar, Union
+
+from ffmpeg import types
+from ffmpeg.graph import FilterGraph
+from ffmpeg.protocol import FFmpegProtocol
+
+FFmpegType = TypeVar("FFmpegType", bound=FFmpegProtocol)
+
+
+@dataclass(frozen=True)
+class Rendition:
+    """Represents a rendition of an adaptive bitrate ladder.
+
+    Attributes:
+        url: URL for the output file of the rendition.
+        height: The height to scale the video to.
+        width: The width to scale the video to. Defaults to -2, which keeps the aspect ratio with an even width.
+        video_bitrate: The bitrate of the video, such as `"5M"`. Defaults to None, which means the default of the encoder.
+        vcodec: The encoder of the video. Defaults to "libx264".
+        audio_bitrate: The bitrate of the audio, such as `"128k"`. Defaults to None, which means the default of the encoder.
+        options: Additional options for the output file, such as `maxrate`, `bufsize` or `preset`. Defaults to {}.
+    """
+
+    url: Union[str, os.PathLike]
+    height: int
+    width: int = -2
+    video_bitrate: Optional[types.Option] = None
+    vcodec: str = "libx264"
+    audio_bitrate: Optional[types.Option] = None
+    options: dict[str, Optional[types.Option]] = field(default_factory=dict)
+
+
+class Ladder:
+    def __init__(
+        self,
+        renditions: Iterable[Rendition],
+        video: str = "0:v:0",
+        audio: Optional[str] = "0:a:0?",
+    ):
+        """Initialize a `Ladder` instance, which encodes several renditions of a video from a single decode.
+
+        Args:
+            renditions: Renditions to encode.
+            video: A stream specifier for the video to encode. Defaults to "0:v:0", the first video stream of the first input.
+            audio: A stream specifier for the audio to include in every rendition.
+                Defaults to "0:a:0?", the first audio stream of the first input if any. Use None to drop the audio.
+        """
+        self._renditions = list(renditions)
+        if not self._renditions:
+            raise ValueError("A ladder requires at least one rendition")
+
+        self._video = video
+        self._audio = audio
+
+    @property
+    def filter_graph(self) -> str:
+        """Return the filter graph splitting the decoded video into a scaled stream for each rendition.
+
+        Returns:
+            The filter graph to be used as `-filter_complex`.
+        """
+        graph = FilterGraph()
+
+        # Decoded frames are split in memory, so that the source is decoded only once for all renditions
+        video = graph.input(self._video, kind="video")
+        for index, rendition in enumerate(self._renditions):
+            graph.output(video.filter("scale", rendition.width, rendition.height), f"v{index}")
+
+        return graph.build()
+
+    def apply(self, ffmpeg: FFmpegType) -> FFmpegType:
+        """Add the filter graph and an output file for each rendition to `ffmpeg`.
+
+        Args:
+            ffmpeg: An `FFmpeg` instance whose input files are already specified.
+
+        Note:
+            ```python
+            ladder = Ladder(
+                [
+                    Rendition("1080p.mp4", height=1080, video_bitrate="5M"),
+                    Rendition("720p.mp4", height=720, video_bitrate="3M"),
+                    Rendition("480p.mp4", height=480, video_bitrate="1M"),
+                ]
+            )
+            ffmpeg = ladder.apply(FFmpeg().option("y").input("input.mp4"))
+            ffmpeg.execute()
+            # Corresponds to `ffmpeg -y -i input.mp4 -filter_complex "[0:v:0]split=3[s0][s1][s2];..."
+            #                 -map [v0] -map 0:a:0? -vcodec libx264 -b:v 5M 1080p.mp4 ...`
+            ```
+
+        Returns:
+            `ffmpeg` itself, so that calls can be chained.
+        """
+        ffmpeg.option("filter_complex", self.filter_graph)
+
+        for index, rendition in enumerate(self._renditions):
+            maps = [f"[v{index}]"]
+            if self._audio is not None:
+                maps.append(self._audio)
+
+            options: dict[str, Optional[types.Option]] = {"map": maps, "vcodec": rendition.vcodec}
+            if rendition.video_bitrate is not None:
+                options["b:v"] = rendition.video_bitrate
+            if rendition.audio_bitrate is not None:
+                options["b:a"] = rendition.audio_bitrate
+            options.update(rendition.options)
+
+            ffmpeg.output(rendition.url, options)
+
+        return ffmpeg
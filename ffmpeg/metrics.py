@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class ExecutionMetrics:
+    """Represents the resources used by an execution of `FFmpeg`.
+
+    Attributes:
+        spawn_time: The number of seconds it took to spawn FFmpeg, from fork to exec.
+        first_byte_time: The number of seconds from spawning FFmpeg until the first byte was read from the standard
+            output, or None if nothing was read from it.
+        wall_time: The number of seconds from spawning FFmpeg until it exited.
+        user_time: The number of seconds FFmpeg spent executing in user mode, or None if it is not available.
+        system_time: The number of seconds FFmpeg spent executing in kernel mode, or None if it is not available.
+        max_rss: The peak resident set size of FFmpeg in bytes, or None if it is not available.
+        stdin_bytes: The number of bytes written to the standard input.
+        stdout_bytes: The number of bytes read from the standard output.
+        stderr_lines: The number of lines read from the standard error.
+    """
+
+    spawn_time: float
+    first_byte_time: Optional[float]
+    wall_time: float
+    user_time: Optional[float]
+    system_time: Optional[float]
+    max_rss: Optional[int]
+    stdin_bytes: int
+    stdout_bytes: int
+    stderr_lines: int
+
+
+def get_max_rss(rusage: Any) -> int:
+    # `ru_maxrss` is in bytes on macOS, and in kilobytes anywhere else
+    return rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
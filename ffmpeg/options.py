@@ -64,6 +64,12 @@ class Options:
 
         self._output_files.append(OutputFile(url, [*_unpack_options(options)]))
 
+    def setdefault(self, key: str, value: Optional[types.Option] = None):
+        # Add the option to every input and output file which does not specify it yet
+        for file in [*self._input_files, *self._output_files]:
+            if all(option.key != key for option in file.options):
+                file.options.append(Option(key, value))
+
     def build(self) -> Iterable[str]:
         for option in self._global_options:
             yield from option.build()
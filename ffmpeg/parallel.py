@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import bisect
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from typing import Optional, Sequence, Tuple, Union
+
+from pyee import EventEmitter
+
+from ffmpeg import types
+from ffmpeg.batch import BatchRunner, Job, plan
+from ffmpeg.ffmpeg import FFmpeg
+from ffmpeg.progress import Progress
+from ffmpeg.utils import write_concat_list
+
+Segment = Tuple[float, Optional[float]]
+
+
+def parse_keyframes(output: str) -> list[float]:
+    # Lines look like `format,1.400000` and `packet,3.400000,K__`, where `K` flags a keyframe
+    start_time = 0.0
+    keyframes: list[float] = []
+
+    for line in output.splitlines():
+        fields = line.split(",")
+        if fields[0] == "format" and len(fields) > 1 and fields[1] != "N/A":
+            start_time = float(fields[1])
+        elif fields[0] == "packet" and len(fields) > 2 and fields[1] != "N/A" and "K" in fields[2]:
+            keyframes.append(float(fields[1]))
+
+    # Positions passed to `-ss` are relative to the start of the file
+    return sorted({round(keyframe - start_time, 6) for keyframe in keyframes})
+
+
+def probe_keyframes(
+    url: Union[str, os.PathLike],
+    executable: str = "ffprobe",
+    timeout: Optional[float] = None,
+) -> list[float]:
+    """Find the positions of the keyframes of the first video stream of a media.
+
+    Only packets are read, so that nothing has to be decoded.
+
+    Args:
+        url: URL for the media.
+        executable: The path to the ffprobe executable. Defaults to "ffprobe".
+        timeout: The maximum number of seconds to wait for ffprobe. Defaults to None.
+
+    Raises:
+        FFmpegError: If ffprobe process returns non-zero exit status.
+        subprocess.TimeoutExpired: If ffprobe process does not terminate after `timeout` seconds.
+
+    Returns:
+        The positions of the keyframes in seconds from the start of the media, in ascending order.
+    """
+    ffprobe = (
+        FFmpeg(executable)
+        .option("v", "error")
+        .input(
+            url,
+            select_streams="v:0",
+            show_entries="format=start_time:packet=pts_time,flags",
+            of="csv=print_section=1",
+        )
+    )
+
+    return parse_keyframes(ffprobe.execute(timeout=timeout).decode())
+
+
+def split_keyframes(keyframes: Sequence[float], count: int) -> list[Segment]:
+    """Split a media into at most `count` segments of similar durations, each of which starts at a keyframe.
+
+    Args:
+        keyframes: The positions of the keyframes in seconds, in ascending order.
+        count: The maximum number of segments.
+
+    Returns:
+        The start and the end of each segment in seconds. The end of the last segment is None,
+        which means the end of the media.
+    """
+    if not keyframes:
+        return [(0.0, None)]
+
+    first, last = keyframes[0], keyframes[-1]
+
+    starts = [0.0]
+    for index in range(1, count):
+        # Pick the first keyframe at or after the evenly spaced target, so that every segment is a whole number of GOPs
+        target = first + (last - first) * index / count
+        position = bisect.bisect_left(keyframes, target)
+        if position < len(keyframes) and keyframes[position] > starts[-1]:
+            starts.append(keyframes[position])
+
+    return [(start, end) for start, end in zip(starts, [*starts[1:], None])]
+
+
+class SegmentTracker:
+    def __init__(self, emitter: EventEmitter, count: int):
+        self._emitter = emitter
+        self._lock = threading.Lock()
+        self._progress: list[Optional[Progress]] = [None] * count
+
+    def create_listener(self, index: int):
+        def on_progress(progress: Progress):
+            with self._lock:
+                self._progress[index] = progress
+                progresses = [progress for progress in self._progress if progress is not None]
+
+            self._emitter.emit("progress", self._merge(progresses))
+
+        return on_progress
+
+    def _merge(self, progresses: list[Progress]) -> Progress:
+        size = sum(progress.size for progress in progresses)
+        time = sum((progress.time for progress in progresses), timedelta())
+        seconds = time.total_seconds()
+
+        return Progress(
+            frame=sum(progress.frame for progress in progresses),
+            fps=sum(progress.fps for progress in progresses),
+            size=size,
+            time=time,
+            bitrate=size * 8 / seconds / 1000 if seconds > 0 else 0.0,
+            speed=sum(progress.speed for progress in progresses),
+            dup_frames=sum(progress.dup_frames for progress in progresses),
+            drop_frames=sum(progress.drop_frames for progress in progresses),
+        )
+
+
+class ParallelTranscoder(EventEmitter):
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        threads: Optional[int] = None,
+        executable: str = "ffmpeg",
+        ffprobe: str = "ffprobe",
+        directory: Optional[Union[str, os.PathLike]] = None,
+    ):
+        """Initialize a `ParallelTranscoder` instance, which transcodes the video of a single media
+           by splitting it into segments aligned to keyframes, and encoding the segments at once in separate processes.
+
+        Args:
+            concurrency: The number of segments, which are all encoded at once.
+                Defaults to None, which means the number of available CPU cores.
+            threads: The number of threads each process may use. Defaults to None,
+                which means the available CPU cores divided by `concurrency`.
+            executable: The path to the ffmpeg executable. Defaults to "ffmpeg".
+            ffprobe: The path to the ffprobe executable, which finds the keyframes. Defaults to "ffprobe".
+            directory: The directory to write segments to until they are joined. Defaults to None,
+                which means the default temporary directory.
+        """
+        super().__init__()
+
+        self._concurrency, self._threads = plan(concurrency, threads)
+        self._executable = executable
+        self._ffprobe = ffprobe
+        self._directory = directory
+
+    def transcode(
+        self,
+        input_url: Union[str, os.PathLike],
+        output_url: Union[str, os.PathLike],
+        video_options: Optional[dict[str, Optional[types.Option]]] = None,
+        audio_options: Optional[dict[str, Optional[types.Option]]] = None,
+        keyframes: Optional[Sequence[float]] = None,
+        timeout: Optional[float] = None,
+    ):
+        """Transcode a media, encoding segments of its first video stream in parallel.
+
+        The encoded segments are joined with the concat demuxer without being encoded again.
+        Audio streams are encoded while joining, since encoding audio in segments causes gaps at the joins.
+
+        Args:
+            input_url: URL for the input file.
+            output_url: URL for the output file.
+            video_options: Options to encode every segment of the video with, such as `vcodec` or `crf`.
+                Defaults to None, which means `{"vcodec": "libx264"}`.
+            audio_options: Options to encode the audio with while joining the segments, such as `acodec` or `b:a`.
+                Defaults to None, which means the audio is copied.
+            keyframes: The positions of keyframes in seconds from the start of the media.
+                Defaults to None, which means they are found with ffprobe.
+            timeout: The maximum number of seconds to wait for each process. Defaults to None.
+
+        Raises:
+            FFmpegError: If any of the processes returns non-zero exit status.
+            subprocess.TimeoutExpired: If any of the processes does not terminate after `timeout` seconds.
+
+        Note:
+            ```python
+            transcoder = ParallelTranscoder()
+
+            @transcoder.on("progress")
+            def on_progress(progress: Progress):
+                print(progress.time, progress.speed)
+
+            transcoder.transcode("input.mp4", "output.mp4", {"vcodec": "libx264", "crf": 23}, {"acodec": "aac"})
+            ```
+        """
+        if keyframes is None:
+            keyframes = probe_keyframes(input_url, self._ffprobe, timeout)
+
+        segments = split_keyframes(keyframes, self._concurrency)
+
+        with tempfile.TemporaryDirectory(dir=self._directory) as directory:
+            paths = [os.path.join(directory, f"segment-{index:05d}.mkv") for index in range(len(segments))]
+
+            tracker = SegmentTracker(self, len(segments))
+            jobs = []
+            for index, (path, (start, end)) in enumerate(zip(paths, segments)):
+                # Seeking to a keyframe before the input only decodes the frames of the segment
+                input_options: dict[str, Optional[types.Option]] = {"ss": start}
+                if end is not None:
+                    input_options["to"] = end
+
+                ffmpeg = (
+                    FFmpeg(self._executable)
+                    .option("y")
+                    .input(input_url, input_options)
+                    .output(path, {"map": "0:v:0", **(video_options or {"vcodec": "libx264"})})
+                )
+                ffmpeg.on("progress", tracker.create_listener(index))
+                jobs.append(Job(ffmpeg, timeout=timeout))
+
+            for result in BatchRunner(self._concurrency, self._threads).run(jobs):
+                if isinstance(result, Exception):
+                    raise result
+
+            list_path = os.path.join(directory, "segments.txt")
+            write_concat_list(list_path, paths)
+
+            (
+                FFmpeg(self._executable)
+                .option("y")
+                .input(list_path, f="concat", safe=0)
+                .input(input_url)
+                .output(
+                    output_url,
+                    {"map": ["0:v:0", "1:a?"], "c:v": "copy", **(audio_options or {"c:a": "copy"})},
+                )
+                .execute(timeout=timeout)
+            )
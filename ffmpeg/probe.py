@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from fractions import Fraction
+from types import MappingProxyType
+from typing import Any, Mapping, Optional, Tuple, TypeVar, Union
+
+from ffmpeg.ffmpeg import FFmpeg
+from ffmpeg.protocol import FFmpegProtocol
+
+# Bump whenever the format of cached entries changes, so that stale entries on disk are never read
+_CACHE_VERSION = 1
+
+CacheKey = Tuple[Any, ...]
+FFmpegType = TypeVar("FFmpegType", bound=FFmpegProtocol)
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _freeze(value: Any) -> Any:
+    # Results are shared by every hit of a cache, so nothing reachable from them can be modified
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _to_rate(value: Any) -> Optional[float]:
+    # Rates are reported as fractions such as "30000/1001", or "0/0" if unknown
+    try:
+        return float(Fraction(value))
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+
+@dataclass(frozen=True)
+class MediaStream:
+    """Represents a stream of a media probed by `FFprobe`.
+
+    Attributes:
+        index: The index of the stream.
+        codec_type: The type of the stream, such as `video` or `audio`.
+        codec_name: The name of the codec.
+        duration: The duration of the stream in seconds.
+        bit_rate: The bitrate of the stream in bits per second.
+        width: The width of a video stream.
+        height: The height of a video stream.
+        pix_fmt: The pixel format of a video stream.
+        frame_rate: The frame rate of a video stream.
+        sample_rate: The sample rate of an audio stream.
+        channels: The number of channels of an audio stream.
+        channel_layout: The channel layout of an audio stream.
+        tags: Tags of the stream, which are read-only.
+        raw: All fields of the stream as reported by ffprobe, which are read-only.
+    """
+
+    index: int
+    codec_type: Optional[str]
+    codec_name: Optional[str]
+    duration: Optional[float]
+    bit_rate: Optional[int]
+    width: Optional[int]
+    height: Optional[int]
+    pix_fmt: Optional[str]
+    frame_rate: Optional[float]
+    sample_rate: Optional[int]
+    channels: Optional[int]
+    channel_layout: Optional[str]
+    tags: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    raw: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}), repr=False)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MediaStream:
+        raw = _freeze(data)
+        return cls(
+            index=data["index"],
+            codec_type=data.get("codec_type"),
+            codec_name=data.get("codec_name"),
+            duration=_to_float(data.get("duration")),
+            bit_rate=_to_int(data.get("bit_rate")),
+            width=_to_int(data.get("width")),
+            height=_to_int(data.get("height")),
+            pix_fmt=data.get("pix_fmt"),
+            frame_rate=_to_rate(data.get("avg_frame_rate")) or _to_rate(data.get("r_frame_rate")),
+            sample_rate=_to_int(data.get("sample_rate")),
+            channels=_to_int(data.get("channels")),
+            channel_layout=data.get("channel_layout"),
+            tags=raw.get("tags", MappingProxyType({})),
+            raw=raw,
+        )
+
+
+@dataclass(frozen=True)
+class MediaFormat:
+    """Represents the container of a media probed by `FFprobe`.
+
+    Attributes:
+        filename: The URL of the media.
+        format_name: The names of the format, separated by commas.
+        duration: The duration of the media in seconds.
+        size: The size of the media in bytes.
+        bit_rate: The bitrate of the media in bits per second.
+        nb_streams: The number of streams.
+        tags: Tags of the media, which are read-only.
+        raw: All fields of the format as reported by ffprobe, which are read-only.
+    """
+
+    filename: str
+    format_name: str
+    duration: Optional[float]
+    size: Optional[int]
+    bit_rate: Optional[int]
+    nb_streams: int
+    tags: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    raw: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}), repr=False)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MediaFormat:
+        raw = _freeze(data)
+        return cls(
+            filename=data["filename"],
+            format_name=data["format_name"],
+            duration=_to_float(data.get("duration")),
+            size=_to_int(data.get("size")),
+            bit_rate=_to_int(data.get("bit_rate")),
+            nb_streams=data["nb_streams"],
+            tags=raw.get("tags", MappingProxyType({})),
+            raw=raw,
+        )
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """Represents a media probed by `FFprobe`.
+
+    Attributes:
+        format: The container of the media.
+        streams: The streams of the media.
+    """
+
+    format: MediaFormat
+    streams: tuple[MediaStream, ...]
+
+    @property
+    def video_streams(self) -> list[MediaStream]:
+        return [stream for stream in self.streams if stream.codec_type == "video"]
+
+    @property
+    def audio_streams(self) -> list[MediaStream]:
+        return [stream for stream in self.streams if stream.codec_type == "audio"]
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MediaInfo:
+        return cls(
+            format=MediaFormat.from_dict(data["format"]),
+            streams=tuple(MediaStream.from_dict(stream) for stream in data.get("streams", [])),
+        )
+
+
+def get_cache_key(url: Union[str, os.PathLike]) -> Optional[CacheKey]:
+    # Only local files can be cached, since a change of any other URL cannot be detected
+    try:
+        stat = os.stat(url)
+    except (OSError, ValueError):
+        return None
+
+    # A file replaced or modified in place changes at least one of these
+    return (os.path.realpath(url), stat.st_size, stat.st_mtime_ns, stat.st_ino, stat.st_dev)
+
+
+class ProbeCache:
+    def __init__(
+        self,
+        capacity: int = 1024,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        disk_capacity: int = 65536,
+    ):
+        """Initialize a `ProbeCache` instance, which caches results of `FFprobe` keyed on the identity of files.
+           A result is invalidated as soon as the path, the size, the modification time or the inode of its file changes.
+
+        Args:
+            capacity: The maximum number of results kept in memory, evicting the least recently used ones.
+                Defaults to 1024.
+            directory: The directory to persist results to, so that they survive the process. Defaults to None,
+                which means results are only kept in memory.
+            disk_capacity: The maximum number of results kept in `directory`. When it is exceeded,
+                the least recently used ones are evicted down to nine tenths of it. Defaults to 65536.
+        """
+        self._capacity = capacity
+        self._directory = os.fspath(directory) if directory is not None else None
+        self._disk_capacity = disk_capacity
+
+        # Results are immutable, so that every hit shares the same one without any caller being able to modify it
+        self._entries: collections.OrderedDict[CacheKey, MediaInfo] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # The number of entries in `directory`, only listed on the first store and once the capacity is exceeded
+        self._disk_entries: Optional[int] = None
+
+        if self._directory is not None:
+            os.makedirs(self._directory, exist_ok=True)
+
+    def get(self, key: CacheKey) -> Optional[MediaInfo]:
+        with self._lock:
+            media = self._entries.get(key)
+            if media is not None:
+                self._entries.move_to_end(key)
+                return media
+
+        data = self._load(key)
+        if data is None:
+            return None
+
+        return self._remember(key, MediaInfo.from_dict(data))
+
+    def put(self, key: CacheKey, data: dict[str, Any]) -> MediaInfo:
+        self._store(key, data)
+        return self._remember(key, MediaInfo.from_dict(data))
+
+    def clear(self):
+        """Remove all results from memory and from `directory`."""
+        with self._lock:
+            self._entries.clear()
+            self._disk_entries = None
+
+        if self._directory is not None:
+            for entry in os.scandir(self._directory):
+                if entry.name.endswith(".json"):
+                    os.unlink(entry.path)
+
+    def _remember(self, key: CacheKey, media: MediaInfo) -> MediaInfo:
+        with self._lock:
+            self._entries[key] = media
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._capacity:
+                self._entries.popitem(last=False)
+
+        return media
+
+    def _get_path(self, key: CacheKey) -> str:
+        assert self._directory is not None
+
+        digest = hashlib.sha256(json.dumps([_CACHE_VERSION, *key]).encode()).hexdigest()
+        return os.path.join(self._directory, f"{digest}.json")
+
+    def _load(self, key: CacheKey) -> Optional[dict[str, Any]]:
+        if self._directory is None:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+            os.utime(path)  # mark the entry as recently used
+        except (OSError, ValueError):
+            return None
+
+        # Guard against collisions and entries written by other versions
+        if entry.get("key") != [_CACHE_VERSION, *key]:
+            return None
+
+        return entry["data"]
+
+    def _store(self, key: CacheKey, data: dict[str, Any]):
+        if self._directory is None:
+            return
+
+        # Write to a temporary file first, so that concurrent readers never see a partial entry
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self._directory, suffix=".tmp", delete=False
+        ) as file:
+            json.dump({"key": [_CACHE_VERSION, *key], "data": data}, file)
+
+        path = self._get_path(key)
+        added = not os.path.exists(path)
+        os.replace(file.name, path)
+
+        with self._lock:
+            if self._disk_entries is not None:
+                self._disk_entries += added
+                if self._disk_entries <= self._disk_capacity:
+                    return
+
+        count = self._evict()
+        with self._lock:
+            self._disk_entries = count
+
+    def _evict(self) -> int:
+        assert self._directory is not None
+
+        entries = [entry for entry in os.scandir(self._directory) if entry.name.endswith(".json")]
+        if len(entries) <= self._disk_capacity:
+            return len(entries)
+
+        # Evicting a tenth of the capacity at once lists the directory only once every so many stores
+        count = self._disk_capacity - self._disk_capacity // 10
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        for entry in entries[: len(entries) - count]:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass  # already evicted by another process
+
+        return count
+
+
+# Shared by all `FFprobe` instances unless specified otherwise
+default_cache = ProbeCache()
+
+
+def prepare_ffprobe(ffprobe: FFmpegType, url: Union[str, os.PathLike]) -> FFmpegType:
+    # Only errors are logged, so that the last line of the standard error explains a failure
+    return ffprobe.option("v", "error").input(url, print_format="json", show_format=None, show_streams=None)
+
+
+class FFprobe:
+    def __init__(self, executable: str = "ffprobe", cache: Optional[ProbeCache] = default_cache):
+        """Initialize an `FFprobe` instance.
+
+        Args:
+            executable: The path to the ffprobe executable. Defaults to "ffprobe".
+            cache: A cache to look results up in before running ffprobe.
+                Defaults to a cache in memory shared by all instances. Use None to always run ffprobe.
+        """
+        self._executable = executable
+        self._cache = cache
+
+    def probe(self, url: Union[str, os.PathLike], timeout: Optional[float] = None) -> MediaInfo:
+        """Probe the format and the streams of a media.
+
+        Args:
+            url: URL for the media.
+            timeout: The maximum number of seconds to wait for ffprobe. Defaults to None.
+
+        Raises:
+            FFmpegError: If ffprobe process returns non-zero exit status.
+            subprocess.TimeoutExpired: If ffprobe process does not terminate after `timeout` seconds.
+
+        Note:
+            ```python
+            media = FFprobe().probe("input.mp4")
+            print(media.format.duration, media.video_streams[0].width)
+            ```
+
+        Returns:
+            The format and the streams of the media.
+        """
+        key = get_cache_key(url) if self._cache is not None else None
+        if key is not None:
+            assert self._cache is not None
+
+            media = self._cache.get(key)
+            if media is not None:
+                return media
+
+        data = json.loads(prepare_ffprobe(FFmpeg(self._executable), url).execute(timeout=timeout))
+        if key is not None:
+            assert self._cache is not None
+            return self._cache.put(key, data)
+
+        return MediaInfo.from_dict(data)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+import time
+from dataclasses import dataclass
 from datetime import timedelta
+from typing import Any, Callable, Optional
 
-from ffmpeg.protocol import FFmpegProtocol
-from ffmpeg.statistics import Statistics
+from ffmpeg.statistics import parse_block, parse_line
 
 
 @dataclass(frozen=True)
@@ -18,22 +19,97 @@ class Progress:
         time: The current time of the media.
         bitrate: The processing speed in kilobits per second.
         speed: The processing speed
+        dup_frames: The number of duplicated frames. Only reported in the `pipe` progress mode. Defaults to 0.
+        drop_frames: The number of dropped frames. Only reported in the `pipe` progress mode. Defaults to 0.
     """
 
+    # A progress is created for every report, so it is kept as small as possible
+    __slots__ = ("frame", "fps", "size", "time", "bitrate", "speed", "dup_frames", "drop_frames")
+
     frame: int
     fps: float
     size: int
     time: timedelta
     bitrate: float
     speed: float
+    dup_frames: int
+    drop_frames: int
+
+    # Fields of a dataclass with `__slots__` cannot have defaults, so `__init__` is written out to give them some
+    def __init__(
+        self,
+        frame: int,
+        fps: float,
+        size: int,
+        time: timedelta,
+        bitrate: float,
+        speed: float,
+        dup_frames: int = 0,
+        drop_frames: int = 0,
+    ):
+        object.__setattr__(self, "frame", frame)
+        object.__setattr__(self, "fps", fps)
+        object.__setattr__(self, "size", size)
+        object.__setattr__(self, "time", time)
+        object.__setattr__(self, "bitrate", bitrate)
+        object.__setattr__(self, "speed", speed)
+        object.__setattr__(self, "dup_frames", dup_frames)
+        object.__setattr__(self, "drop_frames", drop_frames)
 
 
 class Tracker:
-    def __init__(self, ffmpeg: FFmpegProtocol):
-        self._ffmpeg = ffmpeg
-        self._ffmpeg.on("stderr", self._on_stderr)
-
-    def _on_stderr(self, line: str):
-        statistics = Statistics.from_line(line)
-        if statistics is not None:
-            self._ffmpeg.emit("progress", Progress(**asdict(statistics)))
+    """Emits `progress` from the statistics reported by FFmpeg, at most once per `interval` seconds.
+
+    Updates arriving sooner are coalesced, so that only the latest one is emitted once `interval` has passed,
+    or when `flush()` is called at the end of an execution.
+    """
+
+    def __init__(self, emit: Callable[..., Any], interval: Optional[float] = None):
+        self._emit_event = emit
+        self._interval = interval
+
+        self._emitted_at = float("-inf")
+        self._pending: Optional[Progress] = None
+        self._block: dict[str, str] = {}
+
+    def on_stderr(self, lines: list[bytes]):
+        for line in lines:
+            # Most lines are not statistics, so they are skipped without being decoded
+            if b"time=" not in line:
+                continue
+
+            fields = parse_line(line.decode())
+            if fields is not None:
+                self._emit(Progress(**fields))
+
+    def on_progress(self, lines: list[bytes]):
+        # `-progress` writes blocks of `key=value` lines, each of which ends with `progress=continue` or `progress=end`
+        for line in lines:
+            key, separator, value = line.decode().partition("=")
+            if not separator:
+                continue
+
+            if key != "progress":
+                self._block[key] = value.strip()
+                continue
+
+            fields = parse_block(self._block)
+            self._block = {}
+            self._emit(Progress(**fields))
+
+    def flush(self):
+        if self._pending is not None:
+            progress, self._pending = self._pending, None
+            self._emit_event("progress", progress)
+
+    def _emit(self, progress: Progress):
+        if self._interval is not None:
+            now = time.monotonic()
+            if now - self._emitted_at < self._interval:
+                self._pending = progress
+                return
+
+            self._emitted_at = now
+
+        self._pending = None
+        self._emit_event("progress", progress)
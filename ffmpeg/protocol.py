@@ -30,6 +30,8 @@ class FFmpegProtocol(Protocol):
         **kwargs: Optional[types.Option],
     ) -> Self: ...
 
+    def setdefault(self, key: str, value: Optional[types.Option] = None) -> Self: ...
+
     @overload
     def execute(
         self,
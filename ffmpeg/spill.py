@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from typing import Optional
+
+from ffmpeg.capabilities import get_version
+
+# Linux refuses a single argument longer than 128 KiB and Windows a command line longer than 32 KiB,
+# and copying large arguments slows down every spawn well before that
+SPILL_THRESHOLD = 16 * 1024
+
+_filter_option_pattern = re.compile(r"-(filter_complex|lavfi|filter(?::\S*)?|vf|af)")
+_release_pattern = re.compile(r"n?(\d+)\.(\d+)")
+# Builds from the development branch are versioned such as `N-113684-g...` or `2024-03-04-git-...`
+_development_pattern = re.compile(r"N-|\d{4}-\d{2}-\d{2}-git")
+# A scheme of at least two characters, so that a drive letter such as `C:` is not taken for one
+_url_pattern = re.compile(r"[A-Za-z][A-Za-z0-9+.-]+:")
+
+# Script options read the value of a filter option from a file before `-/option` was introduced
+_script_options = {
+    "filter_complex": "filter_complex_script",
+    "lavfi": "filter_complex_script",
+    "vf": "filter_script:v",
+    "af": "filter_script:a",
+}
+
+
+def is_release_at_least(executable: str, major: int, minor: int = 0) -> bool:
+    """Return whether an FFmpeg executable is at least of a release, counting development builds as the latest.
+
+    Args:
+        executable: The path to the ffmpeg executable.
+        major: The major version of the release.
+        minor: The minor version of the release. Defaults to 0.
+
+    Returns:
+        True if the executable is at least of the release, or False if it is older or its version is unknown.
+    """
+    try:
+        version = get_version(executable)
+    except OSError:
+        return False
+
+    match = _release_pattern.match(version)
+    if match is None:
+        return _development_pattern.match(version) is not None
+
+    return (int(match.group(1)), int(match.group(2))) >= (major, minor)
+
+
+def supports_option_files(executable: str) -> bool:
+    """Return whether an FFmpeg executable reads the value of any option from a file with `-/option path`,
+    which FFmpeg 7.0 introduced and deprecated the script options for.
+
+    Args:
+        executable: The path to the ffmpeg executable.
+
+    Returns:
+        True if `-/option path` is supported, or False if the script options have to be used.
+    """
+    return is_release_at_least(executable, 7)
+
+
+def supports_concat_files(executable: str) -> bool:
+    """Return whether an FFmpeg executable has the `concatf` protocol, which FFmpeg 5.1 introduced.
+    It joins the bytes of the URLs listed in a file, exactly as the `concat` protocol joins those of its URL.
+
+    Args:
+        executable: The path to the ffmpeg executable.
+
+    Returns:
+        True if the `concatf` protocol is supported.
+    """
+    return is_release_at_least(executable, 5, 1)
+
+
+class SpilledArguments:
+    """Arguments whose oversized values are moved into temporary files, which are removed by `cleanup()`."""
+
+    __slots__ = ("arguments", "_directory")
+
+    def __init__(self, arguments: list[str], directory: Optional[tempfile.TemporaryDirectory] = None):
+        self.arguments = arguments
+        self._directory = directory
+
+    def cleanup(self):
+        """Remove the temporary files, which FFmpeg no longer reads once it exits."""
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+
+
+def spill_arguments(arguments: list[str], threshold: int = SPILL_THRESHOLD) -> SpilledArguments:
+    """Move values of arguments longer than `threshold` into temporary files FFmpeg reads them from instead.
+
+    A filter graph of `-filter_complex`, `-lavfi`, `-filter`, `-vf` or `-af` is written to a script file,
+    which is passed with `-/option` or with the script options on FFmpeg older than 7.0.
+    An input using the `concat` protocol, such as `concat:a.ts|b.ts|...`, is written to a list file
+    of the `concatf` protocol, which joins the same bytes. It is left as is on FFmpeg older than 5.1.
+    Any other argument is left as is.
+
+    Args:
+        arguments: The arguments to execute FFmpeg with, starting with the executable.
+        threshold: The maximum number of characters of a value kept in the arguments. Defaults to 16 KiB.
+
+    Returns:
+        The arguments to execute FFmpeg with, which are the same list if nothing is spilled.
+    """
+    # Nearly every command is short, so it is only scanned once before anything is allocated
+    if all(len(argument) <= threshold for argument in arguments):
+        return SpilledArguments(arguments)
+
+    executable = arguments[0]
+    directory: Optional[tempfile.TemporaryDirectory] = None
+
+    def write(index: int, text: str) -> str:
+        nonlocal directory
+        if directory is None:
+            directory = tempfile.TemporaryDirectory(prefix="ffmpeg-")
+
+        path = os.path.join(directory.name, f"{index}.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+        return path
+
+    spilled = [executable]
+    index = 1
+    while index < len(arguments):
+        key = arguments[index]
+        value = arguments[index + 1] if index + 1 < len(arguments) else ""
+        if len(value) > threshold:
+            match = _filter_option_pattern.fullmatch(key)
+            if match is not None:
+                name = match.group(1)
+                if supports_option_files(executable):
+                    option = f"/{name}"
+                else:
+                    option = _script_options.get(name, name.replace("filter", "filter_script", 1))
+
+                spilled.extend([f"-{option}", write(index, value)])
+                index += 2
+                continue
+
+            # A list file is not in the working directory, so relative paths are made absolute to resolve the same
+            urls = value[len("concat:") :].split("|") if key == "-i" and value.startswith("concat:") else []
+            if urls and not any("\n" in url for url in urls) and supports_concat_files(executable):
+                lines = [url if _url_pattern.match(url) else os.path.abspath(url) for url in urls]
+                path = write(index, "\n".join(lines))
+                spilled.extend(["-i", f"concatf:{path}"])
+                index += 2
+                continue
+
+        spilled.append(key)
+        index += 1
+
+    return SpilledArguments(spilled, directory)
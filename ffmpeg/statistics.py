@@ -3,11 +3,11 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import Optional
+from typing import Any, Optional
 
 from typing_extensions import Self
 
-from ffmpeg.utils import parse_time, parse_size
+from ffmpeg.utils import parse_size, parse_time
 
 # Reference: https://github.com/FFmpeg/FFmpeg/blob/release/6.1/fftools/ffmpeg.c#L496
 
@@ -22,6 +22,64 @@ _field_factory = {
     "speed": lambda item: float(item.replace("x", "")),
 }
 
+# Reference: https://github.com/FFmpeg/FFmpeg/blob/release/6.1/fftools/ffmpeg.c#L592
+_progress_field_factory = {
+    "frame": ("frame", int),
+    "fps": ("fps", float),
+    "total_size": ("size", int),
+    "out_time_us": ("time", lambda item: timedelta(microseconds=int(item))),
+    "bitrate": ("bitrate", lambda item: float(item.replace("kbits/s", ""))),
+    "speed": ("speed", lambda item: float(item.replace("x", ""))),
+    "dup_frames": ("dup_frames", int),
+    "drop_frames": ("drop_frames", int),
+}
+
+_defaults: dict[str, Any] = {
+    "frame": 0,
+    "fps": 0.0,
+    "size": 0,
+    "time": timedelta(),
+    "bitrate": 0.0,
+    "speed": 0.0,
+    "dup_frames": 0,
+    "drop_frames": 0,
+}
+
+
+def parse_line(line: str) -> Optional[dict[str, Any]]:
+    # Most lines are not statistics, so reject them before running the pattern at all
+    if "time=" not in line:
+        return None
+
+    # Convert values while matching them, so that the line is scanned only once
+    fields = dict(_defaults)
+    count = 0
+    for match in _pattern.finditer(line):
+        key, value = match.groups()
+        count += 1
+        if value != "N/A":
+            fields[key] = _field_factory[key](value)
+
+    if count < 4:
+        # When a media type is audio,FFmpeg reports the below statistics
+        # - size, time, bitrate, speed
+        # When a media type is video, FFmpeg reports the below statistics
+        # - frame, fps, size, time, bitrate, speed
+        return None
+
+    return fields
+
+
+def parse_block(block: dict[str, str]) -> dict[str, Any]:
+    # Values of `-progress` are machine-readable, so they never depend on the locale or the version
+    fields = dict(_defaults)
+    for key, value in block.items():
+        if key in _progress_field_factory and value != "N/A":
+            name, factory = _progress_field_factory[key]
+            fields[name] = factory(value)
+
+    return fields
+
 
 @dataclass(frozen=True)
 class Statistics:
@@ -31,16 +89,17 @@ class Statistics:
     time: timedelta = field(default_factory=timedelta)
     bitrate: float = 0.0
     speed: float = 0.0
+    dup_frames: int = 0
+    drop_frames: int = 0
 
     @classmethod
     def from_line(cls, line: str) -> Optional[Self]:
-        statistics = {key: value for key, value in _pattern.findall(line)}
-        if len(statistics) < 4:
-            # When a media type is audio,FFmpeg reports the below statistics
-            # - size, time, bitrate, speed
-            # When a media type is video, FFmpeg reports the below statistics
-            # - frame, fps, size, time, bitrate, speed
+        fields = parse_line(line)
+        if fields is None:
             return None
 
-        fields = {key: _field_factory[key](value) for key, value in statistics.items() if value != "N/A"}
         return cls(**fields)
+
+    @classmethod
+    def from_progress(cls, block: dict[str, str]) -> Self:
+        return cls(**parse_block(block))
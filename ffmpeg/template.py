@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import functools
+import re
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+from ffmpeg.file import InputFile, OutputFile
+from ffmpeg.options import Option, Options
+
+F = TypeVar("F")
+
+_placeholder_pattern = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+def _render_value(value: Any, values: dict[str, Any]) -> Any:
+    # A placeholder without a value is left as is
+    match = _placeholder_pattern.fullmatch(str(value)) if value is not None else None
+    return str(values[match.group(1)]) if match is not None and match.group(1) in values else value
+
+
+def _render_options(options: Options, values: dict[str, Any]) -> Options:
+    # Mirrors `Template.render()` on the options, so that they build the same arguments as those rendered
+    def render(option: Option) -> Option:
+        return Option(option.key, _render_value(option.value, values))
+
+    rendered = Options()
+    rendered._global_options = [render(option) for option in options._global_options]
+    rendered._input_files = [
+        InputFile(_render_value(file.url, values), [render(option) for option in file.options])
+        for file in options._input_files
+    ]
+    rendered._output_files = [
+        OutputFile(_render_value(file.url, values), [render(option) for option in file.options])
+        for file in options._output_files
+    ]
+    return rendered
+
+
+class Template(Generic[F]):
+    """An immutable command compiled from an `FFmpeg` instance, whose arguments are rendered for every job
+    without building the options again.
+
+    An argument which is exactly a placeholder such as `{input}` is replaced by the value of the field of the same name.
+    A placeholder always replaces a whole argument, so that braces within arguments, such as in the text of `drawtext`,
+    are left as is. To vary part of an argument, such as a filter graph, make the whole argument a placeholder.
+
+    Create one with `FFmpeg.compile()` instead of initializing it directly.
+    """
+
+    __slots__ = ("_arguments", "_options", "_slots", "_fields", "_factory")
+
+    def __init__(self, arguments: Iterable[str], options: Options, factory: Callable[[], F]):
+        self._arguments = tuple(arguments)
+        # A copy, so that options added to the compiled instance afterwards do not change the template
+        self._options = _render_options(options, {})
+        self._factory = factory
+
+        # Only the positions of placeholders are kept, so that rendering copies the other arguments at once
+        slots = []
+        for index, argument in enumerate(self._arguments):
+            match = _placeholder_pattern.fullmatch(argument)
+            if match is not None:
+                slots.append((index, match.group(1)))
+
+        self._slots = tuple(slots)
+        self._fields = frozenset(name for _, name in slots)
+
+    @property
+    def fields(self) -> frozenset[str]:
+        """The names of the placeholders, each of which must be given a value to render the template."""
+        return self._fields
+
+    def render(self, **values: Any) -> list[str]:
+        """Render the arguments to execute FFmpeg with, replacing placeholders with values.
+
+        Args:
+            **values: A value for every field. Values are converted to strings like the values of options.
+
+        Raises:
+            ValueError: If a field has no value, or a value is given for an unknown field.
+
+        Returns:
+            A list of arguments to be used when executing FFmpeg.
+        """
+        if values.keys() != self._fields:
+            missing = sorted(self._fields - values.keys())
+            unknown = sorted(values.keys() - self._fields)
+            raise ValueError(f"Values do not match the fields of the template (missing: {missing}, unknown: {unknown})")
+
+        arguments = list(self._arguments)
+        for index, name in self._slots:
+            arguments[index] = str(values[name])
+
+        return arguments
+
+    def create(self, **values: Any) -> F:
+        """Create an `FFmpeg` instance executing the template with values, which can be executed once or many times.
+
+        It is initialized with the same parameters as the instance the template was compiled from, but not the listeners.
+        Its arguments are already rendered, unless it is changed, such as by `setdefault()` or `frames()`.
+        Then the options of the template are rendered instead, and the changes are applied on top of them.
+
+        Args:
+            **values: A value for every field.
+
+        Raises:
+            ValueError: If a field has no value, or a value is given for an unknown field.
+
+        Note:
+            ```python
+            template = FFmpeg().option("y").input("{input}").output("{output}", crf="{crf}").compile()
+
+            for path in paths:
+                template.create(input=path, output=path.with_suffix(".mp4"), crf=23).execute()
+            ```
+
+        Returns:
+            An `FFmpeg` instance, or an `FFmpeg` instance using `asyncio` if the template was compiled from one.
+        """
+        arguments = self.render(**values)
+
+        ffmpeg = self._factory()
+        ffmpeg._arguments = arguments  # type: ignore
+        ffmpeg._render_options = functools.partial(_render_options, self._options, values)  # type: ignore
+        return ffmpeg
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import socket
 from typing import IO, Callable, Iterable, TypeVar, Union
 
+from typing_extensions import Literal
+
 Numeric = Union[int, float]
 
 T = Union[str, Numeric]
 Option = Union[Iterable[T], T]
 
 Stream = Union[bytes, IO[bytes]]
-AsyncStream = Union[bytes, asyncio.StreamReader]
+AsyncStream = Union[bytes, asyncio.StreamReader, IO[bytes]]
+
+ProgressMode = Literal["stderr", "pipe"]
+MediaType = Literal["video", "audio"]
+DispatchPolicy = Literal["block", "drop_oldest", "drop_newest", "coalesce"]
+
+Sink = Union[str, os.PathLike, int, IO[bytes], socket.socket]
 
 Handler = TypeVar("Handler", bound=Callable[..., None])
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import collections
+import contextlib
 import io
+import os
 import re
 import subprocess
 import sys
+import time
 from datetime import timedelta
-from typing import IO, Any, Iterable
+from typing import IO, Any, Iterable, Iterator, Optional, Union
 
 from ffmpeg import types
 
@@ -34,6 +38,60 @@ def is_windows() -> bool:
     return sys.platform == "win32"
 
 
+def is_linux() -> bool:
+    return sys.platform.startswith("linux")
+
+
+def cpu_count() -> int:
+    # Respect the CPU affinity of the process, which is narrower than the number of CPUs in containers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1
+
+
+def wait_process(process: subprocess.Popen, timeout: Optional[float] = None) -> Optional[Any]:
+    """Wait for a process to exit, and reap it with `os.wait4()` to find the resources it used.
+
+    Args:
+        process: The process to wait for.
+        timeout: The maximum number of seconds to wait. Defaults to None.
+
+    Raises:
+        subprocess.TimeoutExpired: If the process does not exit after `timeout` seconds.
+
+    Returns:
+        The resource usage of the process as returned by `os.wait4()`, or None if it is not available,
+        such as on Windows or if the process was already reaped.
+    """
+    if not hasattr(os, "wait4") or process.returncode is not None:
+        process.wait(timeout)
+        return None
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    delay = 0.0005
+    while True:
+        try:
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG if deadline is not None else 0)
+        except ChildProcessError:
+            process.wait(timeout)  # reaped by someone else, who knows its exit status
+            return None
+
+        if pid == process.pid:
+            # Popen never waits for a process whose exit status is already known
+            process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+            return rusage
+
+        assert deadline is not None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)  # type: ignore
+
+        # Back off like `Popen.wait()` does, since there is no way to wait for a process with a timeout
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+
 def create_subprocess(*args: Any, **kwargs: Any) -> subprocess.Popen:
     # On Windows, CREATE_NEW_PROCESS_GROUP flag is required to use CTRL_BREAK_EVENT signal,
     # which is required to gracefully terminate the FFmpeg process.
@@ -44,6 +102,28 @@ def create_subprocess(*args: Any, **kwargs: Any) -> subprocess.Popen:
     return subprocess.Popen(*args, **kwargs)
 
 
+def get_fileno(stream: Any) -> Optional[int]:
+    # Return a file descriptor which FFmpeg can read from directly, or None if the stream has to be copied through Python
+    if isinstance(stream, (bytes, io.BytesIO)) or not hasattr(stream, "fileno"):
+        return None
+
+    try:
+        fd = stream.fileno()
+    except (OSError, ValueError):
+        return None
+
+    if isinstance(stream, io.RawIOBase):
+        return fd
+
+    # A buffered stream may have read ahead of its current position.
+    # If it is seekable, the file descriptor can be moved back to the position, otherwise the read-ahead data would be lost.
+    if stream.seekable():
+        os.lseek(fd, stream.tell(), os.SEEK_SET)
+        return fd
+
+    return None
+
+
 def ensure_io(stream: types.Stream) -> IO[bytes]:
     if isinstance(stream, bytes):
         stream = io.BytesIO(stream)
@@ -51,6 +131,76 @@ def ensure_io(stream: types.Stream) -> IO[bytes]:
     return stream
 
 
+def get_pipe_size(fd: int) -> Optional[int]:
+    # F_GETPIPE_SZ is only available on Linux.
+    # Reference: https://man7.org/linux/man-pages/man2/fcntl.2.html
+    if not is_linux():
+        return None
+
+    import fcntl
+
+    try:
+        return fcntl.fcntl(fd, getattr(fcntl, "F_GETPIPE_SZ", 1032))
+    except OSError:
+        return None
+
+
+def set_pipe_size(fd: int, size: int) -> Optional[int]:
+    # F_SETPIPE_SZ is only available on Linux, and an unprivileged process cannot exceed /proc/sys/fs/pipe-max-size.
+    # Pipes are only ever enlarged, since a smaller pipe makes both ends block and switch context more often.
+    # Reference: https://man7.org/linux/man-pages/man2/fcntl.2.html
+    if not is_linux():
+        return None
+
+    import fcntl
+
+    capacity = get_pipe_size(fd)
+    if capacity is not None and capacity >= size:
+        return capacity
+
+    try:
+        return fcntl.fcntl(fd, getattr(fcntl, "F_SETPIPE_SZ", 1031), size)
+    except OSError:
+        return capacity
+
+
+@contextlib.contextmanager
+def open_sink(sink: Optional[types.Sink]) -> Iterator[Union[int, IO[bytes]]]:
+    # Resolve a sink into something that can be handed to a subprocess as its standard output.
+    # The subprocess inherits its own copy of the file descriptor, so a file opened here can be closed right after spawning.
+    if sink is None:
+        yield subprocess.PIPE
+    elif isinstance(sink, int):
+        yield sink
+    elif isinstance(sink, (str, os.PathLike)):
+        with open(sink, "wb") as file:
+            yield file
+    else:
+        if hasattr(sink, "flush"):
+            sink.flush()  # type: ignore
+
+        yield sink.fileno()
+
+
+@contextlib.contextmanager
+def open_progress_pipe(enabled: bool) -> Iterator[tuple[Optional[IO[bytes]], Optional[int]]]:
+    # The write end is inherited by FFmpeg and closed here right after spawning,
+    # so that the read end reaches the end of file as soon as FFmpeg exits
+    if not enabled:
+        yield None, None
+        return
+
+    read_fd, write_fd = os.pipe()
+    reader = os.fdopen(read_fd, "rb", buffering=0)
+    try:
+        yield reader, write_fd
+    except BaseException:
+        reader.close()
+        raise
+    finally:
+        os.close(write_fd)
+
+
 def read_stream(stream: IO[bytes], size: int = -1) -> Iterable[bytes]:
     while True:
         chunk = stream.read(size)
@@ -60,17 +210,163 @@ def read_stream(stream: IO[bytes], size: int = -1) -> Iterable[bytes]:
         yield chunk
 
 
-def readlines(stream: IO[bytes]) -> Iterable[bytes]:
-    pattern = re.compile(rb"[\r\n]+")
+def readinto_stream(stream: IO[bytes], buffer: bytearray) -> Iterable[memoryview]:
+    # Every chunk is a view over the same `buffer`, which is only valid until the next chunk is read
+    with memoryview(buffer) as view:
+        while True:
+            length = stream.readinto(view)
+            if not length:
+                break
+
+            yield view[:length]
+
 
+def readall_into(stream: IO[bytes], buffer: bytearray, size: int) -> Iterable[int]:
+    # Read the whole stream directly into the end of `buffer`, so that no intermediate chunk is allocated
+    length = len(buffer)
+    while True:
+        if len(buffer) - length < size:
+            if length < size:
+                buffer.extend(bytes(size))
+            else:
+                # Doubling in place repeats what was read instead of allocating a zeroed buffer to append,
+                # which is overwritten or truncated anyway
+                buffer *= 2
+
+        with memoryview(buffer)[length:] as view:
+            read = stream.readinto(view)
+        if not read:
+            break
+
+        length += read
+        yield length
+
+    del buffer[length:]
+
+
+def read_chunks(stream: IO[bytes], size: int) -> Iterable[Any]:
+    if isinstance(stream, io.BytesIO):
+        # Slice the underlying buffer of the stream directly instead of copying it into chunks
+        return slice_buffer(stream.getbuffer()[stream.tell() :], size)
+    elif hasattr(stream, "readinto"):
+        return readinto_stream(stream, bytearray(size))
+    else:
+        return read_stream(stream, size=size)
+
+
+def slice_buffer(data: Any, size: int) -> Iterable[memoryview]:
+    with memoryview(data).cast("B") as view:
+        for offset in range(0, len(view), size):
+            yield view[offset : offset + size]
+
+
+def write_all(stream: IO[bytes], data: Any):
+    # A raw stream may write fewer bytes than requested
+    view = memoryview(data).cast("B")
+    while view:
+        written = stream.write(view)
+        view = view[written:]
+
+
+_line_pattern = re.compile(rb"[\r\n]+")
+
+
+def split_lines(buffer: bytearray, chunk: bytes) -> list[bytes]:
+    buffer.extend(chunk)
+
+    # A long line spanning many reads must not be scanned again on every read
+    if b"\n" not in chunk and b"\r" not in chunk:
+        return []
+
+    lines = _line_pattern.split(buffer)
+    buffer[:] = lines.pop(-1)  # keep the last line that could be partial
+
+    return lines
+
+
+class TailBuffer:
+    """Keeps the last lines of a stream, bounded by both the number of lines and their total size,
+    so that memory stays constant however long FFmpeg runs.
+    """
+
+    def __init__(self, max_lines: int = 32, max_bytes: int = 65536):
+        self._max_lines = max_lines
+        self._max_bytes = max_bytes
+
+        self._lines: collections.deque[bytes] = collections.deque()
+        self._size = 0
+
+    @property
+    def last_line(self) -> bytes:
+        return self._lines[-1] if self._lines else b""
+
+    def extend(self, lines: list[bytes]):
+        # Lines which would be evicted right away are never stored
+        for line in lines[-self._max_lines :]:
+            line = line[: self._max_bytes]
+            self._lines.append(line)
+            self._size += len(line)
+
+        while len(self._lines) > self._max_lines or self._size > self._max_bytes:
+            self._size -= len(self._lines.popleft())
+
+    def decode(self) -> list[str]:
+        return [line.decode(errors="replace") for line in self._lines]
+
+
+def read_line_batches(stream: IO[bytes]) -> Iterable[list[bytes]]:
+    # Lines are handed over in batches of everything read at once, rather than one by one
     buffer = bytearray()
     for chunk in read_stream(stream, io.DEFAULT_BUFFER_SIZE):
-        buffer.extend(chunk)
+        lines = split_lines(buffer, chunk)
+        if lines:
+            yield lines
 
-        lines = pattern.split(buffer)
-        buffer[:] = lines.pop(-1)  # keep the last line that could be partial
+    if buffer:
+        yield [bytes(buffer)]
 
-        yield from lines
 
-    if buffer:
-        yield bytes(buffer)
+def get_stderr_options(
+    keys: Iterable[str],
+    logging: bool,
+    stats: bool,
+    interval: Optional[float],
+) -> list[str]:
+    """Return global options making FFmpeg print only what the registered listeners need.
+
+    Args:
+        keys: The keys of options already specified, which are never overridden.
+        logging: Whether anyone listens to lines of the standard error.
+        stats: Whether statistics are parsed from the standard error.
+        interval: The minimum number of seconds between `progress` events, if statistics are tracked at all.
+
+    Returns:
+        A list of arguments to be inserted before any other option.
+    """
+    keys = set(keys)
+    options: list[str] = []
+
+    if not logging and not keys & {"loglevel", "v"}:
+        # Errors are still printed, so that the last line of the standard error explains a failure
+        options.extend(["-loglevel", "error"])
+        if stats:
+            # Statistics are printed regardless of the log level only if explicitly requested
+            options.append("-stats")
+
+    if interval and "stats_period" not in keys:
+        options.extend(["-stats_period", str(interval)])
+
+    return options
+
+
+def write_concat_list(path: Union[str, os.PathLike], urls: Iterable[str]):
+    """Write a list file of the concat demuxer, which is read with `-f concat -safe 0 -i path`.
+
+    Args:
+        path: The path to the list file.
+        urls: The URLs of the files to concatenate, in order.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        for url in urls:
+            escaped = url.replace("'", "'\\''")
+            file.write(f"file '{escaped}'\n")
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import io
+import re
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Any, Iterator, Optional
+
+from ffmpeg import types
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# The report comes long before this much output, so a longer wait means it is never coming.
+# Holding the output any longer would buffer the whole stream in memory.
+MAX_PENDING_SIZE = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class PixelFormat:
+    """Describes how a frame of a packed pixel format is laid out in memory.
+
+    Attributes:
+        dtype: The NumPy data type of each sample.
+        itemsize: The number of bytes in each sample.
+        channels: The number of samples in each pixel.
+    """
+
+    dtype: str
+    itemsize: int
+    channels: int
+
+    def shape(self, width: int, height: int) -> tuple[int, ...]:
+        return (height, width) if self.channels == 1 else (height, width, self.channels)
+
+    def frame_size(self, width: int, height: int) -> int:
+        return width * height * self.channels * self.itemsize
+
+
+# Pixel formats whose frames can be represented as a single array
+_pixel_formats = {
+    "gray": PixelFormat("u1", 1, 1),
+    "gray16le": PixelFormat("<u2", 2, 1),
+    "grayf32le": PixelFormat("<f4", 4, 1),
+    "rgb24": PixelFormat("u1", 1, 3),
+    "bgr24": PixelFormat("u1", 1, 3),
+    "rgb48le": PixelFormat("<u2", 2, 3),
+    "rgba": PixelFormat("u1", 1, 4),
+    "bgra": PixelFormat("u1", 1, 4),
+    "argb": PixelFormat("u1", 1, 4),
+    "abgr": PixelFormat("u1", 1, 4),
+    "rgba64le": PixelFormat("<u2", 2, 4),
+}
+
+# Reference: https://github.com/FFmpeg/FFmpeg/blob/release/6.1/libavformat/dump.c
+_size_pattern = re.compile(r"Stream #\d+:\d+.*: Video: .*?, (\d+)x(\d+)")
+
+
+def get_pixel_format(pix_fmt: str) -> PixelFormat:
+    if pix_fmt not in _pixel_formats:
+        raise ValueError(f"Unsupported pixel format: {pix_fmt} (supported: {', '.join(_pixel_formats)})")
+
+    return _pixel_formats[pix_fmt]
+
+
+def find_pixel_format(frame: np.ndarray) -> str:
+    import numpy as np
+
+    channels = 1 if frame.ndim == 2 else frame.shape[2]
+    for pix_fmt, pixel_format in _pixel_formats.items():
+        if pixel_format.channels == channels and np.dtype(pixel_format.dtype) == frame.dtype:
+            return pix_fmt
+
+    raise ValueError(f"Could not find a pixel format for frames of shape {frame.shape} and type {frame.dtype}")
+
+
+def get_frame_buffer(frame: np.ndarray, shape: tuple[int, ...], dtype: Any) -> memoryview:
+    import numpy as np
+
+    if frame.shape != shape or frame.dtype != dtype:
+        raise ValueError(f"Expected a frame of shape {shape} and type {dtype}, got {frame.shape} and {frame.dtype}")
+
+    # A contiguous frame is exposed as is through the buffer protocol, so only strided views are copied
+    return memoryview(np.ascontiguousarray(frame)).cast("B")
+
+
+def get_frame_buffers(first: np.ndarray, frames: Iterator[np.ndarray]) -> Iterator[memoryview]:
+    yield get_frame_buffer(first, first.shape, first.dtype)
+    for frame in frames:
+        yield get_frame_buffer(frame, first.shape, first.dtype)
+
+
+def get_input_options(frame: np.ndarray, pix_fmt: Optional[str]) -> dict[str, Optional[types.Option]]:
+    if frame.ndim not in (2, 3):
+        raise ValueError(f"Expected a frame of shape (height, width) or (height, width, channels), got {frame.shape}")
+
+    height, width = frame.shape[:2]
+    return {
+        "f": "rawvideo",
+        "pix_fmt": pix_fmt if pix_fmt is not None else find_pixel_format(frame),
+        "s": f"{width}x{height}",
+    }
+
+
+class VideoSize:
+    """Finds the size of the first video stream of the output from lines of the standard error."""
+
+    def __init__(self, width: Optional[int] = None, height: Optional[int] = None):
+        self.size = (width, height) if width is not None and height is not None else None
+        self._output = False
+
+    def on_stderr(self, line: str):
+        if self.size is not None:
+            return
+
+        if line.startswith("Output #"):
+            self._output = True
+        elif self._output:
+            match = _size_pattern.search(line)
+            if match is not None:
+                self.size = (int(match.group(1)), int(match.group(2)))
+
+
+def read_frames(
+    stream: IO[bytes],
+    video_size: VideoSize,
+    pixel_format: PixelFormat,
+    buffers: int,
+) -> Iterator[np.ndarray]:
+    import numpy as np
+
+    # FFmpeg reports the size of the output before writing any frame,
+    # but the report may be read after some frames, so hold them until the size is known
+    pending = bytearray()
+    while video_size.size is None:
+        chunk = stream.read(io.DEFAULT_BUFFER_SIZE)
+        if not chunk:
+            if pending:
+                raise ValueError("Could not find the size of frames. Specify width and height, or use -loglevel info")
+            return
+
+        pending.extend(chunk)
+        if len(pending) > MAX_PENDING_SIZE:
+            raise ValueError("Could not find the size of frames. Specify width and height, or use -loglevel info")
+
+    width, height = video_size.size
+
+    # Every frame is read into a ring of preallocated buffers, which are exposed as arrays created only once
+    ring = [bytearray(pixel_format.frame_size(width, height)) for _ in range(buffers)]
+    views = [memoryview(buffer) for buffer in ring]
+    frames = [
+        np.frombuffer(buffer, dtype=pixel_format.dtype).reshape(pixel_format.shape(width, height)) for buffer in ring
+    ]
+
+    index = 0
+    while True:
+        view = views[index]
+
+        filled = min(len(pending), len(view))
+        if filled > 0:
+            view[:filled] = pending[:filled]
+            del pending[:filled]
+
+        while filled < len(view):
+            length = stream.readinto(view[filled:] if filled > 0 else view)
+            if not length:
+                return  # a truncated frame is discarded
+
+            filled += length
+
+        yield frames[index]
+        index = (index + 1) % buffers
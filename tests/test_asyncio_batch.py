@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import BatchProgress, FFmpegUnsupportedCodec, Job
+from ffmpeg.asyncio import BatchRunner, FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_batch(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    runner = BatchRunner(concurrency=2, threads=1)
+    progresses: list[BatchProgress] = []
+    runner.on("progress", progresses.append)
+
+    ffmpegs = [
+        FFmpeg().input(source_path).output("pipe:1", {"codec:a": codec}, f="s16le")
+        for codec in ["pcm_s16le", "invalid", "pcm_s16le"]
+    ]
+    jobs = [ffmpegs[0], ffmpegs[1], Job(ffmpegs[2], timeout=10)]
+    results = await runner.run(jobs)
+
+    assert isinstance(results[0], bytes) and len(results[0]) > 0
+    assert isinstance(results[1], FFmpegUnsupportedCodec)
+    assert results[2] == results[0]
+
+    assert all(progress.running <= 2 for progress in progresses)
+    assert progresses[-1].total == 3
+    assert progresses[-1].completed == 2
+    assert progresses[-1].failed == 1
+
+    assert jobs[0].arguments.count("-threads") == 2
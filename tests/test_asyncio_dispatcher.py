@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from ffmpeg import Progress
+from ffmpeg.asyncio import FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_dispatch():
+    ffmpeg = (
+        FFmpeg(dispatch="coalesce", dispatch_capacity=1)
+        .option("stats_period", 0.01)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    progresses: list[Progress] = []
+
+    @ffmpeg.on("progress")
+    async def on_progress(progress: Progress):
+        await asyncio.sleep(0.01)
+        progresses.append(progress)
+
+    await ffmpeg.execute()
+
+    # Coroutine listeners are awaited by the dispatcher, so every delivered progress is handled before `completed`
+    metrics = ffmpeg.dispatch_metrics
+    assert metrics is not None
+    assert progresses[-1].frame == 50
+    assert metrics.dispatched == len(progresses)
+
+
+@pytest.mark.asyncio
+async def test_asyncio_dispatch_exception():
+    ffmpeg = (
+        FFmpeg(dispatch="block")
+        .option("stats_period", 0.01)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    @ffmpeg.on("progress")
+    def on_progress(progress: Progress):
+        raise RuntimeError("Raised error")
+
+    with pytest.raises(RuntimeError, match="Raised error"):
+        await ffmpeg.execute()
+
+
+@pytest.mark.asyncio
+async def test_asyncio_process_is_killed_if_dispatcher_fails(monkeypatch: pytest.MonkeyPatch):
+    def create_dispatcher(*args, **kwargs):
+        raise RuntimeError("Raised error")
+
+    monkeypatch.setattr("ffmpeg.asyncio.ffmpeg.Dispatcher", create_dispatcher)
+
+    ffmpeg = FFmpeg(dispatch="block").input("anullsrc", f="lavfi").output("-", f="null")
+    failures: list[BaseException] = []
+    ffmpeg.on("failed", failures.append)
+
+    with pytest.raises(RuntimeError, match="Raised error"):
+        await ffmpeg.execute()
+
+    assert len(failures) == 1
+    assert ffmpeg._process.returncode is not None
@@ -133,3 +133,13 @@ async def test_asyncio_raises_unsupported_codec_for_invalid_decoder(
             )
             .execute()
         )
+
+
+@pytest.mark.asyncio
+async def test_asyncio_raises_invalid_command_from_tail():
+    ffmpeg = FFmpeg().input("testsrc", f="lavfi", t=1).output("pipe:1", f="null", vf="invalid")
+
+    with pytest.raises(FFmpegInvalidCommand) as exc_info:
+        await ffmpeg.execute()
+
+    assert any("No such filter: 'invalid'" in line for line in exc_info.value.tail)
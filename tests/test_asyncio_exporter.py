@@ -0,0 +1,29 @@
+import asyncio
+import urllib.request
+
+import pytest
+
+from ffmpeg import MetricsExporter
+from ffmpeg.asyncio import FFmpeg, Scheduler
+
+
+@pytest.mark.asyncio
+async def test_asyncio_exporter():
+    exporter = MetricsExporter()
+    scheduler = exporter.track(Scheduler(concurrency=1))
+
+    ffmpeg = FFmpeg().input("testsrc=size=320x240:rate=25", f="lavfi", t=1).output("pipe:1", f="null")
+    await scheduler.run(ffmpeg)
+
+    server = exporter.serve(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        response = await asyncio.get_running_loop().run_in_executor(None, urllib.request.urlopen, url)
+        text = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "ffmpeg_jobs_completed_total 1\n" in text
+    assert "ffmpeg_queue_wait_seconds_count 1\n" in text
@@ -0,0 +1,25 @@
+import pytest
+
+from ffmpeg.asyncio import FFmpeg
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.mark.asyncio
+async def test_encode_frames():
+    frames = [np.full((48, 64, 3), index * 10, dtype=np.uint8) for index in range(10)]
+
+    async def render():
+        for frame in frames:
+            yield frame
+
+    ffmpeg = FFmpeg().output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    output = await ffmpeg.encode_frames(render())
+
+    assert output == b"".join(frame.tobytes() for frame in frames)
+
+
+@pytest.mark.asyncio
+async def test_encode_frames_without_frames():
+    with pytest.raises(ValueError):
+        await FFmpeg().output("pipe:1", f="rawvideo").encode_frames([])
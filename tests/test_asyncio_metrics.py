@@ -0,0 +1,26 @@
+import pytest
+
+from ffmpeg import ExecutionMetrics
+from ffmpeg.asyncio import FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_metrics():
+    ffmpeg = (
+        FFmpeg().input("pipe:0", f="rawvideo", pix_fmt="gray", s="16x16").output("pipe:1", f="rawvideo", pix_fmt="gray")
+    )
+
+    metrics: list[ExecutionMetrics] = []
+    ffmpeg.on("metrics", metrics.append)
+    stdout = await ffmpeg.execute(bytes(256 * 10))
+
+    assert metrics == [ffmpeg.metrics]
+    assert ffmpeg.metrics is not None
+    assert ffmpeg.metrics.stdin_bytes == 256 * 10
+    assert ffmpeg.metrics.stdout_bytes == len(stdout) == 256 * 10
+    assert ffmpeg.metrics.stderr_lines > 0
+    assert ffmpeg.metrics.first_byte_time is not None
+    assert 0 <= ffmpeg.metrics.spawn_time <= ffmpeg.metrics.first_byte_time <= ffmpeg.metrics.wall_time
+    # asyncio reaps the process by itself, so the resources it used are unknown
+    assert ffmpeg.metrics.user_time is None
+    assert ffmpeg.metrics.max_rss is None
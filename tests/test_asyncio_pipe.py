@@ -66,3 +66,96 @@ async def test_asyncio_output_via_stdout(
 
     assert abs(float(source["format"]["duration"]) - float(target["format"]["duration"])) <= epsilon
     assert target["format"]["format_name"] == "ogg"
+
+
+@pytest.mark.asyncio
+async def test_asyncio_output_via_stdout_iteratively(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input(source_path)
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    chunks = [chunk async for chunk in ffmpeg.iterate(size=4096)]
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 4096 for chunk in chunks)
+    assert b"".join(chunks) == await ffmpeg.execute()
+
+
+@pytest.mark.asyncio
+async def test_asyncio_input_and_output_via_pipes_without_copy(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input("pipe:0")
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    expected = await ffmpeg.execute(source_path.read_bytes())
+    from_bytes = await ffmpeg.execute(source_path.read_bytes(), size=4096, copy=False)
+
+    assert isinstance(from_bytes, bytearray)
+    assert from_bytes == expected
+
+
+@pytest.mark.asyncio
+async def test_asyncio_output_via_sink(
+    assets_path: Path,
+    tmp_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+    target_path = tmp_path / "brewing.raw"
+
+    ffmpeg = (
+        FFmpeg()
+        .input(source_path)
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    expected = await ffmpeg.execute()
+
+    assert await ffmpeg.execute(sink=target_path) == b""
+    assert target_path.read_bytes() == expected
+
+
+@pytest.mark.asyncio
+async def test_asyncio_input_via_file_descriptor(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input("pipe:0")
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    expected = await ffmpeg.execute(source_path.read_bytes())
+
+    with open(source_path, "rb") as source_file:
+        assert await ffmpeg.execute(source_file) == expected
+        assert ffmpeg._process.stdin is None
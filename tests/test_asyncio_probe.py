@@ -0,0 +1,16 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import ProbeCache
+from ffmpeg.asyncio import FFprobe
+
+
+@pytest.mark.asyncio
+async def test_asyncio_probe(assets_path: Path):
+    ffprobe = FFprobe(cache=ProbeCache())
+    media = await ffprobe.probe(assets_path / "brewing.wav")
+
+    assert media.format.format_name == "wav"
+    assert media.audio_streams[0].sample_rate == 44100
+    assert await ffprobe.probe(assets_path / "brewing.wav") is media
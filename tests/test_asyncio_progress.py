@@ -0,0 +1,39 @@
+import pytest
+
+from ffmpeg import Progress
+from ffmpeg.asyncio import FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_progress_via_pipe():
+    ffmpeg = (
+        FFmpeg(progress="pipe")
+        .option("stats_period", 0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    progresses: list[Progress] = []
+    ffmpeg.on("progress", progresses.append)
+    output = await ffmpeg.execute()
+
+    assert len(progresses) > 0
+    assert progresses[-1].frame == 50
+    assert progresses[-1].size == len(output)
+
+
+@pytest.mark.asyncio
+async def test_asyncio_progress_interval():
+    ffmpeg = (
+        FFmpeg(progress_interval=60)
+        .option("stats_period", 0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    progresses: list[Progress] = []
+    ffmpeg.on("progress", progresses.append)
+    await ffmpeg.execute()
+
+    assert 1 <= len(progresses) <= 2
+    assert progresses[-1].frame == 50
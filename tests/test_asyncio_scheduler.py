@@ -0,0 +1,90 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from ffmpeg.asyncio import FFmpeg, Scheduler
+
+
+@pytest.mark.asyncio
+async def test_asyncio_scheduler_priority(
+    assets_path: Path,
+):
+    scheduler = Scheduler(concurrency=1)
+    started: list[str] = []
+
+    blocker = await scheduler.submit(FFmpeg().input("anullsrc", f="lavfi").output("-", f="null"))
+
+    futures = []
+    for name, priority in [("low", 10), ("high", 0), ("normal", 5)]:
+        ffmpeg = (
+            FFmpeg()
+            .input(assets_path / "brewing.wav")
+            .output(
+                "pipe:1",
+                {"codec:a": "pcm_s16le"},
+                f="s16le",
+            )
+        )
+        ffmpeg.on("start", lambda _, name=name: started.append(name))
+        futures.append(await scheduler.submit(ffmpeg, priority=priority))
+
+    assert scheduler.queued == 3
+    blocker.cancel()
+
+    results = await asyncio.gather(*futures)
+    assert started == ["high", "normal", "low"]
+    assert all(result == results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_asyncio_scheduler_backpressure_and_tenants():
+    scheduler = Scheduler(concurrency=4, queue_size=1, tenant_concurrency=1)
+
+    running = await scheduler.submit(FFmpeg().input("anullsrc", f="lavfi").output("-", f="null"), tenant="alice")
+    queued = await scheduler.submit(FFmpeg().input("anullsrc", f="lavfi").output("-", f="null"), tenant="alice")
+    assert scheduler.running == 1
+    assert scheduler.queued == 1
+
+    # The queue is full, so the producer has to wait
+    submission = asyncio.ensure_future(
+        scheduler.submit(FFmpeg().input("anullsrc", f="lavfi").output("-", f="null"), tenant="bob")
+    )
+    await asyncio.sleep(0.1)
+    assert not submission.done()
+
+    queued.cancel()
+    other = await asyncio.wait_for(submission, timeout=1)
+    await asyncio.sleep(0.1)
+    assert scheduler.running == 2
+
+    for future in [running, other]:
+        future.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await future
+
+    await asyncio.sleep(0.1)
+    assert scheduler.running == 0
+
+
+@pytest.mark.asyncio
+async def test_asyncio_scheduler_drops_cancelled_jobs():
+    scheduler = Scheduler(concurrency=1)
+
+    blocker = await scheduler.submit(FFmpeg().input("anullsrc", f="lavfi").output("-", f="null"))
+    futures = [await scheduler.submit(FFmpeg().input("anullsrc", f="lavfi").output("-", f="null")) for _ in range(10)]
+    assert scheduler.queued == 10
+
+    for future in futures[:8]:
+        future.cancel()
+
+    await asyncio.sleep(0)
+    assert scheduler.queued == 2
+    assert len(scheduler._queue) < 10
+
+    for future in [blocker, *futures[8:]]:
+        future.cancel()
+
+    await asyncio.sleep(0.1)
+    assert scheduler.queued == 0
+    assert scheduler.running == 0
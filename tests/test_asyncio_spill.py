@@ -0,0 +1,32 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ffmpeg.asyncio import FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_spill_filter_graph(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    temporary_path = tmp_path / "temporary"
+    temporary_path.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temporary_path))
+
+    filter_graph = ";".join(["[0:v]setpts=PTS[v]", "[v]" + ",".join(["setpts=PTS"] * 4000)])
+
+    ffmpeg = (
+        FFmpeg()
+        .option("y")
+        .input("testsrc=size=160x120:rate=25", f="lavfi", t=1)
+        .option("filter_complex", filter_graph)
+        .output(tmp_path / "output.nut")
+    )
+
+    @ffmpeg.on("start")
+    def on_start(arguments: list[str]):
+        assert filter_graph not in arguments
+
+    await ffmpeg.execute()
+
+    assert (tmp_path / "output.nut").exists()
+    assert list(temporary_path.iterdir()) == []
@@ -0,0 +1,33 @@
+import pytest
+
+from ffmpeg.asyncio import FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_stderr_lines():
+    ffmpeg = (
+        FFmpeg()
+        .option("loglevel", "debug")
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="null")
+    )
+
+    batches: list[list[bytes]] = []
+    lines: list[str] = []
+    ffmpeg.on("stderr_lines", batches.append)
+    ffmpeg.on("stderr", lines.append)
+    await ffmpeg.execute()
+
+    assert len(batches) < len(lines)
+    assert [line.decode() for batch in batches for line in batch] == lines
+
+
+@pytest.mark.asyncio
+async def test_asyncio_stderr_tuned_without_listeners():
+    ffmpeg = FFmpeg(tune_stderr=True).input("testsrc=size=320x240:rate=25", f="lavfi", t=2).output("pipe:1", f="null")
+
+    arguments: list[list[str]] = []
+    ffmpeg.on("start", arguments.append)
+    await ffmpeg.execute()
+
+    assert arguments[0][1:3] == ["-loglevel", "error"]
@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg.asyncio import FFmpeg
+
+
+@pytest.mark.asyncio
+async def test_asyncio_template_create(tmp_path: Path):
+    template = FFmpeg().option("y").input("{input}", f="lavfi", t=1).output("{output}", {"frames:v": 5}).compile()
+
+    ffmpeg = template.create(input="testsrc=size=160x120:rate=25", output=tmp_path / "output.nut")
+    await ffmpeg.execute()
+
+    assert isinstance(ffmpeg, FFmpeg)
+    assert (tmp_path / "output.nut").exists()
+
+
+@pytest.mark.asyncio
+async def test_asyncio_template_create_and_change():
+    template = FFmpeg().input("{input}", f="lavfi", t=1).compile()
+
+    ffmpeg = template.create(input="testsrc=size=64x48:rate=25").output("pipe:1", f="rawvideo", pix_fmt="gray")
+
+    assert len(await ffmpeg.execute()) == 64 * 48 * 25
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import FFmpeg
+from ffmpeg.utils import get_pipe_size
+
+np = pytest.importorskip("numpy")
+
+
+def decode(path: Path):
+    output = FFmpeg().input(path).output("pipe:1", f="s16le").execute()
+    return np.frombuffer(output, dtype="<i2").reshape(-1, 2)
+
+
+def test_audio_blocks(assets_path: Path):
+    source_path = assets_path / "brewing.wav"
+    expected = decode(source_path)
+
+    blocks = [block.copy() for block in FFmpeg().input(source_path).audio_blocks(4096)]
+
+    assert all(block.shape == (4096, 2) for block in blocks[:-1])
+    assert 0 < len(blocks[-1]) <= 4096
+    assert np.array_equal(np.concatenate(blocks), expected)
+
+
+def test_audio_blocks_with_overlap(assets_path: Path):
+    source_path = assets_path / "brewing.wav"
+    expected = decode(source_path)
+
+    blocks = [block.copy() for block in FFmpeg().input(source_path).audio_blocks(4096, overlap=1024, buffers=3)]
+
+    for index, block in enumerate(blocks):
+        assert np.array_equal(block, expected[index * 3072 : index * 3072 + 4096])
+    assert (len(blocks) - 1) * 3072 + 1024 < len(expected) <= len(blocks) * 3072 + 1024
+
+
+def test_audio_blocks_with_options(assets_path: Path):
+    ffmpeg = FFmpeg().input(assets_path / "brewing.wav")
+
+    blocks = list(ffmpeg.audio_blocks(1000, channels=1, sample_rate=8000, sample_fmt="f32le", drop_last=True))
+
+    assert len(blocks) > 0
+    assert all(block.shape == (1000, 1) and block.dtype == np.float32 for block in blocks)
+
+
+def test_audio_blocks_with_invalid_arguments():
+    with pytest.raises(ValueError):
+        next(FFmpeg().input("sine", f="lavfi").audio_blocks(1024, sample_fmt="s24le"))
+
+    with pytest.raises(ValueError):
+        next(FFmpeg().input("sine", f="lavfi").audio_blocks(1024, overlap=1024))
+
+
+def test_audio_blocks_without_channels():
+    # Without the log, the number of channels is never found, which must not buffer the whole endless stream
+    ffmpeg = FFmpeg().option("loglevel", "error").input("sine=sample_rate=48000", f="lavfi")
+
+    with pytest.raises(ValueError):
+        next(ffmpeg.audio_blocks(1024))
+
+
+def test_audio_blocks_keep_pipe_capacity():
+    ffmpeg = FFmpeg().input("sine", f="lavfi", t=1)
+
+    for _ in ffmpeg.audio_blocks(1, channels=1):
+        capacity = get_pipe_size(ffmpeg._process.stdout.fileno())
+        if capacity is None:
+            pytest.skip("The capacity of pipes is only known on Linux")
+
+        assert capacity >= 65536
+        break
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from pathlib import Path
+
+from ffmpeg import BatchProgress, BatchRunner, FFmpeg, FFmpegUnsupportedCodec, Job, Progress
+from ffmpeg.batch import BatchTracker
+
+
+def test_batch(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    runner = BatchRunner(concurrency=2, threads=1)
+    progresses: list[BatchProgress] = []
+    runner.on("progress", progresses.append)
+
+    ffmpegs = [
+        FFmpeg().input(source_path).output("pipe:1", {"codec:a": codec}, f="s16le")
+        for codec in ["pcm_s16le", "invalid", "pcm_s16le"]
+    ]
+    jobs = [ffmpegs[0], ffmpegs[1], Job(ffmpegs[2], timeout=10)]
+    results = runner.run(jobs)
+
+    assert isinstance(results[0], bytes) and len(results[0]) > 0
+    assert isinstance(results[1], FFmpegUnsupportedCodec)
+    assert results[2] == results[0]
+
+    assert all(progress.running <= 2 for progress in progresses)
+    assert progresses[-1].total == 3
+    assert progresses[-1].completed == 2
+    assert progresses[-1].failed == 1
+
+    assert jobs[0].arguments.count("-threads") == 2
+
+
+def test_batch_progress_totals():
+    def create_progress(frame: int, speed: float) -> Progress:
+        return Progress(frame=frame, fps=0.0, size=0, time=timedelta(), bitrate=0.0, speed=speed)
+
+    runner = BatchRunner()
+    progresses: list[BatchProgress] = []
+    runner.on("progress", progresses.append)
+
+    jobs = [Job(FFmpeg()), Job(FFmpeg())]
+    tracker = BatchTracker(runner, jobs, threads=1)
+
+    tracker.start(0)
+    tracker.start(1)
+    jobs[0].ffmpeg.emit("progress", create_progress(10, 1.5))
+    jobs[1].ffmpeg.emit("progress", create_progress(5, 2.0))
+    jobs[0].ffmpeg.emit("progress", create_progress(30, 0.5))
+    assert (progresses[-1].frame, progresses[-1].speed) == (35, 2.5)
+
+    tracker.finish(0, failed=False)
+    assert (progresses[-1].frame, progresses[-1].speed) == (35, 2.0)
+
+    tracker.finish(1, failed=True)
+    assert (progresses[-1].frame, progresses[-1].speed) == (35, 0.0)
@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import CapabilityRegistry, FFmpeg, FFmpegInvalidCommand, FFmpegUnsupportedCodec, get_version
+
+
+def test_capabilities(tmp_path: Path):
+    capabilities = CapabilityRegistry(tmp_path).get()
+
+    assert capabilities.version != ""
+    assert "aac" in capabilities.encoders
+    assert "pcm_s16le" in capabilities.decoders
+    assert "scale" in capabilities.filters
+    assert "mp4" in capabilities.muxers
+    assert "wav" in capabilities.demuxers
+    assert "rgb24" in capabilities.pix_fmts
+    assert "filter_complex" in capabilities.options
+
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    assert CapabilityRegistry(tmp_path).get() == capabilities
+
+
+def test_validate(tmp_path: Path):
+    capabilities = CapabilityRegistry(tmp_path).get()
+
+    ffmpeg = (
+        FFmpeg()
+        .option("y")
+        .option("nostdin")
+        .option("filter_complex", "[0:v]split=2[a][b];[a]scale=-2:720[v0];[b]scale@small=320:240,format=yuv420p[v1]")
+        .input("testsrc", f="lavfi", t=1)
+        .output("output.wav", {"c:a": "pcm_s16le", "map": ["[v0]", "0:a?"], "pix_fmt": "yuv420p"})
+    )
+    capabilities.validate(ffmpeg)
+
+
+@pytest.mark.parametrize(
+    "ffmpeg, error",
+    [
+        (FFmpeg().input("input.mp4").output("output.mp4", vcodec="unknown"), FFmpegUnsupportedCodec),
+        (FFmpeg().input("input.mp4", acodec="unknown").output("output.mp4"), FFmpegUnsupportedCodec),
+        (FFmpeg().input("input.mp4", f="unknown").output("output.mp4"), FFmpegInvalidCommand),
+        (FFmpeg().input("input.mp4").output("output.mp4", f="unknown"), FFmpegInvalidCommand),
+        (FFmpeg().input("input.mp4").output("output.mp4", unknown=None), FFmpegInvalidCommand),
+        (FFmpeg().input("input.mp4").output("output.mp4", vf="scale=1:1,unknown"), FFmpegInvalidCommand),
+        (FFmpeg().input("input.mp4").output("output.mp4", pix_fmt="unknown"), FFmpegInvalidCommand),
+    ],
+)
+def test_validate_with_invalid_command(tmp_path: Path, ffmpeg: FFmpeg, error: type):
+    capabilities = CapabilityRegistry(tmp_path).get()
+
+    with pytest.raises(error):
+        capabilities.validate(ffmpeg)
+
+
+def test_validate_template(tmp_path: Path):
+    capabilities = CapabilityRegistry(tmp_path).get()
+    template = FFmpeg().input("{input}").output("output.mp4", vcodec="unknown").compile()
+
+    with pytest.raises(FFmpegUnsupportedCodec):
+        capabilities.validate(template.create(input="input.mp4"))
+
+
+def test_registry_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    registry = CapabilityRegistry()
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    registry.get()
+    assert len(list((tmp_path / "cache" / "python-ffmpeg").glob("*.json"))) == 1
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "memory"))
+    CapabilityRegistry(persist=False).get()
+    assert not (tmp_path / "memory").exists()
+
+
+def test_version(tmp_path: Path):
+    assert get_version() == CapabilityRegistry(tmp_path).get().version
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from ffmpeg import FFmpeg, Progress
+from ffmpeg.dispatcher import EventQueue
+
+
+def test_event_queue_drop_oldest():
+    queue = EventQueue(2, "drop_oldest")
+    for index in range(3):
+        queue.put("stderr", (index,))
+
+    assert queue.accepts("stderr")
+    assert [queue.get(), queue.get()] == [("stderr", (1,)), ("stderr", (2,))]
+    assert queue.metrics.dropped == 1 and queue.metrics.dispatched == 2
+
+
+def test_event_queue_drop_newest():
+    queue = EventQueue(2, "drop_newest")
+    for index in range(3):
+        queue.put("stderr", (index,))
+
+    assert [queue.get(), queue.get()] == [("stderr", (0,)), ("stderr", (1,))]
+    assert queue.metrics.dropped == 1
+
+
+def test_event_queue_coalesce():
+    queue = EventQueue(2, "coalesce")
+    queue.put("progress", (0,))
+    queue.put("stderr", ("line",))
+
+    assert not queue.accepts("stderr")
+    assert queue.accepts("progress")
+
+    queue.put("progress", (1,))
+    assert [queue.get(), queue.get()] == [("progress", (1,)), ("stderr", ("line",))]
+    assert queue.metrics.coalesced == 1
+
+
+def test_dispatch():
+    ffmpeg = (
+        FFmpeg(dispatch="block", dispatch_capacity=4)
+        .option("stats_period", 0.01)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    threads: set[int] = set()
+    lines: list[str] = []
+    progresses: list[Progress] = []
+
+    @ffmpeg.on("stderr")
+    def on_stderr(line: str):
+        threads.add(threading.get_ident())
+        lines.append(line)
+
+    @ffmpeg.on("progress")
+    def on_progress(progress: Progress):
+        threads.add(threading.get_ident())
+        time.sleep(0.01)
+        progresses.append(progress)
+
+    ffmpeg.execute()
+
+    # Listeners are called by the dispatcher, and every event is delivered before `completed`
+    assert threading.get_ident() not in threads
+    assert progresses[-1].frame == 50
+    assert any(line.startswith("Output #0") for line in lines)
+
+    metrics = ffmpeg.dispatch_metrics
+    assert metrics is not None
+    assert metrics.dispatched == len(lines) + len(progresses)
+    assert metrics.dropped == 0 and metrics.max_lag >= metrics.lag >= 0
+
+
+def test_dispatch_coalesce():
+    ffmpeg = (
+        FFmpeg(dispatch="coalesce", dispatch_capacity=1)
+        .option("stats_period", 0.01)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    progresses: list[Progress] = []
+
+    @ffmpeg.on("progress")
+    def on_progress(progress: Progress):
+        time.sleep(0.01)
+        progresses.append(progress)
+
+    ffmpeg.execute()
+
+    metrics = ffmpeg.dispatch_metrics
+    assert metrics is not None
+    assert progresses[-1].frame == 50
+    # Progresses arriving while the listener is busy replace the queued one instead of waiting
+    assert metrics.dispatched == len(progresses)
+    assert metrics.dropped == 0
+
+
+def test_dispatch_exception():
+    ffmpeg = (
+        FFmpeg(dispatch="block")
+        .option("stats_period", 0.01)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    @ffmpeg.on("progress")
+    def on_progress(progress: Progress):
+        raise RuntimeError("Raised error")
+
+    with pytest.raises(RuntimeError, match="Raised error"):
+        ffmpeg.execute()
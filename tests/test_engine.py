@@ -0,0 +1,56 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import FFmpeg
+from ffmpeg.utils import is_windows
+
+
+@pytest.mark.skipif(is_windows(), reason="selectors do not support pipes on Windows")
+def test_pipes_are_driven_from_calling_thread(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input("pipe:0")
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    threads = set()
+
+    @ffmpeg.on("stderr")
+    def on_stderr(line: str):
+        threads.add(threading.get_ident())
+
+    active_count = threading.active_count()
+
+    for _ in ffmpeg.iterate(source_path.read_bytes()):
+        assert threading.active_count() == active_count
+
+    assert threads == {threading.get_ident()}
+
+
+def test_process_is_killed_if_engine_fails(monkeypatch: pytest.MonkeyPatch):
+    def create_engine(*args, **kwargs):
+        raise RuntimeError("Raised error")
+
+    monkeypatch.setattr("ffmpeg.ffmpeg.SelectorEngine", create_engine)
+    monkeypatch.setattr("ffmpeg.ffmpeg.ThreadEngine", create_engine)
+
+    ffmpeg = FFmpeg().input("anullsrc", f="lavfi").output("-", f="null")
+    failures: list[BaseException] = []
+    ffmpeg.on("failed", failures.append)
+
+    with pytest.raises(RuntimeError, match="Raised error"):
+        ffmpeg.execute()
+
+    assert len(failures) == 1
+    assert ffmpeg._process.returncode is not None
+    assert ffmpeg._process.stderr is not None and ffmpeg._process.stderr.closed
@@ -2,7 +2,14 @@ from pathlib import Path
 
 import pytest
 
-from ffmpeg import FFmpeg, FFmpegAlreadyExecuted, FFmpegFileNotFound, FFmpegInvalidCommand, FFmpegUnsupportedCodec
+from ffmpeg import (
+    FFmpeg,
+    FFmpegAlreadyExecuted,
+    FFmpegError,
+    FFmpegFileNotFound,
+    FFmpegInvalidCommand,
+    FFmpegUnsupportedCodec,
+)
 
 
 def test_raises_already_executed(
@@ -125,3 +132,36 @@ def test_raises_unsupported_codec_for_invalid_encoders(
             )
             .execute()
         )
+
+
+def test_raises_invalid_command_from_tail():
+    ffmpeg = FFmpeg().input("testsrc", f="lavfi", t=1).output("pipe:1", f="null", vf="invalid")
+
+    with pytest.raises(FFmpegInvalidCommand) as exc_info:
+        ffmpeg.execute()
+
+    # The cause is logged several lines before the last one
+    assert "No such filter" not in exc_info.value.message
+    assert any("No such filter: 'invalid'" in line for line in exc_info.value.tail)
+
+
+def test_error_tail_is_bounded():
+    ffmpeg = (
+        FFmpeg(stderr_tail=4).option("loglevel", "debug").input("testsrc", f="lavfi", t=1).output("pipe:1", f="invalid")
+    )
+
+    with pytest.raises(FFmpegError) as exc_info:
+        ffmpeg.execute()
+
+    assert len(exc_info.value.tail) == 4
+    assert exc_info.value.tail[-1] == exc_info.value.message
+
+
+def test_create_classifies_earliest_match():
+    error = FFmpegError.create(
+        message="Conversion failed!",
+        arguments=[],
+        tail=["Unknown encoder 'invalid'", "Unrecognized option 'invalid'", "Conversion failed!"],
+    )
+
+    assert type(error) is FFmpegUnsupportedCodec
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import BatchRunner, FFmpeg, FFmpegError, MetricsExporter
+
+
+def parse(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+
+    return samples
+
+
+def test_exporter():
+    exporter = MetricsExporter()
+    ffmpeg = exporter.track(FFmpeg().input("testsrc=size=320x240:rate=25", f="lavfi", t=1).output("pipe:1", f="null"))
+    # Tracking the same instance again does not count it twice
+    exporter.track(ffmpeg)
+    ffmpeg.execute()
+
+    samples = parse(exporter.render())
+    assert samples["ffmpeg_jobs_in_flight"] == 0
+    assert samples["ffmpeg_jobs_started_total"] == 1
+    assert samples["ffmpeg_jobs_completed_total"] == 1
+    assert samples["ffmpeg_speed_count"] > 0
+    assert samples['ffmpeg_speed_bucket{le="+Inf"}'] == samples["ffmpeg_speed_count"]
+    assert samples["ffmpeg_job_duration_seconds_count"] == 1
+
+
+def test_exporter_failures():
+    exporter = MetricsExporter(namespace="worker")
+    ffmpeg = exporter.track(FFmpeg().input("testsrc", f="lavfi", t=1).output("pipe:1", f="null", vf="does_not_exist"))
+
+    with pytest.raises(FFmpegError):
+        ffmpeg.execute()
+
+    samples = parse(exporter.render())
+    assert samples["worker_jobs_in_flight"] == 0
+    assert samples['worker_jobs_failed_total{error="FFmpegInvalidCommand"}'] == 1
+
+
+def test_exporter_batch(tmp_path: Path):
+    exporter = MetricsExporter()
+    runner = exporter.track(BatchRunner(concurrency=1))
+    runner.run(
+        [FFmpeg().input("testsrc=size=320x240:rate=25", f="lavfi", t=1).output("pipe:1", f="null") for _ in range(3)]
+    )
+
+    path = tmp_path / "ffmpeg.prom"
+    exporter.write(path)
+
+    samples = parse(path.read_text())
+    assert samples["ffmpeg_jobs_completed_total"] == 3
+    assert samples["ffmpeg_queue_wait_seconds_count"] == 3
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,100 @@
+import pytest
+
+from ffmpeg import FFmpeg
+from ffmpeg.utils import get_pipe_size
+
+np = pytest.importorskip("numpy")
+
+
+def test_frames():
+    ffmpeg = FFmpeg().input("testsrc=size=64x48:rate=25", f="lavfi", t=1)
+    expected = (
+        FFmpeg()
+        .input("testsrc=size=64x48:rate=25", f="lavfi", t=1)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+        .execute()
+    )
+
+    frames = [frame.copy() for frame in ffmpeg.frames()]
+
+    assert len(frames) == 25
+    assert all(frame.shape == (48, 64, 3) and frame.dtype == np.uint8 for frame in frames)
+    assert b"".join(frame.tobytes() for frame in frames) == expected
+
+
+def test_frames_with_size_and_pixel_format():
+    ffmpeg = FFmpeg().input("testsrc=size=64x48:rate=25", f="lavfi", t=1)
+
+    shapes = {frame.shape for frame in ffmpeg.frames(width=32, height=16, pix_fmt="gray", buffers=3)}
+
+    assert shapes == {(16, 32)}
+    assert "-s" in ffmpeg.arguments
+
+
+def test_frames_reuse_buffers():
+    ffmpeg = FFmpeg().input("testsrc=size=64x48:rate=25", f="lavfi", t=1)
+
+    buffers = {id(frame) for frame in ffmpeg.frames(buffers=2)}
+
+    assert len(buffers) == 2
+
+
+def test_frames_with_unsupported_pixel_format():
+    with pytest.raises(ValueError):
+        next(FFmpeg().input("testsrc", f="lavfi").frames(pix_fmt="yuv420p"))
+
+
+def test_frames_without_size():
+    # Without the log, the size of frames is never found, which must not buffer the whole endless stream
+    ffmpeg = FFmpeg().option("loglevel", "error").input("testsrc=size=640x480:rate=25", f="lavfi")
+
+    with pytest.raises(ValueError):
+        next(ffmpeg.frames())
+
+
+def test_frames_keep_pipe_capacity():
+    ffmpeg = FFmpeg().input("testsrc=size=64x48:rate=25", f="lavfi", t=1)
+
+    for _ in ffmpeg.frames(width=4, height=4, pix_fmt="gray"):
+        capacity = get_pipe_size(ffmpeg._process.stdout.fileno())
+        if capacity is None:
+            pytest.skip("The capacity of pipes is only known on Linux")
+
+        assert capacity >= 65536
+        break
+
+
+def test_encode_frames():
+    frames = [np.full((48, 64, 3), index * 10, dtype=np.uint8) for index in range(10)]
+
+    ffmpeg = FFmpeg().output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    output = ffmpeg.encode_frames(iter(frames), framerate=30)
+
+    assert output == b"".join(frame.tobytes() for frame in frames)
+    assert ffmpeg.arguments[1:11] == [
+        # fmt: off
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", "64x48",
+        "-framerate", "30",
+        "-i", "pipe:0",
+        # fmt: on
+    ]
+
+
+def test_encode_frames_with_strided_frames():
+    frame = np.arange(64 * 48, dtype=np.uint16).reshape(64, 48).T
+
+    output = FFmpeg().output("pipe:1", f="rawvideo", pix_fmt="gray16le").encode_frames([frame])
+
+    assert output == np.ascontiguousarray(frame).tobytes()
+
+
+def test_encode_frames_with_mismatched_frames():
+    frames = [np.zeros((48, 64, 3), dtype=np.uint8), np.zeros((24, 32, 3), dtype=np.uint8)]
+
+    with pytest.raises(ValueError):
+        FFmpeg().output("pipe:1", f="rawvideo").encode_frames(frames)
+
+    with pytest.raises(ValueError):
+        FFmpeg().output("pipe:1", f="rawvideo").encode_frames([])
@@ -0,0 +1,102 @@
+import pytest
+
+from ffmpeg import FFmpeg, FilterGraph
+
+
+def test_graph_chains():
+    graph = FilterGraph()
+    video = graph.input("0:v").filter("fps", 30)
+    logo = graph.input("1:v").filter("scale", 128, -1)
+    assert graph.output(graph.filter("overlay", [video, logo], x=10, y=10), "v") == "[v]"
+
+    assert graph.build() == "[0:v]fps=30[s0];[1:v]scale=128:-1[s1];[s0][s1]overlay=x=10:y=10[v]"
+
+
+def test_graph_split():
+    graph = FilterGraph()
+    video = graph.input("0:v")
+    audio = graph.input("0:a")
+    graph.output(video.filter("scale", -2, 720), "v0")
+    graph.output(video.filter("scale", -2, 480), "v1")
+    graph.output(graph.filter("amix", [audio, audio.filter("volume", 0.5)], inputs=2), "a")
+
+    assert graph.build() == (
+        "[0:v]split=2[s0][s1];[s0]scale=-2:720[v0];[s1]scale=-2:480[v1];"
+        "[0:a]asplit=2[s2][s3];[s2]volume=0.5[s4];[s3][s4]amix=inputs=2[a]"
+    )
+
+
+def test_graph_escape():
+    graph = FilterGraph()
+    graph.output(graph.input("0:v").filter("select", "not(mod(n,2))").filter("trim", start="00:00:01"), "v")
+
+    assert graph.build() == r"[0:v]select=not(mod(n\,2)),trim=start=00\\:00\\:01[v]"
+
+
+def test_graph_optimize():
+    graph = FilterGraph()
+    video = graph.input("0:v")
+    for height in (720, 480):
+        chain = video.filter("null").filter("eq", contrast=1.2).filter("hflip").filter("fps", 15)
+        graph.output(chain.filter("scale", -2, height).filter("setpts", "PTS"), f"v{height}")
+    graph.output(graph.input("0:a"), "a")
+
+    # Identical branches are merged, identity filters removed, and `fps` moved before the filters it does not affect
+    assert graph.build() == (
+        "[0:v]fps=15,eq=contrast=1.2,hflip,split=2[s0][s1];[s0]scale=-2:720[v720];[s1]scale=-2:480[v480];"
+        "[0:a]anull[a]"
+    )
+    assert graph.build(optimize=False).count("eq=contrast=1.2") == 2
+
+
+def test_graph_scale_is_not_moved():
+    graph = FilterGraph()
+    graph.output(graph.input("0:v").filter("crop", 640, 360).filter("eq", gamma=1.5).filter("scale", 320, 180), "v")
+
+    # Scaling before `eq` would not give the same pixels, however much cheaper it is
+    assert graph.build() == "[0:v]crop=640:360,eq=gamma=1.5,scale=320:180[v]"
+
+
+def test_graph_nondeterministic_filters_are_not_merged():
+    graph = FilterGraph()
+    video = graph.input("0:v")
+    for label in ("v0", "v1"):
+        graph.output(video.filter("noise", alls=20, allf="t").filter("fps", 15), label)
+
+    # Every `noise` draws its own random numbers, so neither merging the branches nor moving `fps` gives the same frames
+    assert graph.build() == (
+        "[0:v]split=2[s0][s1];[s0]noise=alls=20:allf=t,fps=15[v0];[s1]noise=alls=20:allf=t,fps=15[v1]"
+    )
+
+
+def test_graph_invalid():
+    graph = FilterGraph()
+    with pytest.raises(ValueError):
+        graph.build()
+
+    graph.input("0:v").filter("scale", 320, 180)
+    graph.output(graph.input("0:v"), "v")
+    with pytest.raises(ValueError, match="not connected"):
+        graph.build()
+
+    with pytest.raises(ValueError):
+        graph.output(graph.input("0:v"), "v")
+    with pytest.raises(ValueError):
+        graph.output(graph.input("0:v"), "[w]")
+    with pytest.raises(ValueError):
+        FilterGraph().output(graph.input("0:v"), "w")
+
+
+def test_graph_execute():
+    graph = FilterGraph()
+    video = graph.input("0:v").filter("eq", contrast=1.2).filter("fps", 10)
+
+    ffmpeg = (
+        FFmpeg()
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=1)
+        .output("pipe:1", f="framecrc", map=graph.output(video.filter("scale", 160, 120), "v"))
+    )
+    frames = graph.apply(ffmpeg).execute().decode().splitlines()
+
+    assert len([line for line in frames if line.startswith("0,")]) == 10
+    assert "160x120" in "\n".join(frames)
@@ -0,0 +1,60 @@
+import ast
+import importlib
+import pkgutil
+from pathlib import Path
+
+import pytest
+
+import ffmpeg
+
+package_path = Path(ffmpeg.__file__).parent
+module_names = sorted(module.name for module in pkgutil.walk_packages([str(package_path)], prefix="ffmpeg."))
+
+# Subscripting these in an annotation raises `TypeError` before Python 3.9, unless annotations are postponed
+builtin_generics = {"dict", "frozenset", "list", "set", "tuple", "type"}
+
+
+def find_runtime_generics(tree: ast.Module) -> list[str]:
+    annotations = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            arguments = node.args
+            annotations.append(node.returns)
+            annotations.extend(
+                argument.annotation
+                for argument in [*arguments.posonlyargs, *arguments.args, *arguments.kwonlyargs]
+                + [arguments.vararg, arguments.kwarg]
+                if argument is not None
+            )
+        elif isinstance(node, ast.AnnAssign):
+            annotations.append(node.annotation)
+
+    return [
+        ast.unparse(node)
+        for annotation in annotations
+        if annotation is not None
+        for node in ast.walk(annotation)
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id in builtin_generics
+    ]
+
+
+@pytest.mark.parametrize("name", module_names)
+def test_import(name: str):
+    importlib.import_module(name)
+
+
+@pytest.mark.parametrize("name", module_names)
+def test_import_on_python_37(name: str):
+    path = package_path.joinpath(*name.split(".")[1:])
+    path = path / "__init__.py" if path.is_dir() else path.with_suffix(".py")
+    source = path.read_text(encoding="utf-8")
+
+    tree = ast.parse(source, feature_version=(3, 7))
+    postponed = any(
+        isinstance(node, ast.ImportFrom)
+        and node.module == "__future__"
+        and any(alias.name == "annotations" for alias in node.names)
+        for node in tree.body
+    )
+    if not postponed:
+        assert find_runtime_generics(tree) == []
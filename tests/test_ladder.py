@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import FFmpeg, Ladder, Rendition
+
+
+def test_ladder_arguments():
+    ladder = Ladder(
+        [
+            Rendition("720p.mp4", height=720, video_bitrate="3M"),
+            Rendition("480p.mp4", height=480, width=854, audio_bitrate="96k", options={"preset": "fast"}),
+        ]
+    )
+    ffmpeg = ladder.apply(FFmpeg().input("input.mp4"))
+
+    assert ffmpeg.arguments == [
+        "ffmpeg",
+        "-filter_complex",
+        "[0:v:0]split=2[s0][s1];[s0]scale=-2:720[v0];[s1]scale=854:480[v1]",
+        "-i",
+        "input.mp4",
+        "-map",
+        "[v0]",
+        "-map",
+        "0:a:0?",
+        "-vcodec",
+        "libx264",
+        "-b:v",
+        "3M",
+        "720p.mp4",
+        "-map",
+        "[v1]",
+        "-map",
+        "0:a:0?",
+        "-vcodec",
+        "libx264",
+        "-b:a",
+        "96k",
+        "-preset",
+        "fast",
+        "480p.mp4",
+    ]
+
+
+def test_ladder_without_renditions():
+    with pytest.raises(ValueError):
+        Ladder([])
+
+
+def test_ladder(tmp_path: Path):
+    pytest.importorskip("numpy")
+
+    heights = [144, 96, 48]
+    ladder = Ladder([Rendition(tmp_path / f"{height}p.mp4", height=height) for height in heights], audio=None)
+    ladder.apply(FFmpeg().input("testsrc=size=256x192:rate=25", f="lavfi", t=1)).execute()
+
+    for height in heights:
+        frames = list(FFmpeg().input(tmp_path / f"{height}p.mp4").frames())
+
+        assert len(frames) == 25
+        assert frames[0].shape == (height, height * 4 // 3, 3)
@@ -0,0 +1,47 @@
+import sys
+
+import pytest
+
+from ffmpeg import ExecutionMetrics, FFmpeg, FFmpegError
+
+
+def test_metrics():
+    ffmpeg = (
+        FFmpeg().input("pipe:0", f="rawvideo", pix_fmt="gray", s="16x16").output("pipe:1", f="rawvideo", pix_fmt="gray")
+    )
+
+    metrics: list[ExecutionMetrics] = []
+    ffmpeg.on("metrics", metrics.append)
+    stdout = ffmpeg.execute(bytes(256 * 10))
+
+    assert metrics == [ffmpeg.metrics]
+    assert ffmpeg.metrics is not None
+    assert ffmpeg.metrics.stdin_bytes == 256 * 10
+    assert ffmpeg.metrics.stdout_bytes == len(stdout) == 256 * 10
+    assert ffmpeg.metrics.stderr_lines > 0
+    assert ffmpeg.metrics.first_byte_time is not None
+    assert 0 <= ffmpeg.metrics.spawn_time <= ffmpeg.metrics.first_byte_time <= ffmpeg.metrics.wall_time
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="wait4() is not available on Windows")
+def test_metrics_resources():
+    ffmpeg = FFmpeg().input("testsrc=size=320x240:rate=25", f="lavfi", t=2).output("pipe:1", f="null")
+    ffmpeg.execute()
+
+    assert ffmpeg.metrics is not None
+    assert ffmpeg.metrics.first_byte_time is None
+    assert ffmpeg.metrics.user_time is not None and ffmpeg.metrics.user_time >= 0
+    assert ffmpeg.metrics.system_time is not None and ffmpeg.metrics.system_time >= 0
+    # Even FFmpeg doing nothing needs more than a megabyte
+    assert ffmpeg.metrics.max_rss is not None and ffmpeg.metrics.max_rss > 2**20
+
+
+def test_metrics_on_error():
+    ffmpeg = FFmpeg().input("testsrc", f="lavfi", t=1).output("pipe:1", f="null", vf="does_not_exist")
+
+    metrics: list[ExecutionMetrics] = []
+    ffmpeg.on("metrics", metrics.append)
+    with pytest.raises(FFmpegError):
+        ffmpeg.execute()
+
+    assert metrics == [ffmpeg.metrics]
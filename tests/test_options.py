@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 
+from ffmpeg import FFmpeg
 from ffmpeg.options import Options
 
 
@@ -58,3 +59,36 @@ def test_options(assets_path: Path, tmp_path: Path):
         os.fspath(output_path),
         # fmt: on
     ]
+
+
+def test_options_setdefault(assets_path: Path, tmp_path: Path):
+    pier39_path = assets_path / "pier-39.mov"
+    output_path = tmp_path / "output.mp4"
+
+    options = Options()
+    options.option("y")
+    options.input(pier39_path)
+    options.output(output_path, threads=4)
+    options.setdefault("threads", 2)
+    assert [*options.build()] == [
+        # fmt: off
+        "-y",
+        "-threads", "2",
+        "-i", os.fspath(pier39_path),
+        "-threads", "4",
+        os.fspath(output_path),
+        # fmt: on
+    ]
+
+
+def test_ffmpeg_setdefault():
+    ffmpeg = FFmpeg().input("input.mp4").output("output.mp4", threads=8).setdefault("threads", 2)
+    assert ffmpeg.arguments == [
+        # fmt: off
+        "ffmpeg",
+        "-threads", "2",
+        "-i", "input.mp4",
+        "-threads", "8",
+        "output.mp4",
+        # fmt: on
+    ]
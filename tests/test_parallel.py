@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from ffmpeg import FFmpeg, ParallelTranscoder, Progress
+from ffmpeg.parallel import parse_keyframes, split_keyframes
+
+
+def test_parse_keyframes():
+    output = "\n".join(
+        [
+            "packet,1.400000,K__",
+            "packet,1.440000,___",
+            "packet,3.400000,K__",
+            "packet,N/A,K__",
+            "format,1.400000",
+        ]
+    )
+
+    assert parse_keyframes(output) == [0.0, 2.0]
+
+
+def test_split_keyframes():
+    keyframes = [float(second) for second in range(10)]
+
+    assert split_keyframes(keyframes, 1) == [(0.0, None)]
+    assert split_keyframes(keyframes, 3) == [(0.0, 3.0), (3.0, 6.0), (6.0, None)]
+    # There cannot be more segments than GOPs
+    assert split_keyframes([0.0, 5.0], 4) == [(0.0, 5.0), (5.0, None)]
+    assert split_keyframes([], 4) == [(0.0, None)]
+
+
+def test_parallel_transcoder(tmp_path: Path):
+    source_path = tmp_path / "source.mkv"
+    target_path = tmp_path / "target.mkv"
+
+    (
+        FFmpeg()
+        .input("testsrc=size=160x120:rate=25", f="lavfi", t=4)
+        .input("sine", f="lavfi", t=4)
+        .output(source_path, vcodec="mpeg4", g=25, acodec="pcm_s16le")
+        .execute()
+    )
+
+    transcoder = ParallelTranscoder(concurrency=4)
+
+    progresses: list[Progress] = []
+    transcoder.on("progress", progresses.append)
+    transcoder.transcode(source_path, target_path, {"vcodec": "mpeg4"}, keyframes=[0.0, 1.0, 2.0, 3.0])
+
+    # Progresses of all segments are merged
+    assert progresses[-1].frame == 100
+
+    lines: list[str] = []
+    ffmpeg = FFmpeg().input(target_path).output("pipe:1", f="null")
+    ffmpeg.on("stderr", lines.append)
+    ffmpeg.on("progress", progresses.append)
+    ffmpeg.execute()
+
+    assert progresses[-1].frame == 100
+    assert any("Audio: pcm_s16le" in line for line in lines)
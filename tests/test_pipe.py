@@ -1,8 +1,11 @@
+import os
 from pathlib import Path
 
+import pytest
 from helpers import probe
 
 from ffmpeg import FFmpeg
+from ffmpeg.utils import get_pipe_size, set_pipe_size
 
 epsilon = 0.25
 
@@ -61,3 +64,118 @@ def test_output_via_stdout(
 
     assert abs(float(source["format"]["duration"]) - float(target["format"]["duration"])) <= epsilon
     assert target["format"]["format_name"] == "ogg"
+
+
+def test_output_via_stdout_iteratively(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input(source_path)
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    chunks = [*ffmpeg.iterate(size=4096)]
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 4096 for chunk in chunks)
+    assert b"".join(chunks) == ffmpeg.execute()
+
+
+def test_input_and_output_via_pipes_without_copy(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input("pipe:0")
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    expected = ffmpeg.execute(source_path.read_bytes())
+    with open(source_path, "rb") as source_file:
+        from_file = ffmpeg.execute(source_file, size=4096, copy=False)
+    from_bytes = ffmpeg.execute(source_path.read_bytes(), size=4096, copy=False)
+
+    assert isinstance(from_file, bytearray)
+    assert from_file == expected
+    assert from_bytes == expected
+
+
+def test_output_via_sink(
+    assets_path: Path,
+    tmp_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+    target_path = tmp_path / "brewing.raw"
+
+    ffmpeg = (
+        FFmpeg()
+        .input(source_path)
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    expected = ffmpeg.execute()
+
+    assert ffmpeg.execute(sink=target_path) == b""
+    assert target_path.read_bytes() == expected
+
+    with open(target_path, "wb") as target_file:
+        target_file.write(b"header")
+        ffmpeg.execute(sink=target_file)
+    assert target_path.read_bytes() == b"header" + expected
+
+
+def test_input_via_file_descriptor(
+    assets_path: Path,
+):
+    source_path = assets_path / "brewing.wav"
+
+    ffmpeg = (
+        FFmpeg()
+        .input("pipe:0")
+        .output(
+            "pipe:1",
+            {"codec:a": "pcm_s16le"},
+            f="s16le",
+        )
+    )
+
+    expected = ffmpeg.execute(source_path.read_bytes())
+
+    with open(source_path, "rb") as source_file:
+        source_file.read(1)  # read ahead so that the position of the descriptor has to be restored
+        source_file.seek(0)
+
+        assert ffmpeg.execute(source_file) == expected
+        assert ffmpeg._process.stdin is None
+
+
+def test_pipes_are_never_shrunk():
+    read_fd, write_fd = os.pipe()
+    try:
+        capacity = get_pipe_size(read_fd)
+        if capacity is None:
+            pytest.skip("The capacity of pipes is only known on Linux")
+
+        assert set_pipe_size(read_fd, 4096) == capacity
+        assert get_pipe_size(read_fd) == capacity
+        assert set_pipe_size(read_fd, capacity * 2) == capacity * 2
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
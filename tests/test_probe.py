@@ -0,0 +1,123 @@
+import copy
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import FFprobe, ProbeCache
+from ffmpeg.probe import get_cache_key
+
+data = {
+    "streams": [
+        {
+            "index": 0,
+            "codec_type": "audio",
+            "codec_name": "pcm_s16le",
+            "sample_rate": "44100",
+            "channels": 2,
+            "r_frame_rate": "0/0",
+        }
+    ],
+    "format": {
+        "filename": "brewing.wav",
+        "nb_streams": 1,
+        "format_name": "wav",
+        "duration": "7.724059",
+        "size": "1362634",
+    },
+}
+
+
+def test_probe(assets_path: Path):
+    media = FFprobe(cache=None).probe(assets_path / "brewing.wav")
+
+    assert media.format.format_name == "wav"
+    assert len(media.audio_streams) == 1
+    assert media.audio_streams[0].codec_name == "pcm_s16le"
+    assert media.audio_streams[0].channels == 2
+
+
+def test_probe_with_cache(assets_path: Path, tmp_path: Path):
+    source_path = tmp_path / "brewing.wav"
+    shutil.copy(assets_path / "brewing.wav", source_path)
+
+    ffprobe = FFprobe(cache=ProbeCache())
+    media = ffprobe.probe(source_path)
+    assert ffprobe.probe(source_path) == media
+
+    os.utime(source_path, ns=(0, 0))
+    assert ffprobe.probe(source_path) != media
+
+
+def test_cache_key(assets_path: Path, tmp_path: Path):
+    source_path = tmp_path / "brewing.wav"
+    shutil.copy(assets_path / "brewing.wav", source_path)
+
+    key = get_cache_key(source_path)
+    assert key is not None
+    assert get_cache_key(source_path) == key
+
+    with open(source_path, "ab") as source_file:
+        source_file.write(b"\0")
+    assert get_cache_key(source_path) != key
+
+    assert get_cache_key("https://example.com/input.mp4") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ProbeCache(capacity=2)
+    cache.put(("a",), data)
+    cache.put(("b",), data)
+    assert cache.get(("a",)) is not None
+
+    cache.put(("c",), data)
+    assert cache.get(("a",)) is not None
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) is not None
+
+
+def test_cache_on_disk(tmp_path: Path):
+    cache = ProbeCache(directory=tmp_path, disk_capacity=2)
+    media = cache.put(("a",), data)
+    cache.put(("b",), data)
+    cache.put(("c",), data)
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    cache = ProbeCache(directory=tmp_path)
+    assert cache.get(("c",)) == media
+    assert cache.get(("d",)) is None
+
+    cache.clear()
+    assert list(tmp_path.glob("*.json")) == []
+    assert cache.get(("c",)) is None
+
+
+def test_cache_returns_immutable_results():
+    cache = ProbeCache()
+    source = copy.deepcopy(data)
+    cache.put(("a",), source)
+    source["format"]["format_name"] = "modified"
+
+    media = cache.get(("a",))
+    assert media is not None
+    assert cache.get(("a",)) is media
+    assert media.format.format_name == "wav"
+    assert media.streams[0].raw["codec_name"] == "pcm_s16le"
+
+    with pytest.raises(TypeError):
+        media.format.tags["title"] = "modified"  # type: ignore
+    with pytest.raises(TypeError):
+        media.streams[0].raw["codec_name"] = "modified"  # type: ignore
+
+
+def test_cache_on_disk_evicts_in_batches(tmp_path: Path):
+    cache = ProbeCache(directory=tmp_path, disk_capacity=20)
+    for index in range(21):
+        cache.put((index,), data)
+
+    # Exceeding the capacity evicts a tenth of it at once, so that the directory is not listed on every store
+    assert len(list(tmp_path.glob("*.json"))) == 18
+    cache.put((21,), data)
+    assert len(list(tmp_path.glob("*.json"))) == 19
@@ -0,0 +1,77 @@
+import pytest
+
+from ffmpeg import FFmpeg, Progress
+
+
+@pytest.mark.parametrize("mode", ["stderr", "pipe"])
+def test_progress(mode: str):
+    ffmpeg = (
+        FFmpeg(progress=mode)  # type: ignore
+        .option("stats_period", 0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    progresses: list[Progress] = []
+    ffmpeg.on("progress", progresses.append)
+    output = ffmpeg.execute()
+
+    assert len(progresses) > 0
+    assert progresses[-1].frame == 50
+    if mode == "pipe":
+        # Only the machine-readable statistics report the exact size
+        assert progresses[-1].size == len(output)
+
+
+def test_progress_via_pipe_disables_statistics_on_stderr():
+    ffmpeg = (
+        FFmpeg(progress="pipe")
+        .option("stats_period", 0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    arguments: list[list[str]] = []
+    lines: list[str] = []
+    ffmpeg.on("start", arguments.append)
+    ffmpeg.on("stderr", lines.append)
+    ffmpeg.on("progress", lambda progress: None)
+    ffmpeg.execute()
+
+    assert arguments[0][1:2] == ["-progress"] and "-nostats" in arguments[0]
+    # FFmpeg still prints the final report
+    assert sum(1 for line in lines if line.startswith("frame=")) <= 1
+
+
+def test_progress_via_pipe_without_listeners():
+    ffmpeg = (
+        FFmpeg(progress="pipe")
+        .option("stats_period", 0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    arguments: list[list[str]] = []
+    ffmpeg.on("start", arguments.append)
+    ffmpeg.execute()
+
+    # Nobody listens to the progress, so there is no reason to open a pipe for it
+    assert "-progress" not in arguments[0] and "-nostats" in arguments[0]
+
+
+@pytest.mark.parametrize("mode", ["stderr", "pipe"])
+def test_progress_interval(mode: str):
+    ffmpeg = (
+        FFmpeg(progress=mode, progress_interval=60)  # type: ignore
+        .option("stats_period", 0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="rawvideo", pix_fmt="rgb24")
+    )
+
+    progresses: list[Progress] = []
+    ffmpeg.on("progress", progresses.append)
+    ffmpeg.execute()
+
+    # The first report is emitted immediately, and the latest one is flushed when FFmpeg exits
+    assert 1 <= len(progresses) <= 2
+    assert progresses[-1].frame == 50
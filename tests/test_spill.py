@@ -0,0 +1,108 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import FFmpeg, spill
+from ffmpeg.spill import spill_arguments
+
+
+@pytest.fixture
+def temporary_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "temporary"
+    path.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(path))
+    return path
+
+
+def test_spill_short_arguments():
+    arguments = ["ffmpeg", "-i", "input.mp4", "-vf", "scale=320:-2", "output.mp4"]
+
+    spilled = spill_arguments(arguments)
+
+    assert spilled.arguments is arguments
+    spilled.cleanup()
+
+
+def test_spill_concat_protocol(temporary_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(spill, "supports_concat_files", lambda executable: True)
+    urls = [f"segment{index}.ts" for index in range(8)] + ["https://example.com/last.ts"]
+
+    spilled = spill_arguments(["ffmpeg", "-f", "mpegts", "-i", "concat:" + "|".join(urls), "output.ts"], threshold=32)
+    assert spilled.arguments[:4] == ["ffmpeg", "-f", "mpegts", "-i"]
+    assert spilled.arguments[4].startswith("concatf:")
+    assert spilled.arguments[5:] == ["output.ts"]
+
+    lines = Path(spilled.arguments[4][len("concatf:") :]).read_text(encoding="utf-8").splitlines()
+    assert lines[0] == os.path.abspath("segment0.ts")
+    assert lines[-1] == "https://example.com/last.ts"
+
+    spilled.cleanup()
+    assert list(temporary_path.iterdir()) == []
+
+
+def test_spill_concat_protocol_without_concat_files(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(spill, "supports_concat_files", lambda executable: False)
+    arguments = ["ffmpeg", "-i", "concat:" + "|".join(f"segment{index}.ts" for index in range(8)), "output.ts"]
+
+    spilled = spill_arguments(arguments, threshold=32)
+
+    assert spilled.arguments == arguments
+    spilled.cleanup()
+
+
+def test_spill_concat_protocol_with_relative_paths(
+    tmp_path: Path,
+    temporary_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # MPEG program streams can be joined byte by byte, as the concat protocol does
+    for index in range(2):
+        FFmpeg().input("testsrc=size=32x32:rate=25", f="lavfi", t=0.08).output(
+            tmp_path / f"{index}.mpg", vcodec="mpeg2video", f="mpeg"
+        ).execute()
+
+    monkeypatch.chdir(tmp_path)
+    url = "concat:" + "|".join(f"{index % 2}.mpg" for index in range(4000))
+
+    ffmpeg = FFmpeg().option("y").input(url).output("output.mpg", c="copy")
+
+    @ffmpeg.on("start")
+    def on_start(arguments: list[str]):
+        assert url not in arguments
+
+    ffmpeg.execute()
+
+    assert (tmp_path / "output.mpg").stat().st_size > 0
+    assert list(temporary_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("option_files", [True, False])
+def test_spill_filter_graph(
+    tmp_path: Path,
+    temporary_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    option_files: bool,
+):
+    monkeypatch.setattr(spill, "supports_option_files", lambda executable: option_files)
+    # Far longer than Windows allows for a whole command line
+    filter_graph = ",".join(["setpts=PTS"] * 4000)
+
+    ffmpeg = (
+        FFmpeg()
+        .option("y")
+        .input("testsrc=size=160x120:rate=25", f="lavfi", t=1)
+        .output(tmp_path / "output.nut", vf=filter_graph)
+    )
+
+    @ffmpeg.on("start")
+    def on_start(arguments: list[str]):
+        assert filter_graph not in arguments
+        assert ("-/vf" if option_files else "-filter_script:v") in arguments
+        assert len(list(temporary_path.iterdir())) == 1
+
+    ffmpeg.execute()
+
+    assert (tmp_path / "output.nut").exists()
+    assert list(temporary_path.iterdir()) == []
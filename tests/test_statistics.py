@@ -54,3 +54,52 @@ def test_statistics():
         )
         == None
     )
+
+
+def test_statistics_from_progress():
+    assert Statistics.from_progress(
+        {
+            "frame": "109",
+            "fps": "54.21",
+            "stream_0_0_q": "28.0",
+            "bitrate": "1613.7kbits/s",
+            "total_size": "812345",
+            "out_time_us": "4020000",
+            "out_time_ms": "4020000",
+            "out_time": "00:00:04.020000",
+            "dup_frames": "2",
+            "drop_frames": "1",
+            "speed": "7.73x",
+        }
+    ) == Statistics(
+        frame=109,
+        fps=54.21,
+        size=812345,
+        time=timedelta(seconds=4, microseconds=20000),
+        bitrate=1613.7,
+        speed=7.73,
+        dup_frames=2,
+        drop_frames=1,
+    )
+
+    assert (
+        Statistics.from_progress(
+            {
+                "bitrate": "N/A",
+                "total_size": "N/A",
+                "out_time_us": "N/A",
+                "speed": "N/A",
+            }
+        )
+        == Statistics()
+    )
+
+
+def test_statistics_from_line_skips_other_lines():
+    line = "frame=  109 fps=0.0 q=-1.0 Lsize=     793kB time=00:00:04.02 bitrate=1613.7kbits/s speed=7.73x"
+    other = "  Stream #0:0: Video: h264 (High), yuv420p(progressive), 1920x1080, 25 fps"
+
+    statistics = Statistics.from_line(line)
+    assert statistics is not None
+    assert statistics.frame == 109
+    assert Statistics.from_line(other) is None
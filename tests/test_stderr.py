@@ -0,0 +1,90 @@
+import pytest
+
+from ffmpeg import FFmpeg, FFmpegError, Progress
+
+
+def test_stderr_lines():
+    ffmpeg = (
+        FFmpeg()
+        .option("loglevel", "debug")
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="null")
+    )
+
+    batches: list[list[bytes]] = []
+    lines: list[str] = []
+    ffmpeg.on("stderr_lines", batches.append)
+    ffmpeg.on("stderr", lines.append)
+    ffmpeg.execute()
+
+    # Every line read at once is delivered in a single batch
+    assert len(batches) < len(lines)
+    assert [line.decode() for batch in batches for line in batch] == lines
+
+
+def test_stderr_tuned_without_listeners():
+    ffmpeg = FFmpeg(tune_stderr=True).input("testsrc=size=320x240:rate=25", f="lavfi", t=2).output("pipe:1", f="null")
+
+    arguments: list[list[str]] = []
+    ffmpeg.on("start", arguments.append)
+    ffmpeg.execute()
+
+    assert arguments[0][1:3] == ["-loglevel", "error"]
+
+
+def test_stderr_tuned_with_progress():
+    ffmpeg = (
+        FFmpeg(tune_stderr=True, progress_interval=0.1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="null")
+    )
+
+    arguments: list[list[str]] = []
+    progresses: list[Progress] = []
+    ffmpeg.on("start", arguments.append)
+    ffmpeg.on("progress", progresses.append)
+    ffmpeg.execute()
+
+    assert arguments[0][1:6] == ["-loglevel", "error", "-stats", "-stats_period", "0.1"]
+    assert progresses[-1].frame == 50
+
+
+@pytest.mark.parametrize("event", ["stderr", "stderr_lines"])
+def test_stderr_tuned_with_listeners(event: str):
+    ffmpeg = FFmpeg(tune_stderr=True).input("testsrc=size=320x240:rate=25", f="lavfi", t=2).output("pipe:1", f="null")
+
+    arguments: list[list[str]] = []
+    ffmpeg.on("start", arguments.append)
+    ffmpeg.on(event, lambda _: None)
+    ffmpeg.execute()
+
+    assert "-loglevel" not in arguments[0]
+
+
+def test_stderr_tuned_keeps_explicit_options():
+    ffmpeg = (
+        FFmpeg(tune_stderr=True, progress_interval=0.1)
+        .option("v", "warning")
+        .option("stats_period", 1)
+        .input("testsrc=size=320x240:rate=25", f="lavfi", t=2)
+        .output("pipe:1", f="null")
+    )
+
+    arguments: list[list[str]] = []
+    ffmpeg.on("start", arguments.append)
+    ffmpeg.on("progress", lambda _: None)
+    ffmpeg.execute()
+
+    assert "-loglevel" not in arguments[0] and arguments[0].count("-stats_period") == 1
+
+
+def test_stderr_tuned_error():
+    ffmpeg = (
+        FFmpeg(tune_stderr=True).input("testsrc=size=320x240:rate=25", f="lavfi", t=2).output("pipe:1", f="invalid")
+    )
+
+    with pytest.raises(FFmpegError) as exc_info:
+        ffmpeg.execute()
+
+    # Errors are still printed, so the failure is still explained
+    assert exc_info.value.message
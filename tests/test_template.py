@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pytest
+
+from ffmpeg import BatchRunner, FFmpeg, Progress, Template
+
+
+def create_template() -> Template[FFmpeg]:
+    return (
+        FFmpeg(progress_interval=0.1)
+        .option("y")
+        .input("{input}", f="lavfi", t=1)
+        .output("{output}", {"vf": "scale={width}:-2", "frames:v": "{frames}"})
+        .compile()
+    )
+
+
+def test_template_render():
+    template = create_template()
+
+    assert template.fields == {"input", "output", "frames"}
+    assert template.render(input="testsrc", output=Path("output.mp4"), frames=10) == [
+        "ffmpeg",
+        "-y",
+        "-f", "lavfi",  # fmt: skip
+        "-t", "1",  # fmt: skip
+        "-i", "testsrc",  # fmt: skip
+        "-vf", "scale={width}:-2",  # fmt: skip
+        "-frames:v", "10",  # fmt: skip
+        "output.mp4",
+    ]
+
+
+def test_template_render_mismatched_values():
+    template = create_template()
+
+    with pytest.raises(ValueError):
+        template.render(input="testsrc", output="output.mp4")
+
+    with pytest.raises(ValueError):
+        template.render(input="testsrc", output="output.mp4", frames=10, width=320)
+
+
+def test_template_create(tmp_path: Path):
+    template = (
+        FFmpeg(progress_interval=0.1)
+        .option("y")
+        .input("{input}", f="lavfi", t=1)
+        .output("{output}", {"frames:v": "{frames}"})
+        .compile()
+    )
+
+    for frames in (5, 10):
+        output_path = tmp_path / f"output-{frames}.nut"
+        ffmpeg = template.create(input="testsrc=size=160x120:rate=25", output=output_path, frames=frames)
+
+        progresses: list[Progress] = []
+        ffmpeg.on("progress", progresses.append)
+        ffmpeg.execute()
+        # The same instance can be executed again
+        ffmpeg.execute()
+
+        assert output_path.exists()
+        assert ffmpeg.arguments[-3:] == ["-frames:v", str(frames), str(output_path)]
+        assert progresses[-1].frame == frames
+        assert ffmpeg._progress_interval == 0.1
+
+
+def test_template_create_frames():
+    np = pytest.importorskip("numpy")
+    template = FFmpeg().input("{input}", f="lavfi", t=1).compile()
+
+    ffmpeg = template.create(input="testsrc=size=64x48:rate=25")
+    frames = [frame.copy() for frame in ffmpeg.frames()]
+
+    assert len(frames) == 25
+    assert all(frame.shape == (48, 64, 3) and frame.dtype == np.uint8 for frame in frames)
+
+
+def test_template_create_batch():
+    template = FFmpeg().input("{input}", f="lavfi", t=1).output("pipe:1", {"frames:v": "{frames}"}, f="null").compile()
+
+    jobs = [template.create(input="testsrc=size=64x48:rate=25", frames=frames) for frames in (5, 10)]
+    results = BatchRunner(concurrency=2, threads=1).run(jobs)
+
+    assert results == [b"", b""]
+    for ffmpeg, frames in zip(jobs, (5, 10)):
+        # Options added by the runner are applied on top of the rendered arguments
+        assert ffmpeg.arguments == [
+            "ffmpeg",
+            "-f", "lavfi",  # fmt: skip
+            "-t", "1",  # fmt: skip
+            "-threads", "1",  # fmt: skip
+            "-i", "testsrc=size=64x48:rate=25",  # fmt: skip
+            "-frames:v", str(frames),  # fmt: skip
+            "-f", "null",  # fmt: skip
+            "-threads", "1",  # fmt: skip
+            "pipe:1",
+        ]